@@ -9,6 +9,8 @@ from .models import (
     CourseVideo,
     EncodedVideo,
     Profile,
+    StorageDeletion,
+    StorageMigration,
     ThirdPartyTranscriptCredentialsState,
     TranscriptPreference,
     Video,
@@ -126,3 +128,25 @@ class ThirdPartyTranscriptCredentialsStateAdmin(admin.ModelAdmin):
     model = ThirdPartyTranscriptCredentialsState
     verbose_name = 'Organization Transcript Credential State'
     verbose_name_plural = 'Organization Transcript Credentials State'
+
+
+@admin.register(StorageDeletion)
+class StorageDeletionAdmin(admin.ModelAdmin):
+    """ Admin for StorageDeletion """
+    list_display = ('storage', 'name', 'attempts', 'last_error', 'created', 'modified')
+    list_filter = ('storage',)
+    search_fields = ('name',)
+
+    model = StorageDeletion
+    verbose_name = 'Storage Deletion'
+    verbose_name_plural = 'Storage Deletions'
+
+
+@admin.register(StorageMigration)
+class StorageMigrationAdmin(admin.ModelAdmin):
+    """ Admin for StorageMigration """
+    list_display = ('name', 'storage', 'last_id', 'copied_count', 'skipped_count', 'failed_count', 'modified')
+
+    model = StorageMigration
+    verbose_name = 'Storage Migration'
+    verbose_name_plural = 'Storage Migrations'
@@ -2,17 +2,23 @@
 The internal API for VAL.
 """
 import logging
+import os
+from collections import defaultdict
 from enum import Enum
 from uuid import uuid4
 
 from django.conf import settings
+from django.core import signing
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.core.paginator import Paginator
-from django.db.models import Prefetch
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Prefetch, Q
+from django.urls import reverse
+from django.utils import timezone
 from fs import open_fs
 from fs.errors import ResourceNotFound
-from fs.path import combine
+from fs.path import combine, split
 from lxml import etree
 from lxml.etree import Element, SubElement
 from pysrt.srtexc import Error
@@ -31,28 +37,49 @@ from edxval.exceptions import (
 )
 from edxval.models import (
     EXTERNAL_VIDEO_STATUS,
+    LIST_MAX_ITEMS,
+    VALID_VIDEO_STATUSES,
     CourseVideo,
     EncodedVideo,
     Profile,
+    StorageDeletion,
     ThirdPartyTranscriptCredentialsState,
     TranscriptPreference,
     TranscriptProviderType,
     Video,
     VideoImage,
     VideoTranscript,
+    get_video_file_storage,
+    log_video_status_updates,
+)
+from edxval.serializers import (
+    TranscriptPreferenceSerializer,
+    TranscriptSerializer,
+    VideoSerializer,
+    VideoUpsertSerializer,
 )
-from edxval.serializers import TranscriptPreferenceSerializer, TranscriptSerializer, VideoSerializer
 from edxval.transcript_utils import Transcript
 from edxval.utils import (
     THIRD_PARTY_TRANSCRIPTION_PLANS,
+    TranscriptContentEncoding,
     TranscriptFormat,
+    VideoStorage,
+    compute_content_hash,
     create_file_in_fs,
-    get_transcript_format,
-    is_duplicate_file,
+    get_presigned_upload_url,
+    get_video_file_max_bytes,
+    get_video_file_path,
+    get_video_storage_settings,
+    parse_spooled_transcript,
+    spool_transcript_file,
+    validate_generated_images,
 )
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_ID_SALT = 'edxval.api.video_file_upload'
+UPLOAD_EXPIRES_IN = 3600
+
 
 class VideoSortField(Enum):
     """An enum representing sortable fields in the Video model"""
@@ -115,6 +142,137 @@ def create_video(video_data):
     raise ValCannotCreateError(serializer.errors)
 
 
+def create_videos_bulk(videos_data):
+    """
+    Called on to create many Video objects in the database at once
+
+    Every video is validated by the VideoSerializer, the valid ones are then created together
+    with their encoded videos, courses and course images in a single transaction using bulk inserts.
+    Invalid videos are reported in the results and do not prevent the valid ones from being created.
+
+    Args:
+        videos_data (list): video dicts in the format accepted by `create_video`
+
+    Returns:
+        (list): A result dict for each video, in the order of `videos_data`
+            {
+                edx_video_id: ID of the video
+                created: whether the video was created
+                errors: validation errors, only present if the video was not created
+            }
+    """
+    results = []
+    valid_videos = []
+    edx_video_ids = set()
+    for video_data in videos_data:
+        serializer = VideoSerializer(data=video_data)
+        edx_video_id = video_data.get('edx_video_id') if isinstance(video_data, dict) else None
+        if not serializer.is_valid():
+            results.append({'edx_video_id': edx_video_id, 'created': False, 'errors': serializer.errors})
+        elif edx_video_id in edx_video_ids:
+            results.append({
+                'edx_video_id': edx_video_id,
+                'created': False,
+                'errors': {'edx_video_id': ['edx_video_id is repeated in the batch.']},
+            })
+        else:
+            edx_video_ids.add(edx_video_id)
+            valid_videos.append((len(results), serializer.validated_data))
+            results.append({'edx_video_id': edx_video_id, 'created': True})
+
+    try:
+        with transaction.atomic():
+            _bulk_create_videos([validated_data for __, validated_data in valid_videos])
+    except IntegrityError:
+        # Some videos were created by someone else after being validated,
+        # fall back to creating the videos one at a time.
+        for index, validated_data in valid_videos:
+            try:
+                with transaction.atomic():
+                    VideoSerializer().create(dict(validated_data))
+            except IntegrityError as error:
+                results[index].update(created=False, errors={'non_field_errors': [str(error)]})
+
+    return results
+
+
+def _bulk_create_videos(videos_data):
+    """
+    Creates videos along with their encoded videos, courses and images using bulk inserts.
+
+    Arguments:
+        videos_data (list): validated data of the VideoSerializer for each video
+    """
+    videos = Video.objects.bulk_create([
+        Video(**{field: value for field, value in video_data.items() if field not in ('encoded_videos', 'courses')})
+        for video_data in videos_data
+    ])
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # Primary keys of the inserted rows are not set by this database backend.
+        videos = Video.objects.filter(edx_video_id__in=[video.edx_video_id for video in videos])
+
+    videos = {video.edx_video_id: video for video in videos}
+    EncodedVideo.objects.bulk_create([
+        EncodedVideo(video=videos[video_data['edx_video_id']], **encoded_video)
+        for video_data in videos_data
+        for encoded_video in video_data.get('encoded_videos', [])
+    ])
+    _bulk_set_course_videos([
+        (videos[video_data['edx_video_id']], course_video.course_id, image_name)
+        for video_data in videos_data
+        for course_video, image_name in video_data.get('courses', [])
+    ])
+    log_video_status_updates(((video.edx_video_id, video.status) for video in videos.values()), created=True)
+
+
+def _bulk_set_course_videos(course_video_links):
+    """
+    Links videos to courses and sets the course video images in a constant number of queries.
+
+    Existing links are kept as they are, only their image is updated if an image name is given.
+
+    Arguments:
+        course_video_links (list): (video, course_id, image_name) tuples, image_name may be empty
+    """
+    if not course_video_links:
+        return
+
+    CourseVideo.objects.bulk_create(
+        [CourseVideo(video=video, course_id=course_id) for video, course_id, __ in course_video_links],
+        ignore_conflicts=True,
+    )
+
+    image_names = {
+        (video.id, course_id): image_name
+        for video, course_id, image_name in course_video_links
+        if image_name
+    }
+    if not image_names:
+        return
+
+    course_videos = CourseVideo.objects.select_related('video_image').filter(
+        video__in={video_id for video_id, __ in image_names},
+        course_id__in={course_id for __, course_id in image_names},
+    )
+    new_video_images = []
+    updated_video_images = []
+    for course_video in course_videos:
+        image_name = image_names.get((course_video.video_id, course_video.course_id))
+        if not image_name:
+            continue
+
+        if hasattr(course_video, 'video_image'):
+            video_image = course_video.video_image
+            video_image.image = image_name
+            video_image.modified = timezone.now()
+            updated_video_images.append(video_image)
+        else:
+            new_video_images.append(VideoImage(course_video=course_video, image=image_name))
+
+    VideoImage.objects.bulk_create(new_video_images)
+    VideoImage.objects.bulk_update(updated_video_images, ['image', 'modified'])
+
+
 def create_external_video(display_name):
     """
     Create an external video.
@@ -174,6 +332,132 @@ def update_video(video_data):
     raise ValCannotUpdateError(serializer.errors)
 
 
+# Video fields written when an existing video is upserted, matching the fields set by `update_video`.
+VIDEO_UPSERT_FIELDS = ['status', 'client_video_id', 'duration', 'modified']
+
+
+def upsert_video(video_data):
+    """
+    Called on to create or update a Video object in the database
+
+    The video is written without being read first, its encoded videos are set to the given ones
+    and its courses and course images are added, in a constant number of queries.
+
+    Args:
+        video_data (dict): video dict in the format accepted by `create_video`
+
+    Raises:
+        Raises ValCannotCreateError if the video data is not valid.
+
+    Returns the edx_video_id of the video
+    """
+    serializer = VideoUpsertSerializer(data=video_data)
+    if not serializer.is_valid():
+        raise ValCannotCreateError(serializer.errors)
+
+    with transaction.atomic():
+        _bulk_upsert_videos([serializer.validated_data])
+
+    return video_data.get('edx_video_id')
+
+
+def upsert_videos(videos_data):
+    """
+    Called on to create or update many Video objects in the database at once
+
+    Every video is validated by the VideoUpsertSerializer, the valid ones are then written in a single
+    transaction as done by `upsert_video`. Invalid videos are reported in the results and do not prevent
+    the valid ones from being written.
+
+    Args:
+        videos_data (list): video dicts in the format accepted by `create_video`
+
+    Returns:
+        (list): A result dict for each video, in the order of `videos_data`
+            {
+                edx_video_id: ID of the video
+                upserted: whether the video was created or updated
+                errors: validation errors, only present if the video was not written
+            }
+    """
+    results = []
+    valid_videos = []
+    edx_video_ids = set()
+    for video_data in videos_data:
+        serializer = VideoUpsertSerializer(data=video_data)
+        edx_video_id = video_data.get('edx_video_id') if isinstance(video_data, dict) else None
+        if not serializer.is_valid():
+            results.append({'edx_video_id': edx_video_id, 'upserted': False, 'errors': serializer.errors})
+        elif edx_video_id in edx_video_ids:
+            results.append({
+                'edx_video_id': edx_video_id,
+                'upserted': False,
+                'errors': {'edx_video_id': ['edx_video_id is repeated in the batch.']},
+            })
+        else:
+            edx_video_ids.add(edx_video_id)
+            valid_videos.append(serializer.validated_data)
+            results.append({'edx_video_id': edx_video_id, 'upserted': True})
+
+    if valid_videos:
+        with transaction.atomic():
+            _bulk_upsert_videos(valid_videos)
+
+    return results
+
+
+def _bulk_upsert_videos(videos_data):
+    """
+    Creates or updates videos along with their encoded videos, courses and images.
+
+    Videos are written with a single upsert statement where the database supports it, falling back
+    to `update_or_create` for each video elsewhere.
+
+    Arguments:
+        videos_data (list): validated data of the VideoUpsertSerializer for each video
+    """
+    videos = [
+        Video(**{field: value for field, value in video_data.items() if field not in ('encoded_videos', 'courses')})
+        for video_data in videos_data
+    ]
+    features = connection.features
+    if features.supports_update_conflicts_with_target:
+        videos = Video.objects.bulk_create(
+            videos, update_conflicts=True, unique_fields=['edx_video_id'], update_fields=VIDEO_UPSERT_FIELDS,
+        )
+    elif features.supports_update_conflicts:
+        # The conflicting unique field can't be targeted on this backend, edx_video_id is the only one.
+        videos = Video.objects.bulk_create(videos, update_conflicts=True, update_fields=VIDEO_UPSERT_FIELDS)
+    else:
+        videos = [
+            Video.objects.update_or_create(
+                edx_video_id=video.edx_video_id,
+                defaults={field: getattr(video, field) for field in VIDEO_UPSERT_FIELDS if field != 'modified'},
+                create_defaults={
+                    field.name: getattr(video, field.attname)
+                    for field in Video._meta.concrete_fields if not field.primary_key
+                },
+            )[0]
+            for video in videos
+        ]
+
+    if any(video.pk is None for video in videos):
+        # Primary keys of the upserted rows are not set by this database backend.
+        videos = Video.objects.filter(edx_video_id__in=[video.edx_video_id for video in videos])
+
+    videos = {video.edx_video_id: video for video in videos}
+    EncodedVideo.sync({
+        videos[video_data['edx_video_id']]: video_data.get('encoded_videos', [])
+        for video_data in videos_data
+    })
+    _bulk_set_course_videos([
+        (videos[video_data['edx_video_id']], course_video.course_id, image_name)
+        for video_data in videos_data
+        for course_video, image_name in video_data.get('courses', [])
+    ])
+    log_video_status_updates((video.edx_video_id, video.status) for video in videos.values())
+
+
 def update_video_status(edx_video_id, status):
     """
     Update status for an existing video.
@@ -186,7 +470,7 @@ def update_video_status(edx_video_id, status):
         Raises ValVideoNotFoundError if the video cannot be retrieved.
     """
     try:
-        video = _get_video(edx_video_id)
+        video = Video.objects.get(edx_video_id=edx_video_id)
     except Video.DoesNotExist as no_video_error:
         error_message = "Video not found when trying to update video status with edx_video_id: {}".format(
             edx_video_id
@@ -194,7 +478,176 @@ def update_video_status(edx_video_id, status):
         raise ValVideoNotFoundError(error_message) from no_video_error
 
     video.status = status
-    video.save()
+    video.save(update_fields=['status', 'modified'])
+
+
+def update_videos_status(status_updates):
+    """
+    Update the status of many existing videos at once.
+
+    Videos getting the same status and error description are updated together with a single
+    UPDATE statement, invalid or unknown videos are reported in the results and do not prevent
+    the other videos from being updated.
+
+    Args:
+        status_updates (list): dicts with the `edx_video_id`, `status` and optional `error_description`
+            of each video, `status` must be one of VALID_VIDEO_STATUSES
+
+    Returns:
+        (list): A result dict for each status update, in the order of `status_updates`
+            {
+                edx_video_id: ID of the video
+                updated: whether the video status was updated
+                message: why the video status was not updated, only present if it was not
+            }
+    """
+    results = []
+    valid_updates = []
+    edx_video_ids = set()
+    for status_update in status_updates:
+        if not isinstance(status_update, dict):
+            results.append({'edx_video_id': None, 'updated': False, 'message': 'Invalid data'})
+            continue
+
+        edx_video_id = status_update.get('edx_video_id')
+        missing = [attr for attr in ('edx_video_id', 'status') if attr not in status_update]
+        if missing:
+            message = '"{missing}" params must be specified.'.format(missing=' and '.join(missing))
+        elif not isinstance(edx_video_id, str):
+            message = '"edx_video_id" must be a string.'
+        elif status_update['status'] not in VALID_VIDEO_STATUSES:
+            message = '"{status}" is not a valid Video status.'.format(status=status_update['status'])
+        elif not isinstance(status_update.get('error_description') or '', str):
+            message = '"error_description" must be a string.'
+        elif edx_video_id in edx_video_ids:
+            message = 'edx_video_id is repeated in the batch.'
+        else:
+            message = None
+            edx_video_ids.add(edx_video_id)
+            valid_updates.append((len(results), status_update))
+
+        results.append({'edx_video_id': edx_video_id, 'updated': message is None})
+        if message:
+            results[-1]['message'] = message
+
+    with transaction.atomic():
+        existing_video_ids = set(
+            Video.objects.filter(edx_video_id__in=edx_video_ids).values_list('edx_video_id', flat=True)
+        )
+        video_ids_by_update = defaultdict(list)
+        for index, status_update in valid_updates:
+            edx_video_id = status_update['edx_video_id']
+            if edx_video_id in existing_video_ids:
+                video_ids_by_update[(status_update['status'], status_update.get('error_description'))].append(
+                    edx_video_id
+                )
+            else:
+                results[index].update(
+                    updated=False,
+                    message=f'Video is not found for specified edx_video_id: {edx_video_id}',
+                )
+
+        now = timezone.now()
+        for (status, error_description), video_ids in video_ids_by_update.items():
+            Video.objects.filter(edx_video_id__in=video_ids).update(
+                status=status, error_description=error_description, modified=now
+            )
+
+    log_video_status_updates(
+        (edx_video_id, status)
+        for (status, __), video_ids in video_ids_by_update.items()
+        for edx_video_id in video_ids
+    )
+    return results
+
+
+def update_encoded_videos(encode_updates):
+    """
+    Replace one encode profile for each of many videos at once.
+
+    Videos and profiles are resolved with one query each, then the encoded videos being replaced
+    are deleted in bulk and the new ones created in bulk, inside a single transaction. Invalid
+    updates are reported in the results and do not prevent the other updates.
+
+    Args:
+        encode_updates (list): dicts with the `edx_video_id`, `profile` (profile name) and `encode_data`
+            (`url`, `file_size` and `bitrate` of the encoded video) of each update
+
+    Returns:
+        (list): A result dict for each update, in the order of `encode_updates`
+            {
+                edx_video_id: ID of the video
+                profile: name of the profile
+                updated: whether the encoded video was replaced
+                message: why the encoded video was not replaced, only present if it was not
+            }
+    """
+    results = []
+    valid_updates = []
+    for encode_update in encode_updates:
+        if not isinstance(encode_update, dict):
+            results.append({'edx_video_id': None, 'profile': None, 'updated': False, 'message': 'Invalid data'})
+            continue
+
+        missing = [attr for attr in ('edx_video_id', 'profile', 'encode_data') if attr not in encode_update]
+        not_strings = [
+            attr for attr in ('edx_video_id', 'profile')
+            if attr in encode_update and not isinstance(encode_update[attr], str)
+        ]
+        results.append({
+            'edx_video_id': encode_update.get('edx_video_id'),
+            'profile': encode_update.get('profile'),
+            'updated': not (missing or not_strings),
+        })
+        if missing:
+            results[-1]['message'] = '"{missing}" params must be specified.'.format(missing=' and '.join(missing))
+        elif not_strings:
+            results[-1]['message'] = '"{attrs}" must be strings.'.format(attrs=' and '.join(not_strings))
+        else:
+            valid_updates.append((len(results) - 1, encode_update))
+
+    videos = Video.objects.only('id', 'edx_video_id').in_bulk(
+        {encode_update['edx_video_id'] for __, encode_update in valid_updates}, field_name='edx_video_id'
+    )
+    profiles = Profile.objects.in_bulk(
+        {encode_update['profile'] for __, encode_update in valid_updates}, field_name='profile_name'
+    )
+
+    new_encoded_videos = {}
+    for index, encode_update in valid_updates:
+        video = videos.get(encode_update['edx_video_id'])
+        profile = profiles.get(encode_update['profile'])
+        if video is None:
+            message = 'Video is not found for specified edx_video_id: {}'.format(encode_update['edx_video_id'])
+        elif profile is None:
+            message = 'Profile is not found for specified profile: {}'.format(encode_update['profile'])
+        elif (video.id, profile.id) in new_encoded_videos:
+            message = 'edx_video_id and profile are repeated in the batch.'
+        else:
+            try:
+                encoded_video = EncodedVideo(video=video, profile=profile, **encode_update['encode_data'])
+                encoded_video.full_clean(exclude=['video', 'profile'])
+            except TypeError:
+                message = 'Invalid encode_data'
+            except ValidationError as error:
+                message = error.message_dict
+            else:
+                message = None
+                new_encoded_videos[(video.id, profile.id)] = encoded_video
+
+        if message:
+            results[index].update(updated=False, message=message)
+
+    if new_encoded_videos:
+        replaced_encoded_videos = Q()
+        for video_id, profile_id in new_encoded_videos:
+            replaced_encoded_videos |= Q(video_id=video_id, profile_id=profile_id)
+
+        with transaction.atomic():
+            EncodedVideo.objects.filter(replaced_encoded_videos).delete()
+            EncodedVideo.objects.bulk_create(new_encoded_videos.values())
+
+    return results
 
 
 def is_video_available(edx_video_id):
@@ -277,24 +730,50 @@ def get_video_transcript(video_id, language_code):
     return TranscriptSerializer(transcript).data if transcript else None
 
 
-def get_video_transcript_data(video_id, language_code):
+def get_video_transcript_data(video_id, language_code, decompress=True, output_format=None):
     """
     Get video transcript data
 
     Arguments:
         video_id(unicode): An id identifying the Video.
         language_code(unicode): it will be the language code of the requested transcript.
+        decompress(bool): If False, the content of compressed transcripts is returned as it is stored,
+            along with its `content_encoding`, e.g. to be served with an HTTP Content-Encoding.
+        output_format(unicode): Format the transcript is returned in, its own format by default. Stored
+            renditions are read as they are, other formats are converted from the transcript content.
 
     Returns:
         A dict containing transcript file name and its content.
+
+    Raises:
+        InvalidTranscriptFormat if `output_format` is not a supported transcript format.
     """
+    if output_format and output_format not in dict(TranscriptFormat.CHOICES):
+        raise InvalidTranscriptFormat(f'{output_format} transcript format is not supported')
+
     video_transcript = VideoTranscript.get_or_none(video_id, language_code)
     if video_transcript:
+        output_format = output_format or video_transcript.file_format
         try:
-            return dict(
-                file_name=video_transcript.filename,
-                content=video_transcript.transcript.file.read()
+            if output_format == video_transcript.file_format or output_format in video_transcript.renditions:
+                content = video_transcript.read_content(decompress=decompress, file_format=output_format)
+                content_encoding = video_transcript.content_encoding
+            else:
+                with video_transcript.map_content() as stored_content:
+                    content = Transcript.convert(
+                        stored_content,
+                        input_format=video_transcript.file_format,
+                        output_format=output_format
+                    ).encode('utf-8')
+                content_encoding = TranscriptContentEncoding.IDENTITY
+
+            transcript_data = dict(
+                file_name=video_transcript.get_filename(output_format),
+                content=content
             )
+            if not decompress:
+                transcript_data['content_encoding'] = content_encoding
+            return transcript_data
         except FileNotFoundError as f_err:
             err_msg = f"Transcript for video {video_id} not found: {f_err.filename}"
             logger.error(err_msg)
@@ -365,7 +844,9 @@ def create_video_transcript(video_id, language_code, file_format, content, provi
     raise ValCannotCreateError(transcript_serializer.errors)
 
 
-def create_or_update_video_transcript(video_id, language_code, metadata, file_data=None):
+def create_or_update_video_transcript(
+        video_id, language_code, metadata, file_data=None, content_hash=None, parsed_transcript=None
+):  # pylint: disable=too-many-positional-arguments
     """
     Create or Update video transcript for an existing video.
 
@@ -374,6 +855,9 @@ def create_or_update_video_transcript(video_id, language_code, metadata, file_da
         language_code: language code of a video transcript
         metadata (dict): A dict containing (to be overwritten) properties
         file_data (InMemoryUploadedFile): Transcript data to be saved for a course video.
+        content_hash (str): sha256 hash of `file_data` if it is already known, so that it is not read to compute it.
+        parsed_transcript (ParsedTranscript): `file_data` already parsed, so that renditions are converted
+            from its cues instead of parsing it again.
 
     Returns:
         video transcript url
@@ -396,7 +880,9 @@ def create_or_update_video_transcript(video_id, language_code, metadata, file_da
     try:
         # Video should be present in edxval in order to attach transcripts to it.
         video = Video.objects.get(edx_video_id=video_id)
-        video_transcript, __ = VideoTranscript.create_or_update(video, language_code, metadata, file_data)
+        video_transcript, __ = VideoTranscript.create_or_update(
+            video, language_code, metadata, file_data, content_hash=content_hash, parsed_transcript=parsed_transcript
+        )
     except Video.DoesNotExist:
         return None
 
@@ -441,10 +927,11 @@ def delete_video_transcript(video_id, language_code, provider=None):
             logger.info('Transcript provider "%s" does not match for video "%s" and language code "%s"',
                         provider, video_id, language_code)
             raise TranscriptNotFoundError('Transcript provider does not match, cannot delete the transcript.')
-        # delete the transcript content from storage.
-        video_transcript.transcript.delete()
+        file_names = [video_transcript.transcript.name] + list(video_transcript.renditions.values())
         # delete the transcript metadata from db.
         video_transcript.delete()
+        # delete the transcript content and its renditions from storage, unless other transcripts share them.
+        VideoTranscript.delete_unreferenced_files(file_names)
         logger.info('Transcript is removed for video "%s" and language code "%s"', video_id, language_code)
 
 
@@ -548,6 +1035,271 @@ def update_video_image(edx_video_id, course_id, image_data, file_name):
     return video_image.image_url()
 
 
+def create_video_file_upload(video_storage, file_name):
+    """
+    Issue an upload target for a new video image or transcript file, so that its content is uploaded
+    directly to the storage instead of through the application.
+
+    On S3 storages the target is a presigned url, on other storages it is the `video-file-upload`
+    view of VAL. The uploaded file is attached to a course video or a transcript by
+    `complete_video_image_upload` or `complete_video_transcript_upload`.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+        file_name (str): name of the file to upload, only its extension is kept
+
+    Returns:
+        dict with the `upload_id` to complete the upload with, the `url` and `method` to upload the
+        file content with, and the number of seconds the url is valid for as `expires_in`.
+    """
+    name = get_video_file_path(
+        video_storage, '{uuid}{ext}'.format(uuid=uuid4().hex, ext=os.path.splitext(file_name)[1])
+    )
+    upload_id = signing.dumps({'storage': video_storage, 'name': name}, salt=UPLOAD_ID_SALT)
+    url = get_presigned_upload_url(get_video_file_storage(video_storage), name, UPLOAD_EXPIRES_IN)
+    if url is None:
+        url = reverse('video-file-upload', kwargs={'upload_id': upload_id})
+
+    return {'upload_id': upload_id, 'url': url, 'method': 'PUT', 'expires_in': UPLOAD_EXPIRES_IN}
+
+
+def get_video_file_upload(upload_id, max_age=None):
+    """
+    Returns the storage and the name of the file an upload id was issued for by `create_video_file_upload`.
+
+    Arguments:
+        upload_id (str): upload id returned by `create_video_file_upload`
+        max_age (int): number of seconds after which the upload id expires, it never expires by default
+
+    Returns:
+        (video_storage, name) tuple
+
+    Raises:
+        ValCannotCreateError if the upload id is invalid or expired.
+    """
+    try:
+        upload = signing.loads(upload_id, salt=UPLOAD_ID_SALT, max_age=max_age)
+    except signing.BadSignature as error:
+        raise ValCannotCreateError(f'Invalid upload id: {error}') from error
+
+    return upload['storage'], upload['name']
+
+
+def _verify_video_file_upload(upload_id, video_storage, content_hash, size):
+    """
+    Moves the file of an upload to a new name chosen by VAL, verifies that it was uploaded with the
+    expected content, and returns its new name.
+
+    The upload target stays writable until it expires, so the file is moved before it is verified and
+    attached, and later uploads to the target cannot replace its content. Files which do not match
+    are deleted.
+
+    Raises:
+        ValCannotCreateError if the upload id is invalid or expired, or if the file is missing, too large
+        or does not match `content_hash` and `size`.
+    """
+    upload_storage, upload_name = get_video_file_upload(upload_id, max_age=UPLOAD_EXPIRES_IN)
+    if upload_storage != video_storage:
+        raise ValCannotCreateError(f'Upload id was not issued for {video_storage}')
+
+    storage = get_video_file_storage(video_storage)
+    if not storage.exists(upload_name):
+        raise ValCannotCreateError(f'Uploaded file {upload_name} not found')
+
+    max_bytes = get_video_file_max_bytes(video_storage)
+    stored_size = storage.size(upload_name)
+    if stored_size != size or (max_bytes and stored_size > max_bytes):
+        storage.delete(upload_name)
+        error_message = f'Uploaded file {upload_name} has an invalid size: {stored_size}'
+        logger.info('VAL: %s', error_message)
+        raise ValCannotCreateError(error_message)
+
+    name = get_video_file_path(
+        video_storage, '{uuid}{ext}'.format(uuid=uuid4().hex, ext=os.path.splitext(upload_name)[1])
+    )
+    with storage.open(upload_name, 'rb') as uploaded_file:
+        name = storage.save(name, uploaded_file)
+    storage.delete(upload_name)
+
+    stored_size = storage.size(name)
+    with storage.open(name, 'rb') as stored_file:
+        stored_hash = compute_content_hash(stored_file)
+    if stored_size == size and stored_hash == content_hash:
+        return name
+
+    storage.delete(name)
+    error_message = f'Uploaded file {upload_name} does not match its content hash'
+    logger.info('VAL: %s', error_message)
+    raise ValCannotCreateError(error_message)
+
+
+def complete_video_image_upload(upload_id, edx_video_id, course_id, content_hash, size):
+    """
+    Attach an image uploaded to the target issued by `create_video_file_upload` to a course video.
+
+    Arguments:
+        upload_id (str): upload id returned by `create_video_file_upload`
+        edx_video_id (str): edx video id
+        course_id (str): course id
+        content_hash (str): sha256 hash of the uploaded content
+        size (int): size of the uploaded content in bytes
+
+    As when image data is given to `update_video_image`, the replaced image file is deleted unless
+    other course videos use it.
+
+    Returns:
+        course video image url
+
+    Raises:
+        ValCannotCreateError if the uploaded file is not valid.
+        ValVideoNotFoundError if the CourseVideo cannot be retrieved.
+    """
+    name = _verify_video_file_upload(upload_id, VideoStorage.IMAGES, content_hash, size)
+    previous_image = VideoImage.objects.filter(
+        course_video__course_id=course_id, course_video__video__edx_video_id=edx_video_id
+    ).first()
+    replaced_name = ''
+    if previous_image and not VideoImage.is_image_shared(previous_image):
+        replaced_name = previous_image.image.name
+
+    image_url = update_video_image(edx_video_id, course_id, None, name)
+    if replaced_name != name:
+        StorageDeletion.delete_or_defer(VideoStorage.IMAGES, replaced_name)
+    return image_url
+
+
+def complete_video_transcript_upload(
+        upload_id, video_id, language_code, metadata, content_hash, size
+):  # pylint: disable=too-many-positional-arguments
+    """
+    Attach a transcript uploaded to the target issued by `create_video_file_upload` to a video.
+
+    Arguments:
+        upload_id (str): upload id returned by `create_video_file_upload`
+        video_id (str): edx video id
+        language_code (str): language code of the video transcript
+        metadata (dict): A dict containing the `provider` and `file_format` of the transcript
+        content_hash (str): sha256 hash of the uploaded content
+        size (int): size of the uploaded content in bytes
+
+    If COMPRESSION, RENDITIONS or CONTENT_ADDRESSED is set in the transcripts settings, the uploaded file is
+    stored again like transcript data given to `create_or_update_video_transcript`, then deleted.
+
+    Returns:
+        video transcript url, None if the video does not exist.
+
+    Raises:
+        ValCannotCreateError if the uploaded file is not valid.
+    """
+    name = _verify_video_file_upload(upload_id, VideoStorage.TRANSCRIPTS, content_hash, size)
+    transcripts_settings = get_video_storage_settings(VideoStorage.TRANSCRIPTS)
+    if any(transcripts_settings.get(key) for key in ('COMPRESSION', 'RENDITIONS', 'CONTENT_ADDRESSED')):
+        storage = get_video_file_storage(VideoStorage.TRANSCRIPTS)
+        with storage.open(name, 'rb') as uploaded_file:
+            transcript_url = create_or_update_video_transcript(
+                video_id, language_code, metadata, uploaded_file, content_hash=content_hash
+            )
+        storage.delete(name)
+        return transcript_url
+
+    transcript_url = create_or_update_video_transcript(video_id, language_code, dict(metadata, file_name=name))
+    VideoTranscript.objects.filter(
+        video__edx_video_id=video_id, language_code=language_code, transcript=name
+    ).update(content_hash=content_hash)
+    return transcript_url
+
+
+def update_generated_video_images(image_updates):
+    """
+    Set the auto generated image names of many course videos at once.
+
+    Course videos are resolved with one query and their VideoImage objects are created or updated
+    in bulk. As with `VideoImage.create_or_update`, the first generated image becomes the image of
+    course videos which have none yet. Invalid updates are reported in the results and do not prevent
+    the other updates.
+
+    Args:
+        image_updates (list): dicts with the `course_id`, `edx_video_id` and `generated_images`
+            (list of image names) of each course video
+
+    Returns:
+        (list): A result dict for each update, in the order of `image_updates`
+            {
+                course_id: ID of the course
+                edx_video_id: ID of the video
+                updated: whether the course video image was updated
+                message: why the course video image was not updated, only present if it was not
+            }
+    """
+    results = []
+    valid_updates = []
+    for image_update in image_updates:
+        if not isinstance(image_update, dict):
+            results.append({'course_id': None, 'edx_video_id': None, 'updated': False, 'message': 'Invalid data'})
+            continue
+
+        results.append({
+            'course_id': image_update.get('course_id'),
+            'edx_video_id': image_update.get('edx_video_id'),
+            'updated': False,
+        })
+        missing = [attr for attr in ('course_id', 'edx_video_id', 'generated_images') if attr not in image_update]
+        if missing:
+            results[-1]['message'] = '{missing} must be specified to update a video image.'.format(
+                missing=' and '.join(missing)
+            )
+            continue
+
+        try:
+            validate_generated_images(image_update['generated_images'], LIST_MAX_ITEMS)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            results[-1]['message'] = str(error)
+            continue
+
+        valid_updates.append((len(results) - 1, image_update))
+
+    course_videos = {}
+    if valid_updates:
+        course_video_filter = Q()
+        for __, image_update in valid_updates:
+            course_video_filter |= Q(
+                course_id=str(image_update['course_id']), video__edx_video_id=image_update['edx_video_id']
+            )
+        course_videos = {
+            (course_video.course_id, course_video.video.edx_video_id): course_video
+            for course_video in CourseVideo.objects.select_related('video', 'video_image').filter(course_video_filter)
+        }
+
+    new_video_images = {}
+    updated_video_images = {}
+    now = timezone.now()
+    for index, image_update in valid_updates:
+        course_id, generated_images = str(image_update['course_id']), image_update['generated_images']
+        course_video = course_videos.get((course_id, image_update['edx_video_id']))
+        if course_video is None:
+            results[index]['message'] = f'CourseVideo not found for course_id: {course_id}'
+            continue
+
+        if hasattr(course_video, 'video_image'):
+            video_image = course_video.video_image
+            video_image.modified = now
+            updated_video_images[video_image.id] = video_image
+        else:
+            video_image = new_video_images.setdefault(course_video.id, VideoImage(course_video=course_video))
+
+        video_image.generated_images = generated_images
+        if generated_images and not video_image.image.name:
+            video_image.image.name = generated_images[0]
+
+        results[index]['updated'] = True
+
+    with transaction.atomic():
+        VideoImage.objects.bulk_create(new_video_images.values())
+        VideoImage.objects.bulk_update(updated_video_images.values(), ['image', 'generated_images', 'modified'])
+
+    return results
+
+
 def create_profile(profile_name):
     """
     Used to create Profile objects in the database
@@ -1004,43 +1756,60 @@ def copy_course_videos(source_course_id, destination_course_id):
         course_id=str(source_course_id)
     )
 
-    for course_video in course_videos:
-        destination_course_video, __ = CourseVideo.objects.get_or_create(
-            video=course_video.video,
-            course_id=destination_course_id
-        )
-        if hasattr(course_video, 'video_image'):
-            VideoImage.create_or_update(
-                course_video=destination_course_video,
-                file_name=course_video.video_image.image.name
+    with transaction.atomic():
+        _bulk_set_course_videos([
+            (
+                course_video.video,
+                str(destination_course_id),
+                course_video.video_image.image.name if hasattr(course_video, 'video_image') else '',
             )
+            for course_video in course_videos
+        ])
+
+
+def _get_export_stamp(*instances):
+    """
+    Returns the most recent modification stamp of the given rows as an ISO 8601 string.
+    """
+    return max(instance.modified for instance in instances).isoformat()
 
 
-def export_to_xml(video_id, resource_fs, static_dir, course_id=None):
+def export_to_xml(video_id, resource_fs, static_dir, course_id=None, previous_manifest=None):
     """
     Exports data for a video into an xml object.
 
     NOTE: For external video ids, only transcripts information will be added into xml.
           If external=False, then edx_video_id is going to be on first index of the list.
 
+    Incremental export: every export returns a `manifest` entry describing the rows it was
+    generated from. If the entry returned by a previous export of the same video into the same
+    file system is passed back as `previous_manifest`, transcript files that have not changed
+    since then are reused as they are instead of being read from storage, converted and
+    rewritten, and `changed` is False when nothing about the video has changed.
+
     Arguments:
         video_id (str): Video id of the video to export transcripts.
         course_id (str): The ID of the course with which this video is associated.
         static_dir (str): The Directory to store transcript file.
         resource_fs (SubFS): Export file system.
+        previous_manifest (dict): Manifest entry returned by a previous export of this video.
 
     Returns:
-        An lxml video_asset element containing export data
+        A dict containing the lxml video_asset element, the exported transcript file names,
+        the manifest entry of this export and whether it differs from `previous_manifest`.
 
     Raises:
         ValVideoNotFoundError: if the video does not exist
     """
     video_image_name = ''
     video = _get_video(video_id)
+    encoded_videos = list(video.encoded_videos.all())
+    stamped_rows = [video] + encoded_videos
 
     try:
         course_video = CourseVideo.objects.select_related('video_image').get(course_id=course_id, video=video)
         video_image_name = course_video.video_image.image.name
+        stamped_rows.append(course_video.video_image)
     except ObjectDoesNotExist:
         pass
 
@@ -1052,7 +1821,7 @@ def export_to_xml(video_id, resource_fs, static_dir, course_id=None):
             'image': video_image_name
         }
     )
-    for encoded_video in video.encoded_videos.all():
+    for encoded_video in encoded_videos:
         SubElement(
             video_el,
             'encoded_video',
@@ -1062,13 +1831,28 @@ def export_to_xml(video_id, resource_fs, static_dir, course_id=None):
             }
         )
 
-    return create_transcripts_xml(video_id, video_el, resource_fs, static_dir)
+    previous_manifest = previous_manifest or {}
+    exported_metadata = create_transcripts_xml(
+        video_id, video_el, resource_fs, static_dir, previous_manifest.get('transcripts')
+    )
+    manifest = {
+        'edx_video_id': video.edx_video_id,
+        'modified': _get_export_stamp(*stamped_rows),
+        'encoded_videos': len(encoded_videos),
+        'image': video_image_name,
+        'transcripts': exported_metadata.pop('manifest'),
+    }
+    exported_metadata.update(manifest=manifest, changed=manifest != previous_manifest)
+    return exported_metadata
 
 
 def create_transcript_file(video_id, language_code, file_format, resource_fs, static_dir):
     """
     Writes transcript file to file system.
 
+    The transcript is written in SRT format. The stored SRT rendition of a transcript stored in `file_format`
+    is written as it is.
+
     Arguments:
         video_id (str): Video id of the video transcript file is attached.
         language_code (str): Language code of the transcript.
@@ -1080,11 +1864,18 @@ def create_transcript_file(video_id, language_code, file_format, resource_fs, st
         video_id=video_id,
         language_code=language_code
     )
-    transcript_data = get_video_transcript_data(video_id, language_code)
+    video_transcript = VideoTranscript.get_or_none(video_id, language_code)
+    if video_transcript and video_transcript.file_format == file_format:
+        transcript_data = get_video_transcript_data(video_id, language_code, output_format=Transcript.SRT)
+        input_format = Transcript.SRT
+    else:
+        transcript_data = get_video_transcript_data(video_id, language_code)
+        input_format = file_format
+
     if transcript_data:
         transcript_content = Transcript.convert(
             transcript_data['content'],
-            input_format=file_format,
+            input_format=input_format,
             output_format=Transcript.SRT
         )
         if not resource_fs.exists(static_dir):
@@ -1094,7 +1885,7 @@ def create_transcript_file(video_id, language_code, file_format, resource_fs, st
     return transcript_filename
 
 
-def create_transcripts_xml(video_id, video_el, resource_fs, static_dir):
+def create_transcripts_xml(video_id, video_el, resource_fs, static_dir, previous_manifest=None):
     """
     Creates xml for transcripts.
     For each transcript element, an associated transcript file is also created in course OLX.
@@ -1104,13 +1895,17 @@ def create_transcripts_xml(video_id, video_el, resource_fs, static_dir):
         video_el (Element): lxml Element object
         static_dir (str): The Directory to store transcript file.
         resource_fs (SubFS|WrapFS): The file system to store transcripts.
+        previous_manifest (dict): Transcripts manifest of a previous export, transcript files
+            which did not change since then and are still present are not written again.
 
     resource_fs is usually a SubFS, but can be a WrapFS in places like exporting olx through the olx_rest_api.
     This makes a difference because WrapFS does not have the _sub_dir attribute.
 
     Returns:
-        lxml Element object with transcripts information
+        A dict containing lxml Element object with transcripts information, the transcript
+        file names and the transcripts manifest.
     """
+    previous_manifest = previous_manifest or {}
     video_transcripts = VideoTranscript.objects.filter(video__edx_video_id=video_id).order_by('language_code')
     # create transcripts node only when we have transcripts for a video
     if video_transcripts.exists():
@@ -1132,24 +1927,40 @@ def create_transcripts_xml(video_id, video_el, resource_fs, static_dir):
             )
 
     transcript_files_map = {}
+    transcripts_manifest = {}
     for video_transcript in video_transcripts:
         language_code = video_transcript.language_code
         file_format = video_transcript.file_format
+        transcript_manifest = {
+            'modified': _get_export_stamp(video_transcript),
+            'name': video_transcript.transcript.name,
+            'content_hash': video_transcript.content_hash,
+        }
 
+        previous_file_name = previous_manifest.get(language_code, {}).get('file_name')
         try:
-            transcript_filename = create_transcript_file(
-                video_id=video_id,
-                language_code=language_code,
-                file_format=file_format,
-                resource_fs=resource_fs.delegate_fs(),
-                static_dir=static_file_dir
-            )
+            if (
+                previous_file_name and
+                previous_manifest[language_code] == dict(transcript_manifest, file_name=previous_file_name) and
+                resource_fs.delegate_fs().exists(combine(static_file_dir, previous_file_name))
+            ):
+                # Transcript did not change since the previous export, reuse the exported file.
+                transcript_filename = previous_file_name
+            else:
+                transcript_filename = create_transcript_file(
+                    video_id=video_id,
+                    language_code=language_code,
+                    file_format=file_format,
+                    resource_fs=resource_fs.delegate_fs(),
+                    static_dir=static_file_dir
+                )
             transcript_files_map[language_code] = transcript_filename
         except (TranscriptsGenerationException, TranscriptNotFoundError):
             # we don't want to halt export in this case, just log and move to the next transcript.
             logger.error('[VAL] Error while generating "%s" transcript for video["%s"].', language_code, video_id)
             continue
 
+        transcripts_manifest[language_code] = dict(transcript_manifest, file_name=transcript_filename)
         SubElement(
             transcripts_el,  # pylint: disable=possibly-used-before-assignment
             'transcript',
@@ -1160,11 +1971,68 @@ def create_transcripts_xml(video_id, video_el, resource_fs, static_dir):
             }
         )
 
-    return dict(xml=video_el, transcripts=transcript_files_map)
+    return dict(xml=video_el, transcripts=transcript_files_map, manifest=transcripts_manifest)
+
+
+class TranscriptImportSession:
+    """
+    Import file system shared by all the videos of a course import.
+
+    The import file system is opened once and every static directory is listed once into
+    an index of file names, so checking whether a transcript file exists does not need a
+    round trip to the file system.
+
+    Usage:
+        with TranscriptImportSession(resource_fs) as import_session:
+            for xml, edx_video_id in video_assets:
+                import_from_xml(xml, edx_video_id, resource_fs, static_dir, import_session=import_session)
+    """
+
+    def __init__(self, resource_fs):
+        """
+        Arguments:
+            resource_fs (OSFS): Import file system.
+        """
+        # File system should not start from /draft directory.
+        self.file_system = open_fs(resource_fs.root_path.split('/drafts')[0])
+        self._listings = {}
+
+    def get_listing(self, directory):
+        """
+        Returns the set of the names of the files in `directory`.
+        """
+        if directory not in self._listings:
+            try:
+                self._listings[directory] = {
+                    info.name for info in self.file_system.scandir(directory) if info.is_file
+                }
+            except ResourceNotFound:
+                self._listings[directory] = set()
+
+        return self._listings[directory]
+
+    def has_file(self, path):
+        """
+        Returns whether a file exists at `path` in the import file system.
+        """
+        directory, file_name = split(path)
+        return file_name in self.get_listing(directory)
+
+    def close(self):
+        """
+        Closes the import file system.
+        """
+        self.file_system.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 def import_from_xml(
-        xml, edx_video_id, resource_fs, static_dir, external_transcripts=None, course_id=None
+        xml, edx_video_id, resource_fs, static_dir, external_transcripts=None, course_id=None, import_session=None
 ):  # pylint: disable=too-many-positional-arguments
     """
     Imports data from a video_asset element about the given video_id.
@@ -1184,6 +2052,8 @@ def import_from_xml(
                 'es': ['Green_Arrow.srt']
             }
         course_id (str): The ID of a course to associate the video with
+        import_session (TranscriptImportSession): Import file system session shared by the videos of a course,
+            a new one is opened for this video if not given.
 
     Raises:
         ValCannotCreateError: if there is an error importing the video
@@ -1225,7 +2095,8 @@ def import_from_xml(
             edx_video_id,
             resource_fs,
             static_dir,
-            external_transcripts
+            external_transcripts,
+            import_session=import_session
         )
 
         return edx_video_id
@@ -1278,12 +2149,14 @@ def import_from_xml(
     else:
         edx_video_id = create_external_video('External Video')
 
-    create_transcript_objects(xml, edx_video_id, resource_fs, static_dir, external_transcripts)
+    create_transcript_objects(
+        xml, edx_video_id, resource_fs, static_dir, external_transcripts, import_session=import_session
+    )
     return edx_video_id
 
 
 def import_transcript_from_fs(
-        edx_video_id, language_code, file_name, provider, resource_fs, static_dir
+        edx_video_id, language_code, file_name, provider, resource_fs, static_dir, import_session=None
 ):  # pylint: disable=too-many-positional-arguments
     """
     Imports transcript file from file system and creates transcript record in DS.
@@ -1295,8 +2168,9 @@ def import_transcript_from_fs(
         provider (unicode): Transcript provider.
         resource_fs (OSFS): Import file system.
         static_dir (str): The Directory to retrieve transcript file.
+        import_session (TranscriptImportSession): If given, its file system and file index are used
+            instead of `resource_fs`.
     """
-    file_format = None
     existing_transcript = VideoTranscript.get_or_none(edx_video_id, language_code)
 
     # check if the transcript exists and if it does, make sure that overriding
@@ -1305,10 +2179,18 @@ def import_transcript_from_fs(
             not OVERRIDE_EXISTING_IMPORTED_TRANSCRIPTS.is_enabled()):
         return
 
+    file_path = combine(static_dir, file_name)
+    if import_session:
+        resource_fs = import_session.file_system
+
     # Read file from import file system and attach it to transcript record in DS.
     try:
-        with resource_fs.open(combine(static_dir, file_name), 'r', encoding='utf-8-sig') as f:
-            file_content = f.read()
+        if import_session and not import_session.has_file(file_path):
+            raise ResourceNotFound(file_path)
+
+        # The file is streamed to a spooled temporary file, which is hashed and sniffed on the way.
+        with resource_fs.open(file_path, 'r', encoding='utf-8-sig') as f:
+            spooled_file, content_hash, sniffed_format = spool_transcript_file(f)
     except ResourceNotFound:
         # Don't raise exception in case transcript file is not found in course OLX.
         logger.warning(
@@ -1328,43 +2210,43 @@ def import_transcript_from_fs(
         )
         return
 
-    # change file content to utf8
-    utf8_encoded_file_content = file_content.encode('utf-8')
-    new_transcript_content_file = ContentFile(utf8_encoded_file_content)
-
-    # check if transcript content already exists, and if it does, make sure
-    # the transcript isn't a duplicate transcript to the already existing one
-    if (existing_transcript and
-            is_duplicate_file(new_transcript_content_file, existing_transcript.transcript.file)):
-        return
+    with spooled_file:
+        # check if transcript content already exists, and if it does, make sure
+        # the transcript isn't a duplicate transcript to the already existing one
+        if existing_transcript and content_hash == existing_transcript.get_content_hash():
+            return
 
-    # Get file format from transcript content.
-    try:
-        file_format = get_transcript_format(file_content)
-    except Error:
-        # Don't raise exception, just don't create transcript record.
-        logger.warning(
-            '[edx-val] Error while getting transcript format for video=%s -- language_code=%s --file_name=%s',
-            edx_video_id,
-            language_code,
-            file_name
+        # Get file format from transcript content, its cues are reused to store renditions.
+        try:
+            parsed_transcript = parse_spooled_transcript(spooled_file, sniffed_format)
+        except Error:
+            # Don't raise exception, just don't create transcript record.
+            logger.warning(
+                '[edx-val] Error while getting transcript format for video=%s -- language_code=%s --file_name=%s',
+                edx_video_id,
+                language_code,
+                file_name
+            )
+            return
+
+        # Create transcript record.
+        create_or_update_video_transcript(
+            video_id=edx_video_id,
+            language_code=language_code,
+            metadata={
+                'provider': provider,
+                'file_format': parsed_transcript.file_format,
+                'language_code': language_code,
+            },
+            file_data=File(spooled_file, name=file_name),
+            content_hash=content_hash,
+            parsed_transcript=parsed_transcript,
         )
-        return
-
-    # Create transcript record.
-    create_or_update_video_transcript(
-        video_id=edx_video_id,
-        language_code=language_code,
-        metadata={
-            'provider': provider,
-            'file_format': file_format,
-            'language_code': language_code,
-        },
-        file_data=new_transcript_content_file,
-    )
 
 
-def create_transcript_objects(xml, edx_video_id, resource_fs, static_dir, external_transcripts):
+def create_transcript_objects(
+        xml, edx_video_id, resource_fs, static_dir, external_transcripts, import_session=None
+):  # pylint: disable=too-many-positional-arguments
     """
     Create VideoTranscript objects.
 
@@ -1380,41 +2262,63 @@ def create_transcript_objects(xml, edx_video_id, resource_fs, static_dir, extern
             'en': ['The_Flash.srt', 'Harry_Potter.srt'],
             'es': ['Green_Arrow.srt']
         }
+        import_session (TranscriptImportSession): Import file system session shared by the videos of a course.
+            If not given, the import file system is opened for this video and its transcript files are opened
+            directly, as listing the static directory for a single video would cost more than it saves.
+    """
+    if import_session is None:
+        # File system should not start from /draft directory.
+        with open_fs(resource_fs.root_path.split('/drafts')[0]) as file_system:
+            _import_transcripts(xml, edx_video_id, file_system, static_dir, external_transcripts)
+        return
+
+    _import_transcripts(
+        xml, edx_video_id, import_session.file_system, static_dir, external_transcripts, import_session=import_session
+    )
+
+
+def _import_transcripts(
+        xml, edx_video_id, file_system, static_dir, external_transcripts, import_session=None
+):  # pylint: disable=too-many-positional-arguments
     """
-    # File system should not start from /draft directory.
-    with open_fs(resource_fs.root_path.split('/drafts')[0]) as file_system:
-        # First import VAL transcripts.
-        for transcript in xml.findall('.//transcripts/transcript'):
-            try:
-                file_format = transcript.attrib['file_format']
-                language_code = transcript.attrib['language_code']
-                transcript_file_name = '{edx_video_id}-{language_code}.{file_format}'.format(
-                    edx_video_id=edx_video_id,
-                    language_code=language_code,
-                    file_format=file_format
-                )
+    Imports the VAL and external transcripts of a video from an opened import file system.
 
-                import_transcript_from_fs(
-                    edx_video_id=edx_video_id,
-                    language_code=transcript.attrib['language_code'],
-                    file_name=transcript_file_name,
-                    provider=transcript.attrib['provider'],
-                    resource_fs=file_system,
-                    static_dir=static_dir
-                )
-            except KeyError:
-                logger.warning(
-                    "VAL: Required attributes are missing from xml, xml=[%s]", etree.tostring(transcript).strip()
-                )
+    Arguments are the same as `create_transcript_objects`, `file_system` being the opened import file system.
+    """
+    # First import VAL transcripts.
+    for transcript in xml.findall('.//transcripts/transcript'):
+        try:
+            file_format = transcript.attrib['file_format']
+            language_code = transcript.attrib['language_code']
+            transcript_file_name = '{edx_video_id}-{language_code}.{file_format}'.format(
+                edx_video_id=edx_video_id,
+                language_code=language_code,
+                file_format=file_format
+            )
 
-        # This won't overwrite transcript for a language which is already present for the video.
-        for language_code, transcript_file_names in external_transcripts.items():
-            for transcript_file_name in transcript_file_names:
-                import_transcript_from_fs(
-                    edx_video_id=edx_video_id,
-                    language_code=language_code,
-                    file_name=transcript_file_name,
-                    provider=TranscriptProviderType.CUSTOM,
-                    resource_fs=file_system,
-                    static_dir=static_dir
-                )
+            import_transcript_from_fs(
+                edx_video_id=edx_video_id,
+                language_code=transcript.attrib['language_code'],
+                file_name=transcript_file_name,
+                provider=transcript.attrib['provider'],
+                resource_fs=file_system,
+                static_dir=static_dir,
+                import_session=import_session
+            )
+        except KeyError:
+            logger.warning(
+                "VAL: Required attributes are missing from xml, xml=[%s]", etree.tostring(transcript).strip()
+            )
+
+    # This won't overwrite transcript for a language which is already present for the video.
+    for language_code, transcript_file_names in external_transcripts.items():
+        for transcript_file_name in transcript_file_names:
+            import_transcript_from_fs(
+                edx_video_id=edx_video_id,
+                language_code=language_code,
+                file_name=transcript_file_name,
+                provider=TranscriptProviderType.CUSTOM,
+                resource_fs=file_system,
+                static_dir=static_dir,
+                import_session=import_session
+            )
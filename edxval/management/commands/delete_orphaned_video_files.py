@@ -0,0 +1,117 @@
+"""
+Management command to delete the video image and transcript files which are not referenced anymore.
+"""
+import logging
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from edxval.models import get_video_file_storage, iter_referenced_file_names
+from edxval.utils import VideoStorage, delete_files_from_storage, get_video_storage_settings, iter_storage_files
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Deletes the files under the DIRECTORY_PREFIX of the video image and transcript storages which no
+    VideoImage or VideoTranscript references.
+
+    The storage listing is streamed and compared against the set of referenced names, which is read from
+    the database in chunks. Orphaned files are deleted in batches, using bulk delete requests on S3 storages.
+    Recent files are kept, since they may belong to an upload whose database row is not committed yet.
+
+    Storages without a DIRECTORY_PREFIX are refused, since their listing would include every file of the
+    bucket or media root, unless the directory to clean up is given explicitly with `--prefix`.
+
+    Example:
+        ./manage.py delete_orphaned_video_files --storage video_transcripts --dry-run
+    """
+    help = 'Deletes the video image and transcript files which are not referenced in the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--storage',
+            choices=[video_storage for video_storage, __ in VideoStorage.CHOICES],
+            action='append',
+            help='Storage to clean up, all video storages by default.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the orphaned files without deleting them.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of orphaned files deleted at once.',
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=24,
+            help='Files modified more recently than this are kept.',
+        )
+        parser.add_argument(
+            '--prefix',
+            help='Directory to look for orphaned files in instead of the DIRECTORY_PREFIX of the storages.',
+        )
+
+    def handle(self, *args, **options):
+        video_storages = options['storage'] or [video_storage for video_storage, __ in VideoStorage.CHOICES]
+        directories = {}
+        for video_storage in video_storages:
+            directory = options['prefix']
+            if directory is None:
+                directory = get_video_storage_settings(video_storage).get('DIRECTORY_PREFIX', '')
+                if not directory.strip('/'):
+                    raise CommandError(
+                        f'{video_storage} has no DIRECTORY_PREFIX, pass --prefix to clean up the whole storage.'
+                    )
+            directories[video_storage] = directory
+
+        for video_storage, directory in directories.items():
+            self.clean_storage(video_storage, directory, options)
+
+    def clean_storage(self, video_storage, directory, options):
+        """
+        Deletes or reports the orphaned files under `directory` in a video storage.
+        """
+        storage = get_video_file_storage(video_storage)
+        referenced_names = set(iter_referenced_file_names(video_storage))
+        modified_before = timezone.now() - timedelta(hours=options['min_age_hours'])
+
+        orphaned_count = failed_count = 0
+        batch = []
+        for name, modified_time in iter_storage_files(storage, directory):
+            if name in referenced_names or modified_time > modified_before:
+                continue
+
+            orphaned_count += 1
+            if options['dry_run']:
+                self.stdout.write(f'Orphaned file in {video_storage}: {name}')
+                continue
+
+            batch.append(name)
+            if len(batch) >= options['batch_size']:
+                failed_count += self.delete_files(storage, video_storage, batch)
+                batch = []
+
+        if batch:
+            failed_count += self.delete_files(storage, video_storage, batch)
+
+        action = 'Found' if options['dry_run'] else 'Deleted'
+        message = f'{action} {orphaned_count - failed_count} orphaned files in {video_storage}, {failed_count} failed.'
+        logger.info('VAL: %s', message)
+        self.stdout.write(message)
+
+    def delete_files(self, storage, video_storage, names):
+        """
+        Deletes a batch of orphaned files and returns the number of files which could not be deleted.
+        """
+        errors = delete_files_from_storage(storage, names)
+        for name, error in errors.items():
+            logger.warning('VAL: Failed to delete orphaned file [%s] from [%s]: %s', name, video_storage, error)
+        return len(errors)
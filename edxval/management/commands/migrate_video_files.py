@@ -0,0 +1,224 @@
+"""
+Management command to copy the video image and transcript files from another storage backend.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from edxval.models import StorageMigration, get_video_file_field
+from edxval.utils import (
+    VideoStorage,
+    compute_content_hash,
+    compute_stored_file_hash,
+    decompress_transcript_content,
+    get_configured_storage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Throttle:
+    """
+    Limits the rate at which the threads sharing it proceed.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_time = 0
+
+    def wait(self):
+        """
+        Blocks until the calling thread may proceed.
+        """
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Command(BaseCommand):
+    """
+    Copies the files referenced by VideoImage or VideoTranscript rows, including generated images and transcript
+    renditions, from a source storage backend to the storage configured for them, keeping their names.
+
+    Files are copied by a bounded thread pool and verified against the stored content hash of transcripts,
+    computed over their uncompressed content, or against the source size when there is none. The rows are
+    processed in primary key order and the last processed row is checkpointed in the StorageMigration table
+    after each batch along with the files which failed, so running the command again with the same `--name`
+    retries the failed files and resumes the migration. Files already present in the destination with the
+    same size are skipped.
+
+    Example:
+        ./manage.py migrate_video_files --name fs-to-s3 --storage video_transcripts \
+            --source-storage-class django.core.files.storage.FileSystemStorage \
+            --source-storage-kwargs '{"location": "/edx/var/edxapp/media"}' --workers 32 --max-rate 200
+    """
+    help = 'Copies the video image and transcript files from another storage backend to the configured storage.'
+
+    source = None
+    destination = None
+    throttle = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--name',
+            required=True,
+            help='Name identifying the migration, used to resume it.',
+        )
+        parser.add_argument(
+            '--storage',
+            required=True,
+            choices=[video_storage for video_storage, __ in VideoStorage.CHOICES],
+            help='Storage whose files are copied.',
+        )
+        parser.add_argument(
+            '--source-storage-class',
+            required=True,
+            help='Dotted path of the storage class files are copied from.',
+        )
+        parser.add_argument(
+            '--source-storage-kwargs',
+            default='{}',
+            help='JSON encoded keyword arguments of the source storage class.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows processed between checkpoints.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of files copied in parallel.',
+        )
+        parser.add_argument(
+            '--max-rate',
+            type=float,
+            default=0,
+            help='Maximum number of files copied per second, unlimited by default.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source_kwargs = json.loads(options['source_storage_kwargs'])
+        except ValueError as error:
+            raise CommandError(f'Invalid --source-storage-kwargs: {error}') from error
+
+        video_storage = options['storage']
+        self.source = import_string(options['source_storage_class'])(**source_kwargs)
+        self.destination = get_configured_storage(VideoStorage.SETTINGS_KEYS[video_storage])
+        self.throttle = Throttle(options['max_rate'])
+
+        migration, __ = StorageMigration.objects.get_or_create(name=options['name'], storage=video_storage)
+        model, field_name = get_video_file_field(video_storage)
+        if video_storage == VideoStorage.TRANSCRIPTS:
+            fields = ['id', field_name, 'content_hash', 'content_encoding', 'renditions']
+        else:
+            fields = ['id', field_name, 'generated_images']
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            # Files which failed in previous runs are retried first.
+            failed_files, migration.failed_files = migration.failed_files, {}
+            self.copy_files(executor, migration, failed_files)
+            migration.save()
+
+            batch_size = options['batch_size']
+            while True:
+                remaining_rows = model.objects.filter(id__gt=migration.last_id).order_by('id')
+                rows = list(remaining_rows.values(*fields)[:batch_size])
+                if not rows:
+                    break
+
+                # Files shared by many rows, like images of re-run courses, are copied once.
+                files = {}
+                for row in rows:
+                    if row[field_name]:
+                        files[row[field_name]] = (row.get('content_hash', ''), row.get('content_encoding', ''))
+                    # Transcript renditions and generated images have no content hash and are verified by size.
+                    for rendition_name in (row.get('renditions') or {}).values():
+                        files[rendition_name] = ('', row['content_encoding'])
+                    for generated_image in row.get('generated_images') or []:
+                        files.setdefault(generated_image, ('', ''))
+                self.copy_files(executor, migration, files)
+
+                migration.last_id = rows[-1]['id']
+                migration.save()
+
+        message = (
+            f'Migration {migration.name} of {video_storage}: {migration.copied_count} files copied, '
+            f'{migration.skipped_count} skipped, {migration.failed_count} failed.'
+        )
+        logger.info('VAL: %s', message)
+        self.stdout.write(message)
+
+    def copy_files(self, executor, migration, files):
+        """
+        Copies files in parallel and records the results in the migration.
+
+        Arguments:
+            files (dict): content hash and encoding of the files to copy, keyed by name
+        """
+        for (name, file_info), result in zip(
+                files.items(), executor.map(lambda file: self.copy_file(file[0], *file[1]), files.items())
+        ):
+            migration.copied_count += result == 'copied'
+            migration.skipped_count += result == 'skipped'
+            if result == 'failed':
+                migration.failed_files[name] = list(file_info)
+        migration.failed_count = len(migration.failed_files)
+
+    def copy_file(self, name, content_hash, content_encoding=''):
+        """
+        Copies a file from the source to the destination storage and verifies the copy.
+
+        Returns:
+            'copied', 'skipped' or 'failed'
+        """
+        try:
+            size = self.source.size(name)
+            if self.destination.exists(name):
+                if self.destination.size(name) == size:
+                    return 'skipped'
+                self.destination.delete(name)
+
+            self.throttle.wait()
+            with self.source.open(name, 'rb') as source_file:
+                saved_name = self.destination.save(name, source_file)
+
+            if saved_name != name:
+                raise ValueError(f'file was saved as {saved_name}')
+
+            if content_hash and content_encoding:
+                with self.destination.open(name, 'rb') as destination_file:
+                    content = decompress_transcript_content(destination_file.read(), content_encoding)
+                verified = compute_content_hash(ContentFile(content)) == content_hash
+            elif content_hash:
+                verified = compute_stored_file_hash(self.destination, name) == content_hash
+            else:
+                verified = self.destination.size(name) == size
+
+            if not verified:
+                # The copy is deleted so that it is not skipped when the file is retried.
+                self.destination.delete(name)
+                raise ValueError('copy does not match the source')
+
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception('VAL: Failed to migrate [%s]', name)
+            return 'failed'
+
+        return 'copied'
@@ -0,0 +1,98 @@
+"""
+Management command to delete the video image and transcript files queued for deletion.
+"""
+import logging
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from edxval.models import StorageDeletion, VideoTranscript, get_video_file_storage
+from edxval.utils import VideoStorage, delete_files_from_storage
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Deletes the files queued for deletion from the video image and transcript storages.
+
+    Files are deleted in batches, using bulk delete requests on S3 storages. Files which could not be
+    deleted stay in the queue and are retried on the next run, until `--max-attempts` is reached.
+    Content addressed transcript files which are referenced again are removed from the queue without
+    being deleted.
+
+    Example:
+        ./manage.py process_storage_deletions --batch-size 1000 --max-attempts 5
+    """
+    help = 'Deletes the video image and transcript files queued for deletion from their storages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of queued files deleted at once.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Queued files which failed to be deleted this many times are not retried.',
+        )
+
+    def handle(self, *args, **options):
+        deleted_count = failed_count = 0
+        last_id = 0
+        while True:
+            deletions = list(
+                StorageDeletion.objects.filter(
+                    id__gt=last_id, attempts__lt=options['max_attempts']
+                ).order_by('id')[:options['batch_size']]
+            )
+            if not deletions:
+                break
+
+            last_id = deletions[-1].id
+            failed_deletions = self.process_batch(deletions)
+            deleted_count += len(deletions) - len(failed_deletions)
+            failed_count += len(failed_deletions)
+
+        logger.info('VAL: Deleted [%s] queued files, [%s] failed', deleted_count, failed_count)
+        self.stdout.write(f'Deleted {deleted_count} queued files, {failed_count} failed.')
+
+    def process_batch(self, deletions):
+        """
+        Deletes the files of a batch of queued deletions and updates the queue.
+
+        Returns:
+            The queued deletions which failed.
+        """
+        deletions_by_storage = defaultdict(list)
+        for deletion in deletions:
+            deletions_by_storage[deletion.storage].append(deletion)
+
+        failed_deletions = []
+        for video_storage, storage_deletions in deletions_by_storage.items():
+            names = {deletion.name for deletion in storage_deletions}
+            if video_storage == VideoStorage.TRANSCRIPTS:
+                # A content addressed transcript may have been stored again since its deletion was queued.
+                names = {name for name in names if not VideoTranscript.is_shared_file_referenced(name)}
+
+            errors = delete_files_from_storage(get_video_file_storage(video_storage), list(names))
+            for deletion in storage_deletions:
+                if deletion.name in errors:
+                    deletion.attempts += 1
+                    deletion.last_error = errors[deletion.name]
+                    deletion.modified = timezone.now()
+                    failed_deletions.append(deletion)
+                    logger.warning(
+                        'VAL: Failed to delete [%s] from [%s]: %s', deletion.name, video_storage, deletion.last_error
+                    )
+
+        failed_ids = {deletion.id for deletion in failed_deletions}
+        StorageDeletion.objects.filter(
+            id__in=[deletion.id for deletion in deletions if deletion.id not in failed_ids]
+        ).delete()
+        StorageDeletion.objects.bulk_update(failed_deletions, ['attempts', 'last_error', 'modified'])
+        return failed_deletions
@@ -0,0 +1,134 @@
+"""
+Management command to move the video image and transcript files stored in a flat layout to sharded paths.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from edxval.models import StorageDeletion, get_video_file_field, get_video_file_storage, iter_referenced_file_names
+from edxval.utils import VideoStorage, get_sharded_name, get_video_storage_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Moves the files stored directly under the DIRECTORY_PREFIX of the video storages which have SHARDED_PATHS
+    enabled to their sharded paths, and updates the VideoImage and VideoTranscript rows referencing them,
+    including generated images and transcript renditions.
+
+    Files are copied in parallel, then the rows are updated and the old files deleted, or queued for deletion
+    if DEFER_DELETION is enabled, once no row references them anymore. The command can be interrupted and run
+    again, files already moved are skipped.
+
+    Example:
+        ./manage.py shard_video_files --storage video_transcripts --workers 16
+    """
+    help = 'Moves the video image and transcript files stored in a flat layout to sharded paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--storage',
+            choices=[video_storage for video_storage, __ in VideoStorage.CHOICES],
+            action='append',
+            help='Storage whose files are moved, all video storages with SHARDED_PATHS enabled by default.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the files which would be moved.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of files moved before their rows are updated.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of files copied in parallel.',
+        )
+
+    def handle(self, *args, **options):
+        video_storages = options['storage'] or [video_storage for video_storage, __ in VideoStorage.CHOICES]
+        for video_storage in video_storages:
+            if not get_video_storage_settings(video_storage).get('SHARDED_PATHS'):
+                self.stdout.write(f'SHARDED_PATHS is not enabled for {video_storage}, skipping.')
+                continue
+
+            self.shard_storage(video_storage, options)
+
+    def iter_flat_names(self, video_storage):
+        """
+        Yields the referenced names of a video storage which are not sharded yet, each of them once.
+        """
+        prefix = get_video_storage_settings(video_storage).get('DIRECTORY_PREFIX', '')
+        seen_names = set()
+        for name in iter_referenced_file_names(video_storage):
+            filename = name[len(prefix):]
+            if name.startswith(prefix) and '/' not in filename and name not in seen_names:
+                seen_names.add(name)
+                yield name, f'{prefix}{get_sharded_name(filename)}'
+
+    def shard_storage(self, video_storage, options):
+        """
+        Moves the files of a video storage to sharded paths, one batch at a time.
+        """
+        storage = get_video_file_storage(video_storage)
+        moved_count = failed_count = 0
+        batch = []
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for old_name, new_name in self.iter_flat_names(video_storage):
+                if options['dry_run']:
+                    self.stdout.write(f'Would move {old_name} to {new_name} in {video_storage}')
+                    continue
+
+                batch.append((old_name, new_name))
+                if len(batch) >= options['batch_size']:
+                    moved, failed = self.move_files(executor, storage, video_storage, batch)
+                    moved_count, failed_count = moved_count + moved, failed_count + failed
+                    batch = []
+
+            if batch:
+                moved, failed = self.move_files(executor, storage, video_storage, batch)
+                moved_count, failed_count = moved_count + moved, failed_count + failed
+
+        message = f'Moved {moved_count} files to sharded paths in {video_storage}, {failed_count} failed.'
+        logger.info('VAL: %s', message)
+        self.stdout.write(message)
+
+    def move_files(self, executor, storage, video_storage, names):
+        """
+        Copies a batch of files in parallel, then points their rows to the copies and deletes the old files
+        which are not referenced anymore.
+
+        Returns:
+            (moved, failed) numbers of files
+        """
+        def copy_file(old_name, new_name):
+            try:
+                with storage.open(old_name) as old_file:
+                    return old_name, storage.save(new_name, old_file)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception('VAL: Failed to copy [%s] to [%s] in [%s]', old_name, new_name, video_storage)
+                return old_name, None
+
+        model, __ = get_video_file_field(video_storage)
+        failed = 0
+        for old_name, new_name in executor.map(lambda names: copy_file(*names), names):
+            if new_name is None:
+                failed += 1
+                continue
+
+            model.rename_file(old_name, new_name)
+            # A row may have started referencing the old name while it was copied.
+            if model.is_file_referenced(old_name):
+                logger.warning('VAL: [%s] is still referenced in [%s], it is not deleted', old_name, video_storage)
+                continue
+
+            StorageDeletion.delete_or_defer(video_storage, old_name)
+
+        return len(names) - failed, failed
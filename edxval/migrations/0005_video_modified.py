@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0004_add_edx_ai_translations_provider'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
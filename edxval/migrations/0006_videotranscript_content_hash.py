@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0005_video_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videotranscript',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA256 hash of the transcript content, empty if the content is not known.', max_length=64),
+        ),
+    ]
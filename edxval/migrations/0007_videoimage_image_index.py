@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:57
+
+import edxval.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0006_videotranscript_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='videoimage',
+            name='image',
+            field=edxval.models.CustomizableImageField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:59
+
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0007_videoimage_image_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('storage', models.CharField(choices=[('video_images', 'Video images'), ('video_transcripts', 'Video transcripts')], max_length=20)),
+                ('name', models.CharField(help_text='Name of the file in its storage', max_length=500)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of failed attempts to delete the file')),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:17
+
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0008_storagedeletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageMigration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('name', models.CharField(help_text='Name identifying the migration', max_length=255)),
+                ('storage', models.CharField(choices=[('video_images', 'Video images'), ('video_transcripts', 'Video transcripts')], max_length=20)),
+                ('last_id', models.PositiveIntegerField(default=0, help_text='Primary key of the last processed row')),
+                ('copied_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0, help_text='Files already present in the destination')),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('name', 'storage')},
+            },
+        ),
+    ]
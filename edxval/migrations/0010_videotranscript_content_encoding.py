@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0009_storagemigration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videotranscript',
+            name='content_encoding',
+            field=models.CharField(blank=True, choices=[('', 'Uncompressed'), ('gzip', 'gzip')], default='', help_text='Encoding the transcript file is stored with, empty if it is not compressed.', max_length=20),
+        ),
+    ]
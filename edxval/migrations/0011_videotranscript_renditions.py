@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0010_videotranscript_content_encoding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videotranscript',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Names of the files the transcript is also stored as in other formats, keyed by format.'),
+        ),
+    ]
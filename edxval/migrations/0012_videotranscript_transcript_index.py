@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:30
+
+import edxval.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0011_videotranscript_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='videotranscript',
+            name='transcript',
+            field=edxval.models.CustomizableFileField(blank=True, db_index=True, null=True),
+        ),
+    ]
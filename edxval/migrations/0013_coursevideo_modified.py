@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0012_videotranscript_transcript_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursevideo',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0013_coursevideo_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storagemigration',
+            name='failed_files',
+            field=models.JSONField(blank=True, default=dict, help_text='Content hash and encoding of the files which could not be copied yet, keyed by name'),
+        ),
+        migrations.AlterField(
+            model_name='storagemigration',
+            name='failed_count',
+            field=models.PositiveIntegerField(default=0, help_text='Files which could not be copied yet'),
+        ),
+    ]
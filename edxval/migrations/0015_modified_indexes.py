@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edxval', '0014_storagemigration_failed_files'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='coursevideo',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='encodedvideo',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='videoimage',
+            index=models.Index(fields=['modified'], name='edxval_vide_modifie_313680_idx'),
+        ),
+    ]
@@ -10,23 +10,43 @@ nested serialization errors, or any similar errors will be returned by
 themselves. After these are resolved, errors such as a negative file_size or
 invalid profile_name will be returned.
 """
+import hashlib
 import json
 import logging
 import os
-from contextlib import closing
+from collections import defaultdict
+from contextlib import closing, contextmanager
 from uuid import uuid4
 
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
+from django.db.models.functions import Cast
 from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from model_utils.models import TimeStampedModel
 
+from edxval.exceptions import TranscriptsGenerationException
+from edxval.transcript_utils import Transcript
 from edxval.utils import (
+    TranscriptContentEncoding,
     TranscriptFormat,
+    VideoStorage,
+    compress_transcript_content,
+    compute_content_hash,
+    compute_stored_file_hash,
+    decompress_transcript_content,
+    get_transcript_content_encoding,
+    get_transcript_file_format,
+    get_transcript_file_name,
     get_video_image_storage,
+    get_video_storage_settings,
     get_video_transcript_storage,
+    is_content_addressed_file_name,
+    iter_file_chunks,
+    map_stored_file,
     validate_generated_images,
     video_image_path,
     video_transcript_path,
@@ -37,6 +57,15 @@ logger = logging.getLogger(__name__)
 URL_REGEX = '^[a-zA-Z0-9\\-_]*$'
 LIST_MAX_ITEMS = 3
 EXTERNAL_VIDEO_STATUS = 'external'
+VALID_VIDEO_STATUSES = [
+    'file_complete',
+    'partial_failure',
+    'pipeline_error',
+    'transcription_in_progress',
+    'transcript_failed',
+    'transcript_ready',
+    'transcode_active',
+]
 
 
 class ModelFactoryWithValidation:
@@ -106,6 +135,8 @@ class Video(models.Model):
     .. no_pii:
     """
     created = models.DateTimeField(auto_now_add=True)
+    # Indexed, as are the `modified` columns of related models, for the ETags of video API responses.
+    modified = models.DateTimeField(auto_now=True, db_index=True)
     edx_video_id = models.CharField(
         max_length=100,
         unique=True,
@@ -167,6 +198,7 @@ class CourseVideo(models.Model, ModelFactoryWithValidation):
     course_id = models.CharField(max_length=255)
     video = models.ForeignKey(Video, related_name='courses', on_delete=models.CASCADE)
     is_hidden = models.BooleanField(default=False, help_text='Hide video for course.')
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         """
@@ -194,7 +226,7 @@ class EncodedVideo(models.Model):
     .. no_pii:
     """
     created = models.DateTimeField(auto_now_add=True)
-    modified = models.DateTimeField(auto_now=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
     url = models.CharField(max_length=200)
     file_size = models.PositiveIntegerField()
     bitrate = models.PositiveIntegerField()
@@ -202,6 +234,58 @@ class EncodedVideo(models.Model):
     profile = models.ForeignKey(Profile, related_name="+", on_delete=models.CASCADE)
     video = models.ForeignKey(Video, related_name="encoded_videos", on_delete=models.CASCADE)
 
+    SYNCED_FIELDS = ('url', 'file_size', 'bitrate')
+
+    @classmethod
+    def sync(cls, encoded_videos_by_video):
+        """
+        Make the encoded videos of each video match the given ones, using the profile as identity.
+
+        Changed encoded videos are updated in bulk, new ones are created and only the ones which are
+        no longer given are deleted, so unchanged rows keep their timestamps and nothing is written
+        when nothing changed.
+
+        Arguments:
+            encoded_videos_by_video (dict): Maps Video objects to lists of encoded video dicts
+                containing `profile` (Profile), `url`, `file_size` and `bitrate`.
+
+        Returns:
+            True if any encoded video was written.
+        """
+        existing_encoded_videos = defaultdict(dict)
+        removed_ids = []
+        for encoded_video in cls.objects.filter(video__in=list(encoded_videos_by_video)):
+            if encoded_video.profile_id in existing_encoded_videos[encoded_video.video_id]:
+                removed_ids.append(encoded_video.id)
+            else:
+                existing_encoded_videos[encoded_video.video_id][encoded_video.profile_id] = encoded_video
+
+        new_encoded_videos = []
+        updated_encoded_videos = []
+        now = timezone.now()
+        for video, encoded_videos in encoded_videos_by_video.items():
+            video_encoded_videos = existing_encoded_videos.pop(video.id, {})
+            for encoded_video_data in encoded_videos:
+                encoded_video = video_encoded_videos.pop(encoded_video_data['profile'].id, None)
+                if encoded_video is None:
+                    new_encoded_videos.append(cls(video=video, **encoded_video_data))
+                elif any(getattr(encoded_video, field) != encoded_video_data[field] for field in cls.SYNCED_FIELDS):
+                    for field in cls.SYNCED_FIELDS:
+                        setattr(encoded_video, field, encoded_video_data[field])
+                    encoded_video.modified = now
+                    updated_encoded_videos.append(encoded_video)
+
+            removed_ids.extend(encoded_video.id for encoded_video in video_encoded_videos.values())
+
+        if removed_ids:
+            cls.objects.filter(id__in=removed_ids).delete()
+        if updated_encoded_videos:
+            cls.objects.bulk_update(updated_encoded_videos, cls.SYNCED_FIELDS + ('modified',))
+        if new_encoded_videos:
+            cls.objects.bulk_create(new_encoded_videos)
+
+        return bool(removed_ids or updated_encoded_videos or new_encoded_videos)
+
     def __str__(self):
         return str(self.id)
 
@@ -312,9 +396,57 @@ class VideoImage(TimeStampedModel):
     .. no_pii:
     """
     course_video = models.OneToOneField(CourseVideo, related_name="video_image", on_delete=models.CASCADE)
-    image = CustomizableImageField()
+    # Indexed so that checking whether an image file is shared by other course videos is a lookup.
+    image = CustomizableImageField(db_index=True)
     generated_images = ListField()
 
+    class Meta:
+        """
+        Indexed by modification date for the ETags of video API responses.
+        """
+        indexes = [models.Index(fields=['modified'])]
+
+    @classmethod
+    def is_image_shared(cls, video_image):
+        """
+        Returns whether the image file of `video_image` is used by any other VideoImage.
+
+        After a course re-run, the videos of both courses point to the same image file.
+        """
+        return cls.objects.filter(image=video_image.image).exclude(pk=video_image.pk).exists()
+
+    @classmethod
+    def filter_generated_image(cls, name):
+        """
+        Returns the VideoImage rows listing an image file in their generated images.
+        """
+        return cls.objects.annotate(
+            generated_images_json=Cast('generated_images', models.TextField())
+        ).filter(generated_images_json__contains=json.dumps(name))
+
+    @classmethod
+    def is_file_referenced(cls, name):
+        """
+        Returns whether an image file is used by any VideoImage, as its image or one of its generated images.
+        """
+        return cls.objects.filter(image=name).exists() or cls.filter_generated_image(name).exists()
+
+    @classmethod
+    def rename_file(cls, old_name, new_name):
+        """
+        Points the VideoImage rows referencing an image file, as their image or a generated image, to its new name.
+        """
+        now = timezone.now()
+        cls.objects.filter(image=old_name).update(image=new_name, modified=now)
+
+        video_images = list(cls.filter_generated_image(old_name))
+        for video_image in video_images:
+            video_image.generated_images = [
+                new_name if name == old_name else name for name in video_image.generated_images
+            ]
+            video_image.modified = now
+        cls.objects.bulk_update(video_images, ['generated_images', 'modified'])
+
     @classmethod
     def create_or_update(cls, course_video, file_name=None, image_data=None, generated_images=None):
         """
@@ -341,8 +473,8 @@ class VideoImage(TimeStampedModel):
             # after a course re-run, a video in original course and the new course points to same image, So when
             # we update an image in new course and delete the existing image. This will delete the image from
             # original course as well, thus leaving video with having no image.
-            if not created and VideoImage.objects.filter(image=video_image.image).count() == 1:
-                video_image.image.delete()
+            if not created and not cls.is_image_shared(video_image):
+                StorageDeletion.delete_or_defer(VideoStorage.IMAGES, video_image.image.name)
 
             with closing(image_data) as image_file:
                 file_name = '{uuid}{ext}'.format(uuid=uuid4().hex, ext=os.path.splitext(file_name)[1])
@@ -440,7 +572,7 @@ class VideoTranscript(TimeStampedModel):
     .. no_pii:
     """
     video = models.ForeignKey(Video, related_name='video_transcripts', null=True, on_delete=models.CASCADE)
-    transcript = CustomizableFileField()
+    transcript = CustomizableFileField(db_index=True)
     language_code = models.CharField(max_length=50, db_index=True)
     provider = models.CharField(
         max_length=30,
@@ -448,6 +580,24 @@ class VideoTranscript(TimeStampedModel):
         default=TranscriptProviderType.CUSTOM,
     )
     file_format = models.CharField(max_length=20, db_index=True, choices=TranscriptFormat.CHOICES)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text='SHA256 hash of the transcript content, empty if the content is not known.'
+    )
+    content_encoding = models.CharField(
+        max_length=20,
+        blank=True,
+        default=TranscriptContentEncoding.IDENTITY,
+        choices=TranscriptContentEncoding.CHOICES,
+        help_text='Encoding the transcript file is stored with, empty if it is not compressed.'
+    )
+    renditions = models.JSONField(
+        blank=True,
+        default=dict,
+        help_text='Names of the files the transcript is also stored as in other formats, keyed by format.'
+    )
 
     class Meta:
         unique_together = ('video', 'language_code')
@@ -457,36 +607,206 @@ class VideoTranscript(TimeStampedModel):
         """
         Returns readable filename for a transcript
         """
+        return self.get_filename()
+
+    def get_filename(self, file_format=None):
+        """
+        Returns readable filename for a transcript in the given format, its own format by default.
+        """
         client_id, __ = os.path.splitext(self.video.client_video_id)
         file_name = '{name}-{language}.{format}'.format(
             name=client_id,
             language=self.language_code,
-            format=self.file_format
+            format=file_format or self.file_format
         ).replace('\n', ' ')
 
         return file_name
 
-    def save_transcript(self, file_data, file_format, file_name=None):
+    def save_transcript(self, file_data, file_format, file_name=None, content_hash=None, parsed_transcript=None):
         """
         Saves Transcript Content to a Video Transcript File
 
+        The content is compressed if COMPRESSION is set in the transcripts settings, generated
+        names of compressed files get a `.gz` extension so that storages serve them with a gzip
+        `Content-Encoding`. The content is also converted to and stored in the formats listed in
+        RENDITIONS, so that reading it in another format does not need a conversion.
+
+        If CONTENT_ADDRESSED is set, generated names are the content hash instead of a uuid, and
+        content which is already stored is not uploaded again but shared with the transcripts using it.
+
         Arguments:
             file_data(InMemoryUploadedFile): Transcript content.
             file_format(unicode): Transcript file format.
+            content_hash(unicode): Content hash of `file_data` if it is already known, computed otherwise.
+            parsed_transcript(ParsedTranscript): `file_data` parsed if it already is, parsed again otherwise
+                when renditions are stored.
         """
+        content_encoding = get_transcript_content_encoding() if file_data else TranscriptContentEncoding.IDENTITY
+        content_addressed = bool(
+            file_data and not file_name and
+            get_video_storage_settings(VideoStorage.TRANSCRIPTS).get('CONTENT_ADDRESSED')
+        )
+        previous_renditions = list(self.renditions.values())
+
+        if file_data:
+            self.content_hash = content_hash or compute_content_hash(file_data)
+            self.content_encoding = content_encoding
+
         # generate transcript file name if not already given
         if not file_name:
-            file_name = '{uuid}.{ext}'.format(uuid=uuid4().hex, ext=file_format)
+            file_name = get_transcript_file_name(
+                self.content_hash if content_addressed else uuid4().hex, file_format, content_encoding
+            )
 
         # save the transcript file
         if file_data:
-            self.transcript.save(file_name, file_data)
+            self.renditions = self.save_renditions(file_data, file_format, content_addressed, parsed_transcript)
+            stored_name = self.get_stored_file_name(file_name) if content_addressed else None
+            if stored_name:
+                self.transcript.name = stored_name
+            else:
+                if content_encoding == TranscriptContentEncoding.GZIP:
+                    file_data = ContentFile(compress_transcript_content(file_data))
+                self.transcript.save(file_name, file_data, save=False)
         else:
+            if self.transcript.name != file_name:
+                self.content_hash = ''
+                self.content_encoding = TranscriptContentEncoding.IDENTITY
+                self.renditions = {}
             self.transcript.name = file_name
 
         # save the object
         self.save()
 
+        VideoTranscript.delete_unreferenced_files(set(previous_renditions) - set(self.renditions.values()))
+
+    def save_renditions(self, file_data, file_format, content_addressed=False, parsed_transcript=None):
+        """
+        Stores the transcript content converted to the formats listed in the RENDITIONS transcripts setting.
+
+        The content is parsed once for all the renditions, or not at all if it is already parsed.
+        Renditions are stored with the same `content_encoding` as the transcript file. Content which
+        cannot be converted is logged and stored without renditions.
+
+        Arguments:
+            file_data(File): Transcript content.
+            file_format(unicode): Transcript file format.
+            content_addressed(bool): Whether renditions are named after their content hash.
+            parsed_transcript(ParsedTranscript): `file_data` already parsed, if it is.
+
+        Returns:
+            dict of the names of the stored renditions, keyed by format.
+        """
+        formats = get_video_storage_settings(VideoStorage.TRANSCRIPTS).get('RENDITIONS') or []
+        formats = [rendition_format for rendition_format in formats if rendition_format != file_format]
+        if not formats:
+            return {}
+
+        try:
+            if parsed_transcript and parsed_transcript.file_format == file_format:
+                cues = parsed_transcript.cues
+            else:
+                cues = Transcript.parse(b''.join(iter_file_chunks(file_data)), file_format)
+        except (TranscriptsGenerationException, ValueError):
+            logger.exception('[VAL] Could not parse transcript to store its renditions')
+            return {}
+
+        storage = get_video_transcript_storage()
+        renditions = {}
+        for rendition_format in formats:
+            try:
+                rendition = Transcript.convert_parsed(cues, file_format, rendition_format).encode('utf-8')
+            except (ValueError, KeyError, TypeError):
+                logger.exception('[VAL] Could not render transcript as "%s"', rendition_format)
+                continue
+
+            file_name = get_transcript_file_name(
+                compute_content_hash(ContentFile(rendition)) if content_addressed else uuid4().hex,
+                rendition_format,
+                self.content_encoding
+            )
+            stored_name = self.get_stored_file_name(file_name) if content_addressed else None
+            if not stored_name:
+                if self.content_encoding == TranscriptContentEncoding.GZIP:
+                    rendition = compress_transcript_content(ContentFile(rendition))
+                stored_name = storage.save(video_transcript_path(self, file_name), ContentFile(rendition))
+            renditions[rendition_format] = stored_name
+
+        return renditions
+
+    def get_stored_file_name(self, file_name):
+        """
+        Returns the name of a content addressed transcript file if it is already stored, None otherwise.
+
+        A pending deferred deletion of the file is cancelled, since the file is going to be referenced again.
+        """
+        name = video_transcript_path(self, file_name)
+        if not get_video_transcript_storage().exists(name):
+            return None
+
+        StorageDeletion.objects.filter(storage=VideoStorage.TRANSCRIPTS, name=name).delete()
+        return name
+
+    @classmethod
+    def filter_rendition(cls, name):
+        """
+        Returns the VideoTranscript rows using a transcript file as one of their renditions.
+
+        Renditions are named with the extension of their format, so only the rendition of that format is looked up.
+        """
+        file_format = get_transcript_file_format(name)
+        if file_format not in dict(TranscriptFormat.CHOICES):
+            return cls.objects.none()
+
+        return cls.objects.filter(**{f'renditions__{file_format}': name})
+
+    @classmethod
+    def is_file_referenced(cls, name):
+        """
+        Returns whether a transcript file is used by any VideoTranscript, as its transcript or a rendition.
+
+        Content addressed files are shared by all the transcripts with the same content.
+        """
+        return cls.objects.filter(transcript=name).exists() or cls.filter_rendition(name).exists()
+
+    @classmethod
+    def is_shared_file_referenced(cls, name):
+        """
+        Returns whether a content addressed transcript file is used by any VideoTranscript.
+
+        Other files are only used by the transcript they were stored for, so they are not looked up
+        and False is returned for them.
+        """
+        return is_content_addressed_file_name(name) and cls.is_file_referenced(name)
+
+    @classmethod
+    def rename_file(cls, old_name, new_name):
+        """
+        Points the VideoTranscript rows referencing a transcript file, as their transcript or a rendition, to its
+        new name.
+        """
+        now = timezone.now()
+        cls.objects.filter(transcript=old_name).update(transcript=new_name, modified=now)
+
+        video_transcripts = list(cls.filter_rendition(old_name))
+        for video_transcript in video_transcripts:
+            video_transcript.renditions = {
+                file_format: new_name if name == old_name else name
+                for file_format, name in video_transcript.renditions.items()
+            }
+            video_transcript.modified = now
+        cls.objects.bulk_update(video_transcripts, ['renditions', 'modified'])
+
+    @classmethod
+    def delete_unreferenced_files(cls, names):
+        """
+        Deletes the transcript files which are not used by any VideoTranscript anymore, or queues
+        them for deletion if DEFER_DELETION is enabled.
+        """
+        for name in names:
+            if name and not cls.is_shared_file_referenced(name):
+                StorageDeletion.delete_or_defer(VideoStorage.TRANSCRIPTS, name)
+
     @classmethod
     def get_or_none(cls, video_id, language_code):
         """
@@ -532,7 +852,9 @@ class VideoTranscript(TimeStampedModel):
         return video_transcript
 
     @classmethod
-    def create_or_update(cls, video, language_code, metadata, file_data=None):
+    def create_or_update(
+            cls, video, language_code, metadata, file_data=None, content_hash=None, parsed_transcript=None
+    ):  # pylint: disable=too-many-positional-arguments
         """
         Create or update Transcript object.
 
@@ -541,6 +863,8 @@ class VideoTranscript(TimeStampedModel):
             language_code (str): language code for (to be created/updated) transcript
             metadata (dict): A dict containing (to be overwritten) properties
             file_data (InMemoryUploadedFile): File data to be saved
+            content_hash (str): Content hash of `file_data` if it is already known
+            parsed_transcript (ParsedTranscript): `file_data` already parsed, if it is
 
         Returns:
             Returns a tuple of (video_transcript, created).
@@ -559,7 +883,13 @@ class VideoTranscript(TimeStampedModel):
         transcript_name = metadata.get('file_name')
 
         try:
-            video_transcript.save_transcript(file_data, video_transcript.file_format, file_name=transcript_name)
+            video_transcript.save_transcript(
+                file_data,
+                video_transcript.file_format,
+                file_name=transcript_name,
+                content_hash=content_hash,
+                parsed_transcript=parsed_transcript,
+            )
         except Exception:
             logger.exception(
                 '[VAL] Transcript save failed to storage for video_id "%s" language code "%s"',
@@ -577,6 +907,58 @@ class VideoTranscript(TimeStampedModel):
         storage = get_video_transcript_storage()
         return storage.url(self.transcript.name)
 
+    def get_content_hash(self):
+        """
+        Returns the content hash of the stored transcript.
+
+        Rows saved before content hashes were recorded get their hash computed
+        from storage once and persisted, so later calls do not read the file.
+        """
+        if not self.content_hash and self.transcript.name:
+            if self.content_encoding == TranscriptContentEncoding.IDENTITY:
+                self.content_hash = compute_stored_file_hash(self.transcript.storage, self.transcript.name)
+            else:
+                with self.map_content() as content:
+                    self.content_hash = hashlib.sha256(content).hexdigest()
+            self.save(update_fields=['content_hash'])
+
+        return self.content_hash
+
+    def get_file_name(self, file_format=None):
+        """
+        Returns the name of the file the transcript is stored as in a format, its own format by default.
+
+        Raises:
+            KeyError if the transcript is not stored in that format.
+        """
+        if file_format and file_format != self.file_format:
+            return self.renditions[file_format]
+
+        return self.transcript.name
+
+    @contextmanager
+    def map_content(self, decompress=True, file_format=None):
+        """
+        Yields the content of the stored transcript file as a read only buffer.
+
+        Local files are memory mapped, so that their content is decompressed, hashed or converted
+        without being copied first. The arguments are the same as `read_content`.
+        """
+        with map_stored_file(self.transcript.storage, self.get_file_name(file_format)) as content:
+            yield decompress_transcript_content(content, self.content_encoding) if decompress else content
+
+    def read_content(self, decompress=True, file_format=None):
+        """
+        Returns the content of the stored transcript file.
+
+        Arguments:
+            decompress (bool): whether compressed content is decompressed, compressed content
+                can be served as it is with its `content_encoding` as HTTP Content-Encoding.
+            file_format (str): format of a stored rendition to read instead of the transcript file.
+        """
+        with self.map_content(decompress=decompress, file_format=file_format) as content:
+            return bytes(content)
+
     def __str__(self):
         return f'{self.language_code} Transcript for {self.video.edx_video_id}'
 
@@ -718,6 +1100,127 @@ class ThirdPartyTranscriptCredentialsState(TimeStampedModel):
         )
 
 
+def get_video_file_storage(video_storage):
+    """
+    Returns the storage backend of the files of a video storage.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+    """
+    model, field_name = get_video_file_field(video_storage)
+    return model._meta.get_field(field_name).storage
+
+
+def get_video_file_field(video_storage):
+    """
+    Returns the model and the name of the file field referencing the files of a video storage.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+    """
+    if video_storage == VideoStorage.IMAGES:
+        return VideoImage, 'image'
+
+    return VideoTranscript, 'transcript'
+
+
+def iter_referenced_file_names(video_storage, chunk_size=2000):
+    """
+    Yields the names of the files of a video storage which are referenced in the database.
+
+    Generated image names are included since any of them may become the image of a course video,
+    and so are the names of transcript renditions.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+        chunk_size (int): number of rows read from the database at once
+    """
+    if video_storage == VideoStorage.IMAGES:
+        video_images = VideoImage.objects.values_list('image', 'generated_images').iterator(chunk_size=chunk_size)
+        for image, generated_images in video_images:
+            if image:
+                yield image
+            yield from generated_images or []
+    else:
+        transcripts = VideoTranscript.objects.values_list('transcript', 'renditions').iterator(chunk_size=chunk_size)
+        for transcript, renditions in transcripts:
+            if transcript:
+                yield transcript
+            yield from (renditions or {}).values()
+
+
+class StorageDeletion(TimeStampedModel):
+    """
+    A video image or transcript file waiting to be deleted from its storage.
+
+    Deletions are queued instead of being done in the request when `DEFER_DELETION` is enabled
+    in the settings of the storage, and are done in batches by the `process_storage_deletions`
+    management command.
+
+    .. no_pii:
+    """
+    storage = models.CharField(max_length=20, choices=VideoStorage.CHOICES)
+    name = models.CharField(max_length=500, help_text='Name of the file in its storage')
+    attempts = models.PositiveIntegerField(default=0, help_text='Number of failed attempts to delete the file')
+    last_error = models.TextField(blank=True, default='')
+
+    @classmethod
+    def is_deferred(cls, video_storage):
+        """
+        Returns whether the deletion of files from a video storage is deferred.
+        """
+        return bool(get_video_storage_settings(video_storage).get('DEFER_DELETION'))
+
+    @classmethod
+    def delete_or_defer(cls, video_storage, name):
+        """
+        Delete a file from a video storage, or queue its deletion if it is deferred.
+
+        Arguments:
+            video_storage (str): one of the VideoStorage choices
+            name (str): name of the file in its storage
+        """
+        if not name:
+            return
+
+        if cls.is_deferred(video_storage):
+            cls.objects.create(storage=video_storage, name=name)
+        else:
+            get_video_file_storage(video_storage).delete(name)
+
+    def __str__(self):
+        return f'{self.storage}: {self.name}'
+
+
+class StorageMigration(TimeStampedModel):
+    """
+    Progress of the migration of the files of a video storage to another storage backend.
+
+    Rows referencing the files are migrated in primary key order, so a migration is resumed
+    after the last row which was processed. Files which could not be copied are kept in
+    `failed_files` and retried when the migration is resumed.
+
+    .. no_pii:
+    """
+    name = models.CharField(max_length=255, help_text='Name identifying the migration')
+    storage = models.CharField(max_length=20, choices=VideoStorage.CHOICES)
+    last_id = models.PositiveIntegerField(default=0, help_text='Primary key of the last processed row')
+    copied_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0, help_text='Files already present in the destination')
+    failed_count = models.PositiveIntegerField(default=0, help_text='Files which could not be copied yet')
+    failed_files = models.JSONField(
+        blank=True,
+        default=dict,
+        help_text='Content hash and encoding of the files which could not be copied yet, keyed by name'
+    )
+
+    class Meta:
+        unique_together = ('name', 'storage')
+
+    def __str__(self):
+        return f'{self.name} - {self.storage}'
+
+
 @receiver(models.signals.post_save, sender=Video)
 def video_status_update_callback(sender, **kwargs):  # pylint: disable=unused-argument
     """
@@ -729,3 +1232,24 @@ def video_status_update_callback(sender, **kwargs):  # pylint: disable=unused-ar
         logger.info('VAL: Video created with id [%s] and status [%s]', video.edx_video_id, video.status)
     else:
         logger.info('VAL: Status changed to [%s] for video [%s]', video.status, video.edx_video_id)
+
+
+def log_video_status_updates(videos, created=False):
+    """
+    Log video status for videos written in bulk.
+
+    Bulk writes do not send `post_save`, so this is the batched form of `video_status_update_callback`.
+
+    Arguments:
+        videos (iterable): (edx_video_id, status) tuples
+        created (bool): whether the videos were created
+    """
+    video_ids_by_status = defaultdict(list)
+    for edx_video_id, status in videos:
+        video_ids_by_status[status].append(edx_video_id)
+
+    for status, edx_video_ids in video_ids_by_status.items():
+        if created:
+            logger.info('VAL: Videos created with ids [%s] and status [%s]', ', '.join(edx_video_ids), status)
+        else:
+            logger.info('VAL: Status changed to [%s] for videos [%s]', status, ', '.join(edx_video_ids))
@@ -8,6 +8,7 @@ EncodedVideoSerializer which uses the profile_name as it's profile field.
 
 from rest_framework import serializers
 from rest_framework.fields import DateTimeField, IntegerField
+from rest_framework.validators import UniqueValidator
 
 from edxval.models import CourseVideo, EncodedVideo, Profile, TranscriptPreference, Video, VideoImage, VideoTranscript
 
@@ -122,7 +123,20 @@ class CourseSerializer(serializers.RelatedField):
         return course_video, image
 
 
-class VideoSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer taking an optional `fields` argument, limiting the fields it outputs to the given ones.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class VideoSerializer(DynamicFieldsModelSerializer):
     """
     Serializer for Video object
 
@@ -144,7 +158,7 @@ class VideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Video
         lookup_field = "edx_video_id"
-        exclude = ('id',)
+        exclude = ('id', 'modified')
 
     def get_url(self, obj):
         """
@@ -212,12 +226,8 @@ class VideoSerializer(serializers.ModelSerializer):
         instance.duration = validated_data["duration"]
         instance.save()
 
-        # Set encoded videos
-        instance.encoded_videos.all().delete()
-        EncodedVideo.objects.bulk_create(
-            EncodedVideo(video=instance, **video_data)
-            for video_data in validated_data.get("encoded_videos", [])
-        )
+        # Set encoded videos, writing only the ones which changed
+        EncodedVideo.sync({instance: validated_data.get("encoded_videos", [])})
 
         # Set courses
         # NOTE: for backwards compatibility with the DRF v2 behavior,
@@ -232,6 +242,24 @@ class VideoSerializer(serializers.ModelSerializer):
         return instance
 
 
+class VideoUpsertSerializer(VideoSerializer):
+    """
+    Serializer validating Video data which is created or updated depending on whether the video exists.
+
+    edx_video_id is not required to be unique, so the data can be validated without reading the video.
+    """
+    def get_fields(self):
+        """
+        Drop the uniqueness validation of edx_video_id.
+        """
+        fields = super().get_fields()
+        fields['edx_video_id'].validators = [
+            validator for validator in fields['edx_video_id'].validators
+            if not isinstance(validator, UniqueValidator)
+        ]
+        return fields
+
+
 class TranscriptPreferenceSerializer(serializers.ModelSerializer):
     """
     Serializer for TranscriptPreference
@@ -163,6 +163,10 @@ VIDEO_IMAGE_SETTINGS = dict(
     VIDEO_IMAGE_MAX_BYTES=2097152,
     VIDEO_IMAGE_MIN_BYTES=100,
     DIRECTORY_PREFIX='video-images/',
+    # Queue file deletions to be done by the process_storage_deletions command instead of in the request
+    # DEFER_DELETION=True,
+    # Spread new files over subdirectories named after the hash of their name, see the shard_video_files command
+    # SHARDED_PATHS=True,
 )
 
 VIDEO_TRANSCRIPTS_SETTINGS = dict(
@@ -173,6 +177,20 @@ VIDEO_TRANSCRIPTS_SETTINGS = dict(
     # so that transcripts created during tests due to upload should be ignored
     VIDEO_TRANSCRIPTS_MAX_BYTES=3145728,  # 3 MB
     DIRECTORY_PREFIX='video-transcripts/',
+    # Queue file deletions to be done by the process_storage_deletions command instead of in the request
+    # DEFER_DELETION=True,
+    # Spread new files over subdirectories named after the hash of their name, see the shard_video_files command
+    # SHARDED_PATHS=True,
+    # Compress new transcript files at rest, only gzip is supported
+    # COMPRESSION='gzip',
+    # Also store new transcripts converted to these formats, read by get_video_transcript_data(output_format=...)
+    # RENDITIONS=['srt', 'sjson'],
+    # Name new transcript files after their content hash, so that identical transcripts share a single file
+    # CONTENT_ADDRESSED=True,
+    # Let the web server send local transcript files, with the X-Accel-Redirect header of nginx served from the
+    # internal location SENDFILE_URL_PREFIX, or with a header given the file path like X-Sendfile
+    # SENDFILE_HEADER='X-Accel-Redirect',
+    # SENDFILE_URL_PREFIX='/protected-transcripts/',
 )
 
 # Required by Django 2.2 to run management commands.
@@ -4,6 +4,7 @@ Tests for the API for Video Abstraction Layer
 
 
 import copy
+import gzip
 import json
 import os
 import shutil
@@ -17,8 +18,9 @@ from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.core.files.base import ContentFile
 from django.core.files.images import ImageFile
-from django.db import DatabaseError
-from django.test import TestCase
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from fs.memoryfs import MemoryFS
 from fs.osfs import OSFS
@@ -188,6 +190,125 @@ class CreateVideoTest(TestCase):
         assert expected_video == {k: v for k, v in video.items() if k in expected_video}
 
 
+class CreateVideosBulkTest(TestCase):
+    """
+    Tests the create_videos_bulk function in api.py.
+    """
+
+    def setUp(self):
+        """
+        Creation of Profile objects and of the videos data used to test bulk creation
+        """
+        super().setUp()
+        api.create_profile(constants.PROFILE_DESKTOP)
+        api.create_profile(constants.PROFILE_MOBILE)
+        self.videos_data = [
+            dict(constants.COMPLETE_SET_FISH, courses=[{'test-course': 'fish.jpg'}, 'other-course']),
+            dict(constants.COMPLETE_SET_STAR, courses=['test-course']),
+            constants.VIDEO_DICT_NEGATIVE_DURATION,
+            dict(constants.COMPLETE_SET_STAR, client_video_id='repeated'),
+        ]
+
+    def assert_videos_created(self):
+        """
+        Assert that the valid videos of `self.videos_data` were created along with their related objects.
+        """
+        self.assertEqual(
+            sorted(Video.objects.values_list('edx_video_id', flat=True)),
+            [constants.VIDEO_DICT_STAR['edx_video_id'], constants.VIDEO_DICT_FISH['edx_video_id']]
+        )
+        fish_video = api.get_video_info(constants.VIDEO_DICT_FISH['edx_video_id'])
+        self.assertEqual(
+            sorted(encoded_video['profile'] for encoded_video in fish_video['encoded_videos']),
+            [constants.PROFILE_DESKTOP, constants.PROFILE_MOBILE]
+        )
+        self.assertEqual(
+            sorted(CourseVideo.objects.values_list('course_id', 'video__edx_video_id')),
+            [
+                ('other-course', constants.VIDEO_DICT_FISH['edx_video_id']),
+                ('test-course', constants.VIDEO_DICT_STAR['edx_video_id']),
+                ('test-course', constants.VIDEO_DICT_FISH['edx_video_id']),
+            ]
+        )
+        self.assertEqual(
+            list(VideoImage.objects.values_list('course_video__course_id', 'image')),
+            [('test-course', 'fish.jpg')]
+        )
+
+    def assert_results(self, results):
+        """
+        Assert the per video results of bulk creation of `self.videos_data`.
+        """
+        self.assertEqual(
+            [(result['edx_video_id'], result['created']) for result in results],
+            [
+                (constants.VIDEO_DICT_FISH['edx_video_id'], True),
+                (constants.VIDEO_DICT_STAR['edx_video_id'], True),
+                (constants.VIDEO_DICT_NEGATIVE_DURATION['edx_video_id'], False),
+                (constants.VIDEO_DICT_STAR['edx_video_id'], False),
+            ]
+        )
+        self.assertIn('duration', results[2]['errors'])
+        self.assertIn('edx_video_id', results[3]['errors'])
+
+    @patch('edxval.models.logger')
+    def test_create_videos_bulk(self, mock_logger):
+        """
+        Tests that valid videos are created in bulk and invalid ones are reported.
+        """
+        results = api.create_videos_bulk(self.videos_data)
+
+        self.assert_results(results)
+        self.assert_videos_created()
+        mock_logger.info.assert_called_once_with(
+            'VAL: Videos created with ids [%s] and status [%s]',
+            ', '.join([constants.VIDEO_DICT_FISH['edx_video_id'], constants.VIDEO_DICT_STAR['edx_video_id']]),
+            constants.VIDEO_DICT_FISH['status']
+        )
+
+    def test_create_videos_bulk_num_queries(self):
+        """
+        Tests that the number of write queries does not depend on the number of videos.
+        """
+        videos_data = [
+            dict(constants.COMPLETE_SET_FISH, edx_video_id=f'video-{index}', courses=[{'test-course': f'{index}.jpg'}])
+            for index in range(10)
+        ]
+        # Validation costs 3 queries per video (unique edx_video_id and two profiles), writing all
+        # the videos costs 7: savepoint, videos, encoded videos, course videos, select course videos,
+        # video images and savepoint release.
+        with self.assertNumQueries(3 * len(videos_data) + 7):
+            results = api.create_videos_bulk(videos_data)
+
+        self.assertTrue(all(result['created'] for result in results))
+        self.assertEqual(EncodedVideo.objects.count(), 20)
+        self.assertEqual(VideoImage.objects.filter(course_video__course_id='test-course').count(), 10)
+
+    def test_create_videos_bulk_concurrently_created(self):
+        """
+        Tests that videos created by someone else after validation are reported without aborting the batch.
+        """
+        original_is_valid = VideoSerializer.is_valid
+
+        def is_valid_then_create_fish(serializer, *args, **kwargs):
+            """
+            Creates the fish video after the last video is validated, as if it happened concurrently.
+            """
+            is_valid = original_is_valid(serializer, *args, **kwargs)
+            if serializer.initial_data['edx_video_id'] == constants.VIDEO_DICT_STAR['edx_video_id']:
+                Video.objects.create(**constants.VIDEO_DICT_FISH)
+            return is_valid
+
+        with patch.object(VideoSerializer, 'is_valid', is_valid_then_create_fish):
+            results = api.create_videos_bulk(self.videos_data[:2])
+
+        self.assertEqual([result['created'] for result in results], [False, True])
+        self.assertIn('non_field_errors', results[0]['errors'])
+        self.assertTrue(
+            CourseVideo.objects.filter(video__edx_video_id=constants.VIDEO_DICT_STAR['edx_video_id']).exists()
+        )
+
+
 @ddt
 class UpdateVideoTest(TestCase):
     """
@@ -231,6 +352,55 @@ class UpdateVideoTest(TestCase):
         self.assertEqual(type(updated_video), Video)
         self.assertEqual(updated_video.client_video_id, "Full Swordfish")
 
+    def test_update_video_unchanged_encodings(self):
+        """
+        Tests that updating a video with the same encodings doesn't rewrite them.
+        """
+        encoded_video = EncodedVideo.objects.get()
+        video_data = dict(
+            encoded_videos=[
+                constants.ENCODED_VIDEO_DICT_FISH_MOBILE
+            ],
+            **constants.VIDEO_DICT_FISH_UPDATE
+        )
+        with CaptureQueriesContext(connection) as queries:
+            api.update_video(video_data)
+
+        encoded_video_writes = [
+            query['sql'] for query in queries.captured_queries
+            if 'edxval_encodedvideo' in query['sql'] and not query['sql'].startswith('SELECT')
+        ]
+        self.assertEqual(encoded_video_writes, [])
+        self.assertEqual(EncodedVideo.objects.get().modified, encoded_video.modified)
+
+    def test_update_video_encodings_diff(self):
+        """
+        Tests that only changed encodings are updated, new ones created and missing ones deleted.
+        """
+        api.update_video(constants.COMPLETE_SET_FISH)
+        mobile_encoding = EncodedVideo.objects.get(profile__profile_name='mobile')
+        desktop_encoding = EncodedVideo.objects.get(profile__profile_name='desktop')
+
+        video_data = dict(
+            encoded_videos=[
+                dict(constants.ENCODED_VIDEO_DICT_FISH_MOBILE, file_size=1),
+                constants.ENCODED_VIDEO_DICT_FISH_HLS,
+            ],
+            **constants.VIDEO_DICT_FISH
+        )
+        api.update_video(video_data)
+
+        encoded_videos = {
+            encoded_video.profile.profile_name: encoded_video
+            for encoded_video in EncodedVideo.objects.select_related('profile')
+        }
+        self.assertEqual(set(encoded_videos), {'mobile', 'hls'})
+        self.assertEqual(encoded_videos['mobile'].id, mobile_encoding.id)
+        self.assertEqual(encoded_videos['mobile'].file_size, 1)
+        self.assertEqual(encoded_videos['mobile'].created, mobile_encoding.created)
+        self.assertGreater(encoded_videos['mobile'].modified, mobile_encoding.modified)
+        self.assertFalse(EncodedVideo.objects.filter(id=desktop_encoding.id).exists())
+
     @data(
         constants.COMPLETE_SET_INVALID_ENCODED_VIDEO_FISH,
     )
@@ -252,6 +422,178 @@ class UpdateVideoTest(TestCase):
             api.update_video(data)
 
 
+@ddt
+class UpsertVideoTest(TestCase):
+    """
+    Tests the upsert_video and upsert_videos functions in api.py.
+    """
+
+    def setUp(self):
+        """
+        Creation of Profile objects and of an existing video to upsert
+        """
+        super().setUp()
+        api.create_profile(constants.PROFILE_DESKTOP)
+        api.create_profile(constants.PROFILE_MOBILE)
+        api.create_video(dict(constants.COMPLETE_SET_FISH, courses=['test-course']))
+        self.fish_video = Video.objects.get(edx_video_id=constants.VIDEO_DICT_FISH['edx_video_id'])
+
+    def assert_fish_updated(self):
+        """
+        Assert that the existing video was updated in place.
+        """
+        video = Video.objects.get(edx_video_id=constants.VIDEO_DICT_FISH['edx_video_id'])
+        self.assertEqual(video.id, self.fish_video.id)
+        self.assertEqual(video.created, self.fish_video.created)
+        self.assertEqual(video.client_video_id, constants.VIDEO_DICT_FISH_UPDATE['client_video_id'])
+        self.assertEqual(
+            list(video.encoded_videos.values_list('profile__profile_name', flat=True)),
+            [constants.PROFILE_MOBILE]
+        )
+        self.assertEqual(
+            sorted(CourseVideo.objects.filter(video=video).values_list('course_id', flat=True)),
+            ['other-course', 'test-course']
+        )
+        self.assertEqual(api.get_course_video_image_url('other-course', video.edx_video_id), '/fish.jpg')
+
+    def get_fish_update_data(self):
+        """
+        Returns the data upserting the existing video.
+        """
+        return dict(
+            constants.VIDEO_DICT_FISH_UPDATE,
+            encoded_videos=[constants.ENCODED_VIDEO_DICT_FISH_MOBILE],
+            courses=['test-course', {'other-course': 'fish.jpg'}],
+        )
+
+    @data(True, False)
+    def test_upsert_video(self, supports_update_conflicts):
+        """
+        Tests that upsert_video creates new videos and updates existing ones, with or without database upserts.
+        """
+        with patch.multiple(
+            connection.features,
+            supports_update_conflicts=supports_update_conflicts,
+            supports_update_conflicts_with_target=supports_update_conflicts,
+        ):
+            self.assertEqual(
+                api.upsert_video(self.get_fish_update_data()),
+                constants.VIDEO_DICT_FISH['edx_video_id']
+            )
+            api.upsert_video(constants.COMPLETE_SET_STAR)
+
+        self.assert_fish_updated()
+        star_video = api.get_video_info(constants.VIDEO_DICT_STAR['edx_video_id'])
+        self.assertEqual(star_video['client_video_id'], constants.VIDEO_DICT_STAR['client_video_id'])
+        self.assertEqual(len(star_video['encoded_videos']), 1)
+
+    def test_upsert_video_num_queries(self):
+        """
+        Tests that upserting a video doesn't read it first and takes a constant number of queries.
+        """
+        video_data = self.get_fish_update_data()
+        # 1 profile lookup per encoded video while validating, then the upsert, the encoded videos
+        # read and delete and the course videos insert, read and image insert in a savepoint.
+        with self.assertNumQueries(9):
+            api.upsert_video(video_data)
+
+        self.assert_fish_updated()
+
+    def test_upsert_video_invalid(self):
+        """
+        Tests that invalid video data is rejected.
+        """
+        with self.assertRaises(ValCannotCreateError):
+            api.upsert_video(constants.VIDEO_DICT_NEGATIVE_DURATION)
+
+    def test_upsert_videos(self):
+        """
+        Tests that upsert_videos writes the valid videos and reports the invalid ones.
+        """
+        results = api.upsert_videos([
+            self.get_fish_update_data(),
+            constants.COMPLETE_SET_STAR,
+            constants.VIDEO_DICT_NEGATIVE_DURATION,
+            dict(constants.COMPLETE_SET_STAR, client_video_id='repeated'),
+        ])
+
+        self.assertEqual([result['upserted'] for result in results], [True, True, False, False])
+        self.assertIn('duration', results[2]['errors'])
+        self.assertIn('edx_video_id', results[3]['errors'])
+        self.assert_fish_updated()
+        self.assertEqual(
+            Video.objects.get(edx_video_id=constants.VIDEO_DICT_STAR['edx_video_id']).client_video_id,
+            constants.VIDEO_DICT_STAR['client_video_id']
+        )
+
+
+class UpdateVideosStatusTest(TestCase):
+    """
+    Tests the update_videos_status function in api.py.
+    """
+
+    def setUp(self):
+        """
+        Creation of the videos whose status is updated
+        """
+        super().setUp()
+        self.edx_video_ids = []
+        for index in range(4):
+            edx_video_id = f'video-{index}'
+            Video.objects.create(**dict(constants.VIDEO_DICT_FISH, edx_video_id=edx_video_id))
+            self.edx_video_ids.append(edx_video_id)
+
+    @patch('edxval.models.logger')
+    def test_update_videos_status(self, mock_logger):
+        """
+        Tests that video statuses are updated with one statement for each status and error description.
+        """
+        status_updates = [
+            {'edx_video_id': edx_video_id, 'status': 'transcript_ready'} for edx_video_id in self.edx_video_ids[:3]
+        ] + [
+            {'edx_video_id': self.edx_video_ids[3], 'status': 'pipeline_error', 'error_description': 'failed'},
+        ]
+        # Reading the existing videos, then 2 updates in a savepoint.
+        with self.assertNumQueries(5):
+            results = api.update_videos_status(status_updates)
+
+        self.assertTrue(all(result['updated'] for result in results))
+        self.assertEqual(
+            list(Video.objects.order_by('edx_video_id').values_list('status', 'error_description')),
+            [('transcript_ready', None)] * 3 + [('pipeline_error', 'failed')]
+        )
+        mock_logger.info.assert_any_call(
+            'VAL: Status changed to [%s] for videos [%s]', 'transcript_ready', ', '.join(self.edx_video_ids[:3])
+        )
+
+    def test_update_videos_status_invalid(self):
+        """
+        Tests that invalid or unknown videos are reported without preventing the other updates.
+        """
+        results = api.update_videos_status([
+            {'edx_video_id': self.edx_video_ids[0], 'status': 'transcript_ready'},
+            {'edx_video_id': self.edx_video_ids[1], 'status': 'invalid'},
+            {'edx_video_id': 'unknown', 'status': 'transcript_ready'},
+            {'edx_video_id': self.edx_video_ids[0], 'status': 'transcript_failed'},
+            {'status': 'transcript_ready'},
+            'invalid',
+            {'edx_video_id': [self.edx_video_ids[1]], 'status': 'transcript_ready'},
+            {'edx_video_id': self.edx_video_ids[2], 'status': 'pipeline_error', 'error_description': {'a': 1}},
+        ])
+
+        self.assertEqual([result['updated'] for result in results], [True] + [False] * 7)
+        self.assertEqual(results[6]['message'], '"edx_video_id" must be a string.')
+        self.assertEqual(results[7]['message'], '"error_description" must be a string.')
+        self.assertEqual(results[1]['message'], '"invalid" is not a valid Video status.')
+        self.assertEqual(results[2]['message'], 'Video is not found for specified edx_video_id: unknown')
+        self.assertEqual(results[3]['message'], 'edx_video_id is repeated in the batch.')
+        self.assertEqual(results[4]['message'], '"edx_video_id" params must be specified.')
+        self.assertEqual(
+            list(Video.objects.order_by('edx_video_id').values_list('status', flat=True)),
+            ['transcript_ready'] + [constants.VIDEO_DICT_FISH['status']] * 3
+        )
+
+
 class CreateProfileTest(TestCase):
     """
     Tests the create_profile function in the api.py
@@ -1054,6 +1396,36 @@ class TestCopyCourse(TestCase):
         self.assertEqual(len(original_videos), 2)
         self.assertEqual(set(copied_videos), set(original_videos))
 
+    def test_copy_num_queries(self):
+        """
+        Test that the number of queries doesn't depend on the number of copied videos.
+        """
+        for index in range(5):
+            video = Video.objects.create(**dict(constants.VIDEO_DICT_FISH, edx_video_id=f'video-{index}'))
+            course_video = CourseVideo.objects.create(video=video, course_id=self.course_id)
+            VideoImage.create_or_update(course_video, f'image-{index}.jpg')
+
+        destination_course_video = CourseVideo.objects.create(video=self.video1, course_id='test-course3')
+        VideoImage.create_or_update(destination_course_video, 'old-image.jpg')
+
+        # Reading the source course videos, then inserting the course videos, reading them
+        # and inserting and updating their images in a savepoint.
+        with self.assertNumQueries(7):
+            api.copy_course_videos(self.course_id, 'test-course3')
+
+        self.assertEqual(
+            sorted(
+                CourseVideo.objects.filter(course_id='test-course3').values_list(
+                    'video__edx_video_id', 'video_image__image'
+                )
+            ),
+            sorted(
+                CourseVideo.objects.filter(course_id=self.course_id).values_list(
+                    'video__edx_video_id', 'video_image__image'
+                )
+            )
+        )
+
 
 @ddt
 class ExportTest(TestCase):
@@ -1303,6 +1675,84 @@ class ExportTest(TestCase):
         with self.assertRaises(ValVideoNotFoundError):
             api.export_to_xml('unknown_video', self.file_system, constants.EXPORT_IMPORT_STATIC_DIR)
 
+    def test_incremental_export_unchanged(self):
+        """
+        Test that an export given the manifest of a previous export reuses the unchanged transcript files.
+        """
+        video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        first_export = api.export_to_xml(video_id, self.file_system, constants.EXPORT_IMPORT_STATIC_DIR, 'test-course')
+        self.assertTrue(first_export['changed'])
+        self.assertEqual(sorted(first_export['manifest']['transcripts'].keys()), ['de', 'en'])
+
+        with patch('edxval.api.create_transcript_file') as mock_create_transcript_file:
+            second_export = api.export_to_xml(
+                video_id,
+                self.file_system,
+                constants.EXPORT_IMPORT_STATIC_DIR,
+                'test-course',
+                previous_manifest=first_export['manifest'],
+            )
+
+        mock_create_transcript_file.assert_not_called()
+        self.assertFalse(second_export['changed'])
+        self.assertEqual(second_export['manifest'], first_export['manifest'])
+        self.assertEqual(second_export['transcripts'], first_export['transcripts'])
+        self.assert_xml_equal(second_export['xml'], first_export['xml'])
+
+    def test_incremental_export_changed(self):
+        """
+        Test that an incremental export rewrites only the transcripts which changed or are missing.
+        """
+        video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        first_export = api.export_to_xml(video_id, self.file_system, constants.EXPORT_IMPORT_STATIC_DIR, 'test-course')
+
+        # Update the `en` transcript and remove the exported `de` transcript file.
+        VideoTranscript.objects.get(video__edx_video_id=video_id, language_code='en').save()
+        self.file_system.remove(combine(constants.EXPORT_IMPORT_STATIC_DIR, first_export['transcripts']['de']))
+
+        with patch(
+            'edxval.api.create_transcript_file', wraps=api.create_transcript_file
+        ) as mock_create_transcript_file:
+            second_export = api.export_to_xml(
+                video_id,
+                self.file_system,
+                constants.EXPORT_IMPORT_STATIC_DIR,
+                'test-course',
+                previous_manifest=first_export['manifest'],
+            )
+
+        self.assertEqual(
+            sorted(call.kwargs['language_code'] for call in mock_create_transcript_file.call_args_list),
+            ['de', 'en']
+        )
+        self.assertTrue(second_export['changed'])
+        self.assertEqual(second_export['manifest']['modified'], first_export['manifest']['modified'])
+        self.assertNotEqual(
+            second_export['manifest']['transcripts']['en'],
+            first_export['manifest']['transcripts']['en']
+        )
+
+    def test_incremental_export_video_changed(self):
+        """
+        Test that changes to the video or its encodings are reflected in the export manifest.
+        """
+        video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        first_export = api.export_to_xml(video_id, self.file_system, constants.EXPORT_IMPORT_STATIC_DIR)
+
+        EncodedVideo.objects.filter(video__edx_video_id=video_id, profile__profile_name=constants.PROFILE_HLS).delete()
+        api.update_video_status(video_id, 'file_complete')
+
+        second_export = api.export_to_xml(
+            video_id,
+            self.file_system,
+            constants.EXPORT_IMPORT_STATIC_DIR,
+            previous_manifest=first_export['manifest'],
+        )
+        self.assertTrue(second_export['changed'])
+        self.assertEqual(second_export['manifest']['encoded_videos'], 2)
+        self.assertGreater(second_export['manifest']['modified'], first_export['manifest']['modified'])
+        self.assertEqual(second_export['manifest']['transcripts'], first_export['manifest']['transcripts'])
+
 
 @ddt
 class ImportTest(TestCase):
@@ -2060,7 +2510,7 @@ class ImportTest(TestCase):
         )
 
     @patch('edxval.api.create_or_update_video_transcript')
-    @patch('edxval.api.get_transcript_format', Mock())
+    @patch('edxval.api.parse_spooled_transcript', Mock())
     def test_import_transcript_from_fs_created_transcript_content_encoding(
         self,
         mock_create_or_update_video_transcript
@@ -2087,6 +2537,11 @@ class ImportTest(TestCase):
             constants.EXPORT_IMPORT_STATIC_DIR
         )
 
+        # The spooled transcript file is closed once imported, so its content is read during the call.
+        transcript_contents = []
+        mock_create_or_update_video_transcript.side_effect = lambda **kwargs: transcript_contents.append(
+            kwargs['file_data'].read()
+        )
         api.import_transcript_from_fs(
             edx_video_id=edx_video_id,
             language_code=language_code,
@@ -2096,8 +2551,7 @@ class ImportTest(TestCase):
             static_dir=constants.EXPORT_IMPORT_STATIC_DIR
         )
 
-        transcript_content = mock_create_or_update_video_transcript.call_args.kwargs['file_data']
-        content_encoding = chardet.detect(transcript_content.read())['encoding']
+        content_encoding = chardet.detect(transcript_contents[0])['encoding']
 
         self.assertEqual(content_encoding, 'utf-8')
 
@@ -2171,6 +2625,189 @@ class ImportTest(TestCase):
             edx_video_id
         )
 
+    def test_import_session_shared_across_videos(self):
+        """
+        Test that videos imported with a shared import session open the import file system only once.
+        """
+        star_xml = self.make_import_xml(
+            video_dict=constants.VIDEO_DICT_STAR,
+            video_transcripts=[self.transcript_data1, self.transcript_data2]
+        )
+        fish_xml = self.make_import_xml(
+            video_dict=constants.VIDEO_DICT_FISH,
+            video_transcripts=[self.transcript_data3]
+        )
+
+        with patch('edxval.api.open_fs', wraps=api.open_fs) as mock_open_fs:
+            with api.TranscriptImportSession(self.file_system) as import_session:
+                for xml, video_dict in [(star_xml, constants.VIDEO_DICT_STAR), (fish_xml, constants.VIDEO_DICT_FISH)]:
+                    api.import_from_xml(
+                        xml,
+                        video_dict['edx_video_id'],
+                        self.file_system,
+                        constants.EXPORT_IMPORT_STATIC_DIR,
+                        {},
+                        'test_course_id',
+                        import_session=import_session
+                    )
+
+        self.assertEqual(mock_open_fs.call_count, 1)
+        self.assert_transcripts(
+            constants.VIDEO_DICT_STAR['edx_video_id'], [self.transcript_data1, self.transcript_data2]
+        )
+        self.assert_transcripts(constants.VIDEO_DICT_FISH['edx_video_id'], [self.transcript_data3])
+
+    def test_import_without_session_does_not_list_files(self):
+        """
+        Test that importing a single video without an import session opens its transcript files directly.
+        """
+        xml = self.make_import_xml(
+            video_dict=constants.VIDEO_DICT_STAR,
+            video_transcripts=[self.transcript_data1, self.transcript_data2]
+        )
+        with patch.object(api.TranscriptImportSession, 'get_listing') as mock_get_listing:
+            api.import_from_xml(
+                xml,
+                constants.VIDEO_DICT_STAR['edx_video_id'],
+                self.file_system,
+                constants.EXPORT_IMPORT_STATIC_DIR,
+                {},
+                'test_course_id'
+            )
+
+        mock_get_listing.assert_not_called()
+        self.assert_transcripts(
+            constants.VIDEO_DICT_STAR['edx_video_id'], [self.transcript_data1, self.transcript_data2]
+        )
+
+    def test_import_transcript_hashed_once(self):
+        """
+        Test that the content hash computed while spooling an imported transcript is stored without hashing it again.
+        """
+        edx_video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        file_name = 'imported.srt'
+        content = constants.TRANSCRIPT_DATA['overwatch']
+        with self.file_system.open(combine(constants.EXPORT_IMPORT_STATIC_DIR, file_name), 'w') as f:
+            f.write(content)
+
+        with patch('edxval.models.compute_content_hash') as mock_compute_content_hash:
+            api.import_transcript_from_fs(
+                edx_video_id=edx_video_id,
+                language_code='de',
+                file_name=file_name,
+                provider=TranscriptProviderType.CUSTOM,
+                resource_fs=self.file_system,
+                static_dir=constants.EXPORT_IMPORT_STATIC_DIR
+            )
+
+        mock_compute_content_hash.assert_not_called()
+        video_transcript = VideoTranscript.objects.get(video__edx_video_id=edx_video_id, language_code='de')
+        self.assertEqual(
+            video_transcript.content_hash, utils.compute_content_hash(ContentFile(content.encode('utf-8')))
+        )
+
+    def test_import_transcript_parsed_once(self):
+        """
+        Test that the renditions of an imported transcript are converted from the cues parsed to validate it.
+        """
+        edx_video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        file_name = 'imported.srt'
+        content = constants.TRANSCRIPT_DATA['overwatch']
+        with self.file_system.open(combine(constants.EXPORT_IMPORT_STATIC_DIR, file_name), 'w') as f:
+            f.write(content)
+
+        renditions_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, RENDITIONS=['sjson'])
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=renditions_settings):
+            with patch.object(Transcript, 'parse', wraps=Transcript.parse) as mock_parse:
+                api.import_transcript_from_fs(
+                    edx_video_id=edx_video_id,
+                    language_code='de',
+                    file_name=file_name,
+                    provider=TranscriptProviderType.CUSTOM,
+                    resource_fs=self.file_system,
+                    static_dir=constants.EXPORT_IMPORT_STATIC_DIR
+                )
+
+        mock_parse.assert_not_called()
+        video_transcript = VideoTranscript.objects.get(video__edx_video_id=edx_video_id, language_code='de')
+        self.assertEqual(
+            json.loads(video_transcript.read_content(file_format='sjson')),
+            json.loads(Transcript.convert(content.encode('utf-8'), 'srt', 'sjson'))
+        )
+
+    @patch('edxval.api.logger')
+    def test_import_session_missing_file(self, mock_logger):
+        """
+        Test that a transcript missing from the import session index is skipped without opening it.
+        """
+        language_code = 'en'
+        edx_video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        file_name = 'file-not-found.srt'
+        with api.TranscriptImportSession(self.file_system) as import_session:
+            self.assertEqual(import_session.get_listing(constants.EXPORT_IMPORT_STATIC_DIR), set())
+            with patch.object(import_session.file_system, 'open') as mock_open:
+                api.import_transcript_from_fs(
+                    edx_video_id=edx_video_id,
+                    language_code=language_code,
+                    file_name=file_name,
+                    provider=TranscriptProviderType.CUSTOM,
+                    resource_fs=self.file_system,
+                    static_dir=constants.EXPORT_IMPORT_STATIC_DIR,
+                    import_session=import_session
+                )
+
+        mock_open.assert_not_called()
+        mock_logger.warning.assert_called_with(
+            '[edx-val] "%s" transcript "%s" for video "%s" is not found.',
+            language_code,
+            file_name,
+            edx_video_id
+        )
+
+    @data(True, False)
+    def test_import_duplicate_transcript_uses_stored_hash(self, has_stored_hash):
+        """
+        Test that re-importing a transcript compares against the stored content hash instead of downloading
+        the existing transcript, and that rows without a stored hash get it backfilled once.
+        """
+        edx_video_id = constants.VIDEO_DICT_FISH['edx_video_id']
+        transcript_file_name = 'super-soaker-en.srt'
+        utils.create_file_in_fs(
+            constants.TRANSCRIPT_DATA['flash'],
+            transcript_file_name,
+            self.file_system,
+            constants.EXPORT_IMPORT_STATIC_DIR
+        )
+        import_kwargs = dict(
+            edx_video_id=edx_video_id,
+            language_code='en',
+            file_name=transcript_file_name,
+            provider=TranscriptProviderType.CUSTOM,
+            resource_fs=self.file_system,
+            static_dir=constants.EXPORT_IMPORT_STATIC_DIR
+        )
+        api.import_transcript_from_fs(**import_kwargs)
+        video_transcript = VideoTranscript.objects.get(video__edx_video_id=edx_video_id, language_code='en')
+        content_hash = video_transcript.content_hash
+        self.assertEqual(
+            content_hash, utils.generate_file_content_hash(ContentFile(constants.TRANSCRIPT_DATA['flash']))
+        )
+        if not has_stored_hash:
+            VideoTranscript.objects.filter(pk=video_transcript.pk).update(content_hash='')
+
+        with override_waffle_flag(OVERRIDE_EXISTING_IMPORTED_TRANSCRIPTS, active=True):
+            with patch(
+                'edxval.models.compute_stored_file_hash', wraps=utils.compute_stored_file_hash
+            ) as mock_compute_stored_file_hash:
+                api.import_transcript_from_fs(**import_kwargs)
+                api.import_transcript_from_fs(**import_kwargs)
+
+        # The existing transcript is read at most once, to backfill its hash.
+        self.assertEqual(mock_compute_stored_file_hash.call_count, 0 if has_stored_hash else 1)
+        reimported_transcript = VideoTranscript.objects.get(pk=video_transcript.pk)
+        self.assertEqual(reimported_transcript.transcript.name, video_transcript.transcript.name)
+        self.assertEqual(reimported_transcript.content_hash, content_hash)
+
     def test_import_existing_video_transcript(self):
         """
         Verify that transcript import for existing video with transcript attached is working as expected.
@@ -2459,7 +3096,7 @@ class CourseVideoImageTest(TestCase):
         """
         Test number of queries executed to upload a course video image.
         """
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(5):
             api.update_video_image(
                 self.edx_video_id, self.course_id, ImageFile(open(self.image_path1, 'rb')), 'image.jpg'
             )
@@ -2825,6 +3462,50 @@ class TranscriptTest(TestCase):
         transcript = api.get_video_transcript_data(video_id=video_id, language_code=language_code)
         self.assertDictEqual(transcript, expected_transcript)
 
+    def test_get_compressed_video_transcript_data(self):
+        """
+        Verify that `get_video_transcript_data` decompresses compressed transcripts unless asked not to.
+        """
+        compression_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, COMPRESSION='gzip')
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=compression_settings):
+            self.v1_transcript2.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'sjson')
+
+        transcript = api.get_video_transcript_data('super-soaker', 'fr')
+        self.assertEqual(transcript['content'], constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8'))
+        self.assertNotIn('content_encoding', transcript)
+
+        transcript = api.get_video_transcript_data('super-soaker', 'fr', decompress=False)
+        self.assertEqual(transcript['content_encoding'], utils.TranscriptContentEncoding.GZIP)
+        self.assertEqual(gzip.decompress(transcript['content']), constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8'))
+
+    @data(True, False)
+    def test_get_video_transcript_data_output_format(self, has_renditions):
+        """
+        Verify that `get_video_transcript_data` returns transcripts in the requested format, reading
+        stored renditions without converting them.
+        """
+        renditions = ['srt', 'sjson'] if has_renditions else []
+        renditions_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, RENDITIONS=renditions)
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=renditions_settings):
+            self.v1_transcript1.save_transcript(File(open(self.flash_transcript_path, 'rb')), 'srt')
+
+        with patch.object(Transcript, 'convert', wraps=Transcript.convert) as mock_convert:
+            transcript = api.get_video_transcript_data('super-soaker', 'en', output_format='sjson')
+
+        self.assertEqual(mock_convert.call_count, 0 if has_renditions else 1)
+        self.assertEqual(transcript['file_name'], 'Shallow Swordfish-en.sjson')
+        self.assertEqual(
+            json.loads(transcript['content']),
+            json.loads(Transcript.convert(File(open(self.flash_transcript_path, 'rb')).read(), 'srt', 'sjson'))
+        )
+
+    def test_get_video_transcript_data_invalid_output_format(self):
+        """
+        Verify that `get_video_transcript_data` rejects unsupported output formats.
+        """
+        with self.assertRaises(InvalidTranscriptFormat):
+            api.get_video_transcript_data('super-soaker', 'en', output_format='vtt')
+
     def test_get_video_transcript_url(self):
         """
         Verify that `get_video_transcript_url` api function works as expected.
@@ -3128,6 +3809,47 @@ class TranscriptTest(TestCase):
             query_filter['language_code']
         )
 
+    def test_content_addressed_transcripts(self):
+        """
+        Verify that identical content addressed transcripts share one stored file, which is
+        deleted only once no transcript references it anymore.
+        """
+        content_addressed_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, CONTENT_ADDRESSED=True)
+        storage = utils.get_video_transcript_storage()
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=content_addressed_settings):
+            self.v1_transcript2.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'srt')
+            with patch.object(storage.__class__, 'save') as mock_save:
+                self.v1_transcript1.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'srt')
+
+        mock_save.assert_not_called()
+        transcript_name = self.v1_transcript2.transcript.name
+        self.assertEqual(transcript_name, f'video-transcripts/{self.v1_transcript2.content_hash}.srt')
+        self.assertEqual(self.v1_transcript1.transcript.name, transcript_name)
+
+        api.delete_video_transcript(video_id='super-soaker', language_code='fr')
+        self.assertTrue(storage.exists(transcript_name))
+        self.assertEqual(
+            api.get_video_transcript_data('super-soaker', 'en')['content'],
+            constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8')
+        )
+
+        api.delete_video_transcript(video_id='super-soaker', language_code='en')
+        self.assertFalse(storage.exists(transcript_name))
+
+    def test_delete_transcript_without_reference_check(self):
+        """
+        Verify that transcript files which are not content addressed are deleted without looking up references.
+        """
+        storage = utils.get_video_transcript_storage()
+        self.v1_transcript1.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'srt')
+        transcript_name = self.v1_transcript1.transcript.name
+
+        with patch.object(VideoTranscript, 'is_file_referenced') as mock_is_file_referenced:
+            api.delete_video_transcript(video_id='super-soaker', language_code='en')
+
+        mock_is_file_referenced.assert_not_called()
+        self.assertFalse(storage.exists(transcript_name))
+
     def test_create_transcript_file(self):
         """
         Tests that transcript file is created correctly.
@@ -3195,6 +3917,29 @@ class TranscriptTest(TestCase):
         transcript = api.get_video_transcript_data(video_id=video_id, language_code=language_code)
         self.assertEqual(transcript['content'], expected_transcript_content)
 
+    def test_create_transcript_file_from_given_format(self):
+        """
+        Tests that the transcript content is converted from the given file format.
+        """
+        video_transcript = VideoTranscript.objects.get(video__edx_video_id='super-soaker', language_code='en')
+        video_transcript.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['wow']), utils.TranscriptFormat.SJSON)
+        VideoTranscript.objects.filter(pk=video_transcript.pk).update(file_format=utils.TranscriptFormat.SRT)
+        file_system = OSFS(self.temp_dir)
+
+        transcript_file_name = api.create_transcript_file(
+            video_id='super-soaker',
+            language_code='en',
+            file_format=utils.TranscriptFormat.SJSON,
+            static_dir=constants.EXPORT_IMPORT_STATIC_DIR,
+            resource_fs=file_system
+        )
+
+        with file_system.open(combine(constants.EXPORT_IMPORT_STATIC_DIR, transcript_file_name)) as transcript_file:
+            self.assertEqual(
+                transcript_file.read(),
+                Transcript.convert(constants.TRANSCRIPT_DATA['wow'].encode('utf-8'), 'sjson', 'srt')
+            )
+
     @data(
         ('invalid-video-id', 'invalid-language-code'),
         ('super-soaker', 'invalid-language-code')
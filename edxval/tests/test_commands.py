@@ -0,0 +1,444 @@
+"""
+Tests for the management commands of the Video Abstraction Layer
+"""
+import json
+import shutil
+from io import StringIO
+from tempfile import mkdtemp
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from edxval import api
+from edxval.models import (
+    CourseVideo,
+    StorageDeletion,
+    StorageMigration,
+    Video,
+    VideoImage,
+    VideoTranscript,
+    get_video_file_storage,
+)
+from edxval.tests import constants
+from edxval.utils import VideoStorage, compute_content_hash, get_sharded_name
+
+
+@override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, DEFER_DELETION=True))
+class ProcessStorageDeletionsTest(TestCase):
+    """
+    Tests the process_storage_deletions management command.
+    """
+
+    def setUp(self):
+        """
+        Creates a transcript whose deletion is deferred.
+        """
+        super().setUp()
+        self.video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        self.transcript = VideoTranscript.objects.create(
+            video=self.video, language_code='en', file_format='srt', provider='Custom'
+        )
+        self.transcript.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'srt')
+        self.storage = get_video_file_storage(VideoStorage.TRANSCRIPTS)
+        self.name = self.transcript.transcript.name
+        self.addCleanup(self.storage.delete, self.name)
+
+    def test_deferred_deletion(self):
+        """
+        Tests that deleting a transcript queues its file, which is deleted by the command.
+        """
+        api.delete_video_transcript(self.video.edx_video_id, 'en')
+
+        self.assertTrue(self.storage.exists(self.name))
+        self.assertEqual(
+            list(StorageDeletion.objects.values_list('storage', 'name')), [(VideoStorage.TRANSCRIPTS, self.name)]
+        )
+
+        out = StringIO()
+        call_command('process_storage_deletions', stdout=out)
+
+        self.assertFalse(self.storage.exists(self.name))
+        self.assertFalse(StorageDeletion.objects.exists())
+        self.assertIn('Deleted 1 queued files, 0 failed.', out.getvalue())
+
+    @patch('edxval.management.commands.process_storage_deletions.delete_files_from_storage')
+    def test_failed_deletion_retries(self, mock_delete_files):
+        """
+        Tests that failed deletions stay queued and are retried until the maximum number of attempts.
+        """
+        mock_delete_files.side_effect = lambda storage, names: {name: 'Timeout' for name in names}
+        api.delete_video_transcript(self.video.edx_video_id, 'en')
+
+        call_command('process_storage_deletions', '--max-attempts', '2', stdout=StringIO())
+        call_command('process_storage_deletions', '--max-attempts', '2', stdout=StringIO())
+        call_command('process_storage_deletions', '--max-attempts', '2', stdout=StringIO())
+
+        deletion = StorageDeletion.objects.get()
+        self.assertEqual(deletion.attempts, 2)
+        self.assertEqual(deletion.last_error, 'Timeout')
+        self.assertEqual(mock_delete_files.call_count, 2)
+
+    def test_referenced_again(self):
+        """
+        Tests that a queued content addressed transcript file which is referenced again is not deleted.
+        """
+        name = f'video-transcripts/{self.transcript.content_hash}.srt'
+        self.storage.save(name, ContentFile(constants.TRANSCRIPT_DATA['overwatch']))
+        self.addCleanup(self.storage.delete, name)
+        StorageDeletion.objects.create(storage=VideoStorage.TRANSCRIPTS, name=name)
+        VideoTranscript.objects.filter(pk=self.transcript.pk).update(transcript=name)
+
+        out = StringIO()
+        call_command('process_storage_deletions', stdout=out)
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertFalse(StorageDeletion.objects.exists())
+
+
+class DeleteOrphanedVideoFilesTest(TestCase):
+    """
+    Tests the delete_orphaned_video_files management command.
+    """
+
+    def setUp(self):
+        """
+        Creates referenced and orphaned image and transcript files.
+        """
+        super().setUp()
+        video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        course_video = CourseVideo.objects.create(video=video, course_id='test-course')
+        VideoImage.objects.create(
+            course_video=course_video, image='video-images/used.jpg', generated_images=['video-images/generated.jpg']
+        )
+        transcript = VideoTranscript.objects.create(
+            video=video, language_code='en', file_format='srt', provider='Custom'
+        )
+        transcript.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'srt')
+
+        self.image_storage = get_video_file_storage(VideoStorage.IMAGES)
+        self.transcript_storage = get_video_file_storage(VideoStorage.TRANSCRIPTS)
+        self.referenced_files = [
+            (self.image_storage, self.save_file(self.image_storage, 'video-images/used.jpg')),
+            (self.image_storage, self.save_file(self.image_storage, 'video-images/generated.jpg')),
+            (self.transcript_storage, transcript.transcript.name),
+        ]
+        self.orphaned_files = [
+            (self.image_storage, self.save_file(self.image_storage, 'video-images/orphan.jpg')),
+            (self.transcript_storage, self.save_file(self.transcript_storage, 'video-transcripts/orphan.srt')),
+        ]
+        for storage, name in self.referenced_files + self.orphaned_files:
+            self.addCleanup(storage.delete, name)
+
+    def save_file(self, storage, name):
+        """
+        Saves a file in a storage and returns its name.
+        """
+        storage.delete(name)
+        return storage.save(name, ContentFile(b'content'))
+
+    def test_dry_run(self):
+        """
+        Tests that orphaned files are only reported in a dry run.
+        """
+        out = StringIO()
+        call_command('delete_orphaned_video_files', '--dry-run', '--min-age-hours', '0', stdout=out)
+
+        self.assertIn('Orphaned file in video_images: video-images/orphan.jpg', out.getvalue())
+        self.assertIn('Orphaned file in video_transcripts: video-transcripts/orphan.srt', out.getvalue())
+        for storage, name in self.referenced_files + self.orphaned_files:
+            self.assertTrue(storage.exists(name))
+
+    def test_delete_orphaned_files(self):
+        """
+        Tests that only the orphaned files are deleted.
+        """
+        call_command('delete_orphaned_video_files', '--min-age-hours', '0', '--batch-size', '1', stdout=StringIO())
+
+        for storage, name in self.referenced_files:
+            self.assertTrue(storage.exists(name))
+        for storage, name in self.orphaned_files:
+            self.assertFalse(storage.exists(name))
+
+    def test_recent_files_kept(self):
+        """
+        Tests that recently modified files are not deleted.
+        """
+        call_command('delete_orphaned_video_files', '--storage', VideoStorage.IMAGES, stdout=StringIO())
+
+        for storage, name in self.orphaned_files:
+            self.assertTrue(storage.exists(name))
+
+    def test_empty_directory_prefix(self):
+        """
+        Tests that storages without a DIRECTORY_PREFIX are only cleaned up with an explicit prefix.
+        """
+        images_settings = dict(settings.VIDEO_IMAGE_SETTINGS, DIRECTORY_PREFIX='')
+        with override_settings(VIDEO_IMAGE_SETTINGS=images_settings):
+            with self.assertRaises(CommandError):
+                call_command('delete_orphaned_video_files', '--min-age-hours', '0', stdout=StringIO())
+            for storage, name in self.referenced_files + self.orphaned_files:
+                self.assertTrue(storage.exists(name))
+
+            call_command(
+                'delete_orphaned_video_files',
+                '--storage', VideoStorage.IMAGES,
+                '--prefix', 'video-images/',
+                '--min-age-hours', '0',
+                stdout=StringIO(),
+            )
+
+        self.assertFalse(self.image_storage.exists('video-images/orphan.jpg'))
+        self.assertTrue(self.image_storage.exists('video-images/used.jpg'))
+
+
+class ShardVideoFilesTest(TestCase):
+    """
+    Tests the shard_video_files management command.
+    """
+
+    def setUp(self):
+        """
+        Creates a transcript stored in the flat layout.
+        """
+        super().setUp()
+        video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        self.transcript = VideoTranscript.objects.create(
+            video=video, language_code='en', file_format='srt', provider='Custom'
+        )
+        self.transcript.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['overwatch']), 'srt')
+        self.storage = get_video_file_storage(VideoStorage.TRANSCRIPTS)
+        self.old_name = self.transcript.transcript.name
+        filename = self.old_name[len('video-transcripts/'):]
+        self.new_name = f'video-transcripts/{get_sharded_name(filename)}'
+        self.addCleanup(self.storage.delete, self.old_name)
+        self.addCleanup(self.storage.delete, self.new_name)
+
+    def test_sharding_not_enabled(self):
+        """
+        Tests that files are not moved if sharded paths are not enabled.
+        """
+        out = StringIO()
+        call_command('shard_video_files', '--storage', VideoStorage.TRANSCRIPTS, stdout=out)
+
+        self.assertIn('SHARDED_PATHS is not enabled for video_transcripts, skipping.', out.getvalue())
+        self.transcript.refresh_from_db()
+        self.assertEqual(self.transcript.transcript.name, self.old_name)
+
+    @override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, SHARDED_PATHS=True))
+    def test_dry_run(self):
+        """
+        Tests that files which would be moved are only reported in a dry run.
+        """
+        out = StringIO()
+        call_command('shard_video_files', '--storage', VideoStorage.TRANSCRIPTS, '--dry-run', stdout=out)
+
+        self.assertIn(f'Would move {self.old_name} to {self.new_name} in video_transcripts', out.getvalue())
+        self.assertTrue(self.storage.exists(self.old_name))
+        self.assertFalse(self.storage.exists(self.new_name))
+
+    @override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, SHARDED_PATHS=True))
+    def test_shard_video_files(self):
+        """
+        Tests that flat files are moved to their sharded paths and their rows updated.
+        """
+        out = StringIO()
+        call_command('shard_video_files', '--storage', VideoStorage.TRANSCRIPTS, '--workers', '2', stdout=out)
+
+        self.assertIn('Moved 1 files to sharded paths in video_transcripts, 0 failed.', out.getvalue())
+        self.transcript.refresh_from_db()
+        self.assertEqual(self.transcript.transcript.name, self.new_name)
+        self.assertFalse(self.storage.exists(self.old_name))
+        with self.storage.open(self.new_name) as transcript_file:
+            self.assertEqual(transcript_file.read().decode('utf-8'), constants.TRANSCRIPT_DATA['overwatch'])
+
+        # Files already moved are skipped when running again.
+        out = StringIO()
+        call_command('shard_video_files', '--storage', VideoStorage.TRANSCRIPTS, stdout=out)
+        self.assertIn('Moved 0 files to sharded paths in video_transcripts, 0 failed.', out.getvalue())
+
+    @override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, SHARDED_PATHS=True))
+    def test_shard_shared_rendition(self):
+        """
+        Tests that a file used as the rendition of another transcript is renamed there too before being deleted.
+        """
+        other_transcript = VideoTranscript.objects.create(
+            video=self.transcript.video, language_code='fr', file_format='sjson', provider='Custom',
+            renditions={'srt': self.old_name}
+        )
+
+        call_command('shard_video_files', '--storage', VideoStorage.TRANSCRIPTS, stdout=StringIO())
+
+        other_transcript.refresh_from_db()
+        self.assertEqual(other_transcript.renditions, {'srt': self.new_name})
+        self.assertFalse(self.storage.exists(self.old_name))
+
+    @override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, SHARDED_PATHS=True))
+    def test_old_name_still_referenced(self):
+        """
+        Tests that an old file which is still referenced after the rows are renamed is not deleted.
+        """
+        with patch.object(VideoTranscript, 'is_file_referenced', return_value=True):
+            call_command('shard_video_files', '--storage', VideoStorage.TRANSCRIPTS, stdout=StringIO())
+
+        self.assertTrue(self.storage.exists(self.old_name))
+
+    @override_settings(VIDEO_IMAGE_SETTINGS=dict(settings.VIDEO_IMAGE_SETTINGS, SHARDED_PATHS=True))
+    def test_shard_generated_images(self):
+        """
+        Tests that generated images are moved and renamed along with the images of course videos.
+        """
+        storage = get_video_file_storage(VideoStorage.IMAGES)
+        names = ['video-images/gen1.png', 'video-images/gen2.png']
+        sharded_names = [f'video-images/{get_sharded_name(name[len("video-images/"):])}' for name in names]
+        for name, sharded_name in zip(names, sharded_names):
+            storage.save(name, ContentFile(b'image'))
+            self.addCleanup(storage.delete, name)
+            self.addCleanup(storage.delete, sharded_name)
+        course_video = CourseVideo.objects.create(video=self.transcript.video, course_id='test-course')
+        video_image = VideoImage.objects.create(course_video=course_video, image=names[0], generated_images=names)
+
+        out = StringIO()
+        call_command('shard_video_files', '--storage', VideoStorage.IMAGES, stdout=out)
+
+        self.assertIn('Moved 2 files to sharded paths in video_images, 0 failed.', out.getvalue())
+        video_image.refresh_from_db()
+        self.assertEqual(video_image.image.name, sharded_names[0])
+        self.assertEqual(video_image.generated_images, sharded_names)
+        for name, sharded_name in zip(names, sharded_names):
+            self.assertFalse(storage.exists(name))
+            self.assertTrue(storage.exists(sharded_name))
+
+
+class MigrateVideoFilesTest(TestCase):
+    """
+    Tests the migrate_video_files management command.
+    """
+
+    def setUp(self):
+        """
+        Creates transcripts whose files are only in a source storage.
+        """
+        super().setUp()
+        self.source_location = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source_location)
+        source = FileSystemStorage(location=self.source_location)
+        self.destination = get_video_file_storage(VideoStorage.TRANSCRIPTS)
+
+        video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        self.names = []
+        for language_code in ('en', 'fr'):
+            content = ContentFile(constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8'))
+            name = source.save(f'video-transcripts/{language_code}.srt', content)
+            VideoTranscript.objects.create(
+                video=video,
+                language_code=language_code,
+                transcript=name,
+                file_format='srt',
+                content_hash=compute_content_hash(content),
+            )
+            self.names.append(name)
+            self.addCleanup(self.destination.delete, name)
+
+    def call_command(self, *args):
+        """
+        Calls the command migrating the transcripts from the source storage and returns its output.
+        """
+        out = StringIO()
+        call_command(
+            'migrate_video_files',
+            '--name', 'test',
+            '--storage', VideoStorage.TRANSCRIPTS,
+            '--source-storage-class', 'django.core.files.storage.FileSystemStorage',
+            '--source-storage-kwargs', json.dumps({'location': self.source_location}),
+            '--batch-size', '1',
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_migrate_video_files(self):
+        """
+        Tests that files are copied and the migration is checkpointed.
+        """
+        output = self.call_command('--workers', '2', '--max-rate', '1000')
+
+        self.assertIn('2 files copied, 0 skipped, 0 failed.', output)
+        for name in self.names:
+            with self.destination.open(name) as transcript_file:
+                self.assertEqual(transcript_file.read().decode('utf-8'), constants.TRANSCRIPT_DATA['overwatch'])
+
+        migration = StorageMigration.objects.get(name='test', storage=VideoStorage.TRANSCRIPTS)
+        self.assertEqual(migration.last_id, VideoTranscript.objects.latest('id').id)
+
+    def test_resume_migration(self):
+        """
+        Tests that a migration is resumed after its last processed row and skips files already copied.
+        """
+        first_transcript = VideoTranscript.objects.earliest('id')
+        self.destination.save(first_transcript.transcript.name, ContentFile(b'partial'))
+        StorageMigration.objects.create(name='test', storage=VideoStorage.TRANSCRIPTS, last_id=first_transcript.id)
+
+        output = self.call_command()
+
+        self.assertIn('1 files copied, 0 skipped, 0 failed.', output)
+        with self.destination.open(first_transcript.transcript.name) as transcript_file:
+            self.assertEqual(transcript_file.read(), b'partial')
+
+    def test_verification_failure(self):
+        """
+        Tests that copies which don't match the stored content hash are reported as failed.
+        """
+        VideoTranscript.objects.update(content_hash='0' * 64)
+
+        output = self.call_command()
+
+        self.assertIn('0 files copied, 0 skipped, 2 failed.', output)
+
+    def test_retry_failed_files(self):
+        """
+        Tests that files which failed are recorded and retried when the migration is resumed.
+        """
+        with patch('edxval.management.commands.migrate_video_files.compute_stored_file_hash', return_value=''):
+            output = self.call_command()
+
+        self.assertIn('0 files copied, 0 skipped, 2 failed.', output)
+        migration = StorageMigration.objects.get(name='test', storage=VideoStorage.TRANSCRIPTS)
+        self.assertEqual(set(migration.failed_files), set(self.names))
+
+        output = self.call_command()
+
+        self.assertIn('2 files copied, 0 skipped, 0 failed.', output)
+        migration.refresh_from_db()
+        self.assertEqual(migration.failed_files, {})
+        for name in self.names:
+            self.assertTrue(self.destination.exists(name))
+
+    def test_migrate_generated_images(self):
+        """
+        Tests that the generated images of video images are copied along with their image.
+        """
+        source = FileSystemStorage(location=self.source_location)
+        destination = get_video_file_storage(VideoStorage.IMAGES)
+        names = [source.save(f'video-images/{name}', ContentFile(b'image')) for name in ('gen1.png', 'gen2.png')]
+        for name in names:
+            self.addCleanup(destination.delete, name)
+        course_video = CourseVideo.objects.create(video=Video.objects.get(), course_id='test-course')
+        VideoImage.objects.create(course_video=course_video, image=names[0], generated_images=names)
+
+        out = StringIO()
+        call_command(
+            'migrate_video_files',
+            '--name', 'test',
+            '--storage', VideoStorage.IMAGES,
+            '--source-storage-class', 'django.core.files.storage.FileSystemStorage',
+            '--source-storage-kwargs', json.dumps({'location': self.source_location}),
+            stdout=out,
+        )
+
+        self.assertIn('2 files copied, 0 skipped, 0 failed.', out.getvalue())
+        for name in names:
+            self.assertTrue(destination.exists(name))
@@ -1,10 +1,20 @@
 """ Test for models """
 
+import gzip
+import json
 
-from django.test import TestCase
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
 
-from edxval.models import CourseVideo, Video, VideoImage, VideoTranscript
+from edxval.models import CourseVideo, Video, VideoImage, VideoTranscript, iter_referenced_file_names
 from edxval.tests import constants
+from edxval.utils import (
+    TranscriptContentEncoding,
+    VideoStorage,
+    generate_file_content_hash,
+    get_video_transcript_storage,
+)
 
 
 class VideoTranscriptTest(TestCase):
@@ -35,6 +45,79 @@ class VideoTranscriptTest(TestCase):
         self.assertNotIn('\n', video_trancript.filename)
         assert str(video_trancript) == "en Transcript for new-line-not-allowed"
 
+    def test_save_transcript_content_hash(self):
+        """
+        Test that saving transcript content records its content hash and that
+        pointing the transcript to another file name resets it.
+        """
+        video = Video.objects.create(**constants.VIDEO_DICT_NEW_LINE)
+        video_transcript = VideoTranscript(video=video, language_code='en', file_format='srt')
+        video_transcript.save_transcript(ContentFile(self.transcript_data['file_data']), 'srt')
+        self.assertEqual(
+            video_transcript.content_hash,
+            generate_file_content_hash(ContentFile(self.transcript_data['file_data']))
+        )
+        self.assertEqual(video_transcript.get_content_hash(), video_transcript.content_hash)
+
+        video_transcript.save_transcript(None, 'srt', file_name='other-transcript.srt')
+        self.assertEqual(VideoTranscript.objects.get(pk=video_transcript.pk).content_hash, '')
+
+    def test_save_compressed_transcript(self):
+        """
+        Test that transcripts saved with compression enabled are stored gzipped, hashed
+        over their uncompressed content and transparently decompressed when read.
+        """
+        file_data = self.transcript_data['file_data']
+        video = Video.objects.create(**constants.VIDEO_DICT_NEW_LINE)
+        video_transcript = VideoTranscript(video=video, language_code='en', file_format='srt')
+        compression_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, COMPRESSION='gzip')
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=compression_settings):
+            video_transcript.save_transcript(ContentFile(file_data), 'srt')
+
+        video_transcript = VideoTranscript.objects.get(pk=video_transcript.pk)
+        self.assertEqual(video_transcript.content_encoding, TranscriptContentEncoding.GZIP)
+        self.assertTrue(video_transcript.transcript.name.endswith('.srt.gz'))
+        self.assertEqual(video_transcript.content_hash, generate_file_content_hash(ContentFile(file_data)))
+        self.assertEqual(video_transcript.read_content(), file_data.encode('utf-8'))
+
+        video_transcript.transcript.open()
+        self.assertEqual(gzip.decompress(video_transcript.read_content(decompress=False)), file_data.encode('utf-8'))
+
+    def test_save_transcript_renditions(self):
+        """
+        Test that transcripts are also stored in the formats listed in RENDITIONS, and that
+        the renditions of replaced content are deleted.
+        """
+        video = Video.objects.create(**constants.VIDEO_DICT_NEW_LINE)
+        video_transcript = VideoTranscript(video=video, language_code='en', file_format='srt')
+        renditions_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, RENDITIONS=['srt', 'sjson'])
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=renditions_settings):
+            video_transcript.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['flash']), 'srt')
+
+        video_transcript = VideoTranscript.objects.get(pk=video_transcript.pk)
+        self.assertEqual(list(video_transcript.renditions), ['sjson'])
+        sjson_name = video_transcript.renditions['sjson']
+        self.assertTrue(sjson_name.endswith('.sjson'))
+        self.assertEqual(json.loads(video_transcript.read_content(file_format='sjson'))['start'][0], 7180)
+        self.assertIn(sjson_name, iter_referenced_file_names(VideoStorage.TRANSCRIPTS))
+
+        video_transcript.save_transcript(ContentFile(constants.TRANSCRIPT_DATA['flash']), 'srt')
+        self.assertEqual(video_transcript.renditions, {})
+        self.assertFalse(get_video_transcript_storage().exists(sjson_name))
+
+    @override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, RENDITIONS=['srt']))
+    def test_save_transcript_without_renditions(self):
+        """
+        Test that a transcript which cannot be converted is stored without renditions.
+        """
+        video = Video.objects.create(**constants.VIDEO_DICT_NEW_LINE)
+        video_transcript = VideoTranscript(video=video, language_code='en', file_format='sjson')
+        video_transcript.save_transcript(ContentFile(b'[]'), 'sjson')
+
+        video_transcript = VideoTranscript.objects.get(pk=video_transcript.pk)
+        self.assertEqual(video_transcript.renditions, {})
+        self.assertEqual(video_transcript.read_content(), b'[]')
+
 
 class VideoImageTest(TestCase):
     """
@@ -73,3 +156,15 @@ class VideoImageTest(TestCase):
         video_image, _ = VideoImage.create_or_update(self.course_video, generated_images=self.generated_images)
         self.assertNotEqual(video_image.image, self.generated_images[0])
         self.assertEqual(video_image.image, manually_uploaded_img)
+
+    def test_is_image_shared(self):
+        """
+        Test that an image file is shared only if another video image uses it.
+        """
+        self.video_image.image = 'image.jpeg'
+        self.video_image.save()
+        self.assertFalse(VideoImage.is_image_shared(self.video_image))
+
+        rerun_course_video = CourseVideo.objects.create(video=self.course_video.video, course_id='test-course-rerun')
+        VideoImage.create_or_update(rerun_course_video, 'image.jpeg')
+        self.assertTrue(VideoImage.is_image_shared(self.video_image))
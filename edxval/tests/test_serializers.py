@@ -127,6 +127,17 @@ class SerializerTests(TestCase):
         matching_dict = {k: v for k, v in result.items() if k in constants.VIDEO_DICT_FISH}
         assert constants.VIDEO_DICT_FISH == matching_dict
 
+    def test_video_output_fields(self):
+        """
+        Tests that the output of VideoSerializer is limited to the given fields
+        """
+        video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        result = VideoSerializer([video], many=True, fields=['edx_video_id', 'status']).data
+        self.assertEqual(
+            result,
+            [{'edx_video_id': video.edx_video_id, 'status': video.status}]
+        )
+
     def test_no_profile_validation(self):
         """
         Tests when there are no profiles to validation when deserializing
@@ -5,9 +5,11 @@ Tests for transcript utils.
 
 import json
 import textwrap
+from unittest.mock import patch
 
 from ddt import data, ddt, unpack
 from django.test import TestCase
+from pysrt import SubRipFile
 
 from edxval.exceptions import TranscriptsGenerationException
 from edxval.transcript_utils import Transcript
@@ -110,3 +112,17 @@ class TestTranscriptUtils(TestCase):
 
         """).encode('latin-1')
         Transcript.convert(latin1_srt_transcript, 'srt', 'sjson')
+
+    def test_convert_parsed(self):
+        """
+        Tests that already parsed transcript cues are converted without parsing the content again.
+        """
+        sjson_subs = json.loads(self.sjson_transcript.decode('utf8'))
+        srt_subs = Transcript.convert_parsed(sjson_subs, 'sjson', 'srt')
+        self.assertEqual(srt_subs, self.srt_transcript.decode('utf8'))
+
+        parsed_srt_subs = SubRipFile.from_string(srt_subs)
+        with patch('edxval.transcript_utils.SubRipFile.from_string') as mock_from_string:
+            actual = Transcript.convert_parsed(parsed_srt_subs, 'srt', 'sjson')
+        mock_from_string.assert_not_called()
+        self.assertDictEqual(json.loads(actual), sjson_subs)
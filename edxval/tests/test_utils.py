@@ -2,10 +2,43 @@
 """
 Tests the utilities for the Video Abstraction Layer
 """
+import gzip
+import io
+import shutil
+from tempfile import mkdtemp
+from unittest import mock
+
+from ddt import data, ddt, unpack
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files.base import ContentFile
-from django.test import TestCase
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from pysrt.srtexc import Error
 
-from edxval.utils import generate_file_content_hash, is_duplicate_file
+from edxval.tests import constants
+from edxval.utils import (
+    TRANSCRIPT_FORMAT_SNIFF_LENGTH,
+    DecompressedFile,
+    TranscriptFormat,
+    VideoStorage,
+    compute_stored_file_hash,
+    delete_files_from_storage,
+    generate_file_content_hash,
+    get_presigned_upload_url,
+    get_sharded_name,
+    get_transcript_content_encoding,
+    get_transcript_format,
+    get_video_file_path,
+    is_duplicate_file,
+    iter_storage_files,
+    map_local_file,
+    map_stored_file,
+    parse_spooled_transcript,
+    parse_transcript,
+    sniff_transcript_format,
+    spool_transcript_file,
+)
 
 
 class UtilityTests(TestCase):
@@ -49,3 +82,256 @@ class UtilityTests(TestCase):
         other_file_data = ContentFile(other_file_content)
 
         self.assertFalse(is_duplicate_file(file_data, other_file_data))
+
+    def test_delete_files_from_storage(self):
+        """
+        Tests that files are deleted one at a time and failures are reported.
+        """
+        storage = mock.Mock(spec=['delete'])
+        storage.delete.side_effect = [None, OSError('Permission denied')]
+
+        errors = delete_files_from_storage(storage, ['a.srt', 'b.srt'])
+
+        self.assertEqual(errors, {'b.srt': 'Permission denied'})
+        self.assertEqual(storage.delete.call_args_list, [mock.call('a.srt'), mock.call('b.srt')])
+
+    @mock.patch('edxval.utils.S3_DELETE_OBJECTS_MAX_KEYS', 2)
+    def test_delete_files_from_s3_storage(self):
+        """
+        Tests that files are deleted from S3 with batched DeleteObjects requests.
+        """
+        storage = mock.Mock(spec=['bucket', '_normalize_name', 'delete'])
+        storage._normalize_name.side_effect = lambda name: f'prefix/{name}'  # pylint: disable=protected-access
+        storage.bucket.delete_objects.side_effect = [
+            {'Errors': [{'Key': 'prefix/b.srt', 'Code': 'AccessDenied', 'Message': 'Access Denied'}]},
+            {},
+        ]
+
+        errors = delete_files_from_storage(storage, ['a.srt', 'b.srt', 'c.srt'])
+
+        self.assertEqual(errors, {'b.srt': 'Access Denied'})
+        self.assertEqual(storage.bucket.delete_objects.call_args_list, [
+            mock.call(Delete={'Objects': [{'Key': 'prefix/a.srt'}, {'Key': 'prefix/b.srt'}], 'Quiet': True}),
+            mock.call(Delete={'Objects': [{'Key': 'prefix/c.srt'}], 'Quiet': True}),
+        ])
+        storage.delete.assert_not_called()
+
+    def test_get_presigned_upload_url(self):
+        """
+        Tests that presigned upload urls are only issued by S3 storages, for the key of the file.
+        """
+        self.assertIsNone(get_presigned_upload_url(mock.Mock(spec=['save']), 'video-images/a.jpg', 60))
+
+        storage = mock.Mock(spec=['bucket_name', 'connection', '_normalize_name'])
+        storage.bucket_name = 'bucket'
+        storage._normalize_name.side_effect = lambda name: f'edx/{name}'  # pylint: disable=protected-access
+        generate_presigned_url = storage.connection.meta.client.generate_presigned_url
+        generate_presigned_url.return_value = 'https://bucket.s3.amazonaws.com/edx/video-images/a.jpg?signature'
+
+        self.assertEqual(
+            get_presigned_upload_url(storage, 'video-images/a.jpg', 60), generate_presigned_url.return_value
+        )
+        generate_presigned_url.assert_called_once_with(
+            'put_object',
+            Params={'Bucket': 'bucket', 'Key': 'edx/video-images/a.jpg'},
+            ExpiresIn=60,
+            HttpMethod='PUT',
+        )
+
+    def test_compute_stored_file_hash(self):
+        """
+        Tests that stored files are hashed memory mapped on local storages and read on other storages.
+        """
+        storage = FileSystemStorage(location=mkdtemp())
+        self.addCleanup(shutil.rmtree, storage.location)
+        for content in (b'Greetings', b''):
+            name = storage.save('greetings.txt', ContentFile(content))
+            expected_hash = generate_file_content_hash(ContentFile(content))
+            self.assertEqual(compute_stored_file_hash(storage, name), expected_hash)
+
+            with mock.patch('edxval.utils.get_local_file_path', return_value=None):
+                self.assertEqual(compute_stored_file_hash(storage, name), expected_hash)
+            storage.delete(name)
+
+    def test_map_stored_file(self):
+        """
+        Tests that stored files are memory mapped on local storages and read on other storages.
+        """
+        storage = FileSystemStorage(location=mkdtemp())
+        self.addCleanup(shutil.rmtree, storage.location)
+        for content in (b'Greetings', b''):
+            name = storage.save('greetings.txt', ContentFile(content))
+            with mock.patch('edxval.utils.map_local_file', wraps=map_local_file) as mock_map_local_file:
+                with map_stored_file(storage, name) as buffer:
+                    self.assertEqual(bytes(buffer), content)
+            mock_map_local_file.assert_called_once_with(storage.path(name))
+
+            with mock.patch('edxval.utils.get_local_file_path', return_value=None):
+                with map_stored_file(storage, name) as buffer:
+                    self.assertEqual(buffer, content)
+            storage.delete(name)
+
+    def test_iter_s3_storage_files(self):
+        """
+        Tests that S3 storages are listed page by page with keys made relative to the storage location.
+        """
+        storage = mock.Mock(spec=['bucket_name', 'connection', 'location', '_normalize_name'])
+        storage.bucket_name = 'bucket'
+        storage.location = 'edx'
+        storage._normalize_name.side_effect = lambda name: f'edx/{name}'  # pylint: disable=protected-access
+        paginator = storage.connection.meta.client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Contents': [{'Key': 'edx/video-images/a.jpg', 'LastModified': 1}]},
+            {'Contents': [{'Key': 'edx/video-images/ab/b.jpg', 'LastModified': 2}]},
+        ]
+
+        files = list(iter_storage_files(storage, 'video-images/'))
+
+        self.assertEqual(files, [('video-images/a.jpg', 1), ('video-images/ab/b.jpg', 2)])
+        paginator.paginate.assert_called_once_with(Bucket='bucket', Prefix='edx/video-images/')
+
+    def test_get_video_file_path(self):
+        """
+        Tests that new files are put in sharded subdirectories only if sharded paths are enabled.
+        """
+        self.assertEqual(get_video_file_path(VideoStorage.TRANSCRIPTS, 'a.srt'), 'video-transcripts/a.srt')
+
+        sharded_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, SHARDED_PATHS=True)
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=sharded_settings):
+            path = get_video_file_path(VideoStorage.TRANSCRIPTS, 'a.srt')
+
+        self.assertRegex(path, r'^video-transcripts/[0-9a-f]{2}/[0-9a-f]{2}/a\.srt$')
+        self.assertEqual(path, 'video-transcripts/{}'.format(get_sharded_name('a.srt')))
+
+    def test_get_transcript_content_encoding(self):
+        """
+        Tests that the transcript content encoding follows the COMPRESSION setting and rejects unsupported ones.
+        """
+        self.assertEqual(get_transcript_content_encoding(), '')
+
+        for compression, expected_encoding in (('gzip', 'gzip'), (None, '')):
+            compression_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, COMPRESSION=compression)
+            with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=compression_settings):
+                self.assertEqual(get_transcript_content_encoding(), expected_encoding)
+
+        compression_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, COMPRESSION='zstd')
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=compression_settings):
+            with self.assertRaises(ImproperlyConfigured):
+                get_transcript_content_encoding()
+
+    def test_decompressed_file(self):
+        """
+        Tests that compressed files are read decompressed and closed with the decompressed file.
+        """
+        compressed_file = io.BytesIO(gzip.compress(b'content'))
+        decompressed_file = DecompressedFile(compressed_file)
+
+        self.assertEqual(decompressed_file.read(), b'content')
+        decompressed_file.close()
+        self.assertTrue(compressed_file.closed)
+
+
+@ddt
+class TranscriptFormatTests(TestCase):
+    """
+    Tests transcript format sniffing and parsing.
+    """
+    @data(
+        (constants.TRANSCRIPT_DATA['flash'], TranscriptFormat.SRT),
+        (constants.TRANSCRIPT_DATA['wow'], TranscriptFormat.SJSON),
+        ('﻿' + constants.TRANSCRIPT_DATA['wow'], TranscriptFormat.SJSON),
+        (constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8'), TranscriptFormat.SRT),
+        (constants.TRANSCRIPT_DATA['wow'].encode('utf-8'), TranscriptFormat.SJSON),
+    )
+    @unpack
+    def test_sniff_transcript_format(self, transcript_content, expected_format):
+        """
+        Tests that the transcript format is sniffed from the beginning of the content.
+        """
+        self.assertEqual(sniff_transcript_format(transcript_content), expected_format)
+
+    def test_sniff_transcript_format_bounded(self):
+        """
+        Tests that sniffing only looks at a bounded prefix of the content.
+        """
+        transcript_content = mock.MagicMock()
+        transcript_content.__getitem__.return_value = '{}'
+
+        self.assertEqual(sniff_transcript_format(transcript_content), TranscriptFormat.SJSON)
+        transcript_content.__getitem__.assert_called_once_with(slice(None, TRANSCRIPT_FORMAT_SNIFF_LENGTH))
+
+    @data(
+        (constants.TRANSCRIPT_DATA['overwatch'], TranscriptFormat.SRT, 2),
+        (constants.TRANSCRIPT_DATA['wow'], TranscriptFormat.SJSON, 1),
+    )
+    @unpack
+    def test_parse_transcript(self, transcript_content, expected_format, expected_cue_count):
+        """
+        Tests that parsing returns the transcript format along with its cues.
+        """
+        parsed_transcript = parse_transcript(transcript_content)
+
+        self.assertEqual(parsed_transcript.file_format, expected_format)
+        self.assertEqual(parsed_transcript.cue_count, expected_cue_count)
+        self.assertEqual(get_transcript_format(transcript_content), expected_format)
+
+    @data(
+        (constants.TRANSCRIPT_DATA['overwatch'], 'edxval.utils.json.loads'),
+        (constants.TRANSCRIPT_DATA['wow'], 'edxval.utils.SubRipFile.from_string'),
+    )
+    @unpack
+    def test_get_transcript_format_single_parse(self, transcript_content, unused_parser):
+        """
+        Tests that only the parser of the sniffed format runs.
+        """
+        with mock.patch(unused_parser) as mock_parser:
+            get_transcript_format(transcript_content)
+
+        mock_parser.assert_not_called()
+
+    def test_parse_invalid_transcript(self):
+        """
+        Tests that parsing invalid content raises a pysrt error.
+        """
+        with self.assertRaises(Error):
+            parse_transcript('This is an invalid transcript file data.')
+
+        with self.assertRaises(Error):
+            parse_transcript('{This is an invalid sjson transcript.')
+
+    @data(
+        (constants.TRANSCRIPT_DATA['overwatch'], TranscriptFormat.SRT),
+        ('\ufeff' + constants.TRANSCRIPT_DATA['wow'], TranscriptFormat.SJSON),
+        ('', TranscriptFormat.SJSON),
+    )
+    @unpack
+    def test_spool_transcript_file(self, transcript_content, expected_format):
+        """
+        Tests that spooled transcripts are utf-8 encoded, hashed and their format detected like when parsing them.
+        """
+        transcript_file = io.StringIO(transcript_content.lstrip('\ufeff'))
+        with mock.patch('edxval.utils.TRANSCRIPT_SPOOL_CHUNK_SIZE', 16):
+            spooled_file, content_hash, sniffed_format = spool_transcript_file(transcript_file)
+
+        content = transcript_content.lstrip('\ufeff').encode('utf-8')
+        self.assertEqual(content_hash, generate_file_content_hash(ContentFile(content)))
+        parsed_transcript = parse_spooled_transcript(spooled_file, sniffed_format)
+        self.assertEqual(parsed_transcript, parse_transcript(transcript_content.lstrip('\ufeff')))
+        self.assertEqual(parsed_transcript.file_format, expected_format)
+        self.assertEqual(spooled_file.read(), content)
+
+    def test_spooled_invalid_transcript(self):
+        """
+        Tests that invalid spooled transcripts raise a pysrt error.
+        """
+        malformed_last_cue = (
+            constants.TRANSCRIPT_DATA['overwatch'] + '\n\n3\n00:00:18,600 -> not a timing\nBroken cue\n'
+        )
+        for transcript_content in (
+                'This is an invalid transcript file data.',
+                '{This is an invalid sjson transcript.',
+                malformed_last_cue,
+        ):
+            spooled_file, __, sniffed_format = spool_transcript_file(io.StringIO(transcript_content))
+            with self.assertRaises(Error):
+                parse_spooled_transcript(spooled_file, sniffed_format)
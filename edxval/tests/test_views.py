@@ -3,19 +3,30 @@ Tests for Video Abstraction Layer views
 """
 
 
+import gzip
+import io
 import json
+from datetime import timedelta
 from unittest.mock import patch
 
 from ddt import data, ddt, unpack
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.http import FileResponse
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from edx_rest_framework_extensions.permissions import IsStaff
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
-from edxval.models import CourseVideo, EncodedVideo, Profile, TranscriptProviderType, Video, VideoTranscript
+from edxval import api
+from edxval.exceptions import ValCannotCreateError
+from edxval.models import CourseVideo, EncodedVideo, Profile, TranscriptProviderType, Video, VideoImage, VideoTranscript
 from edxval.serializers import TranscriptSerializer
 from edxval.tests import APIAuthTestCase, constants
-from edxval.utils import TranscriptFormat
+from edxval.utils import TranscriptFormat, VideoStorage, generate_file_content_hash, get_video_transcript_storage
 
 
 class VideoDetail(APIAuthTestCase):
@@ -663,6 +674,59 @@ class VideoListTest(APIAuthTestCase):
             self.client.post(url, constants.COMPLETE_SET_STAR, format='json')
 
 
+class VideoBulkCreateViewTest(APIAuthTestCase):
+    """
+    Tests the creation of Videos in bulk via POST
+    """
+    def setUp(self):
+        """
+        Used for manually creating profile objects which EncodedVideos require.
+        """
+        Profile.objects.create(profile_name=constants.PROFILE_MOBILE)
+        Profile.objects.create(profile_name=constants.PROFILE_DESKTOP)
+        super().setUp()
+
+    def test_bulk_create(self):
+        """
+        Tests that valid videos are created and invalid ones are reported.
+        """
+        response = self.client.post(
+            reverse('video-bulk-create'),
+            [constants.COMPLETE_SET_FISH, constants.COMPLETE_SET_WITH_COURSE_KEY, constants.VIDEO_DICT_INVALID_ID],
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['created'] for result in response.data], [True, True, False])
+        self.assertIn('edx_video_id', response.data[2]['errors'])
+        self.assertEqual(Video.objects.count(), 2)
+        self.assertTrue(
+            CourseVideo.objects.filter(
+                course_id=constants.COMPLETE_SET_WITH_COURSE_KEY['courses'][0],
+                video__edx_video_id=constants.COMPLETE_SET_WITH_COURSE_KEY['edx_video_id']
+            ).exists()
+        )
+
+    def test_bulk_create_not_a_list(self):
+        """
+        Tests that the videos must be given as a list.
+        """
+        response = self.client.post(reverse('video-bulk-create'), constants.COMPLETE_SET_FISH, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'A list of videos must be specified.')
+
+    def test_bulk_create_no_perms(self):
+        """
+        Tests that users without the permission to add videos can not create videos in bulk.
+        """
+        self._login(unauthorized=True)
+        response = self.client.post(reverse('video-bulk-create'), [constants.COMPLETE_SET_FISH], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Video.objects.exists())
+
+
 class VideoDetailTest(APIAuthTestCase):
     """
     Tests for GET
@@ -696,17 +760,111 @@ class VideoDetailTest(APIAuthTestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         response = self.client.post(url, constants.VIDEO_DICT_ZEBRA, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        with self.assertNumQueries(7):
+        with self.assertNumQueries(8):
             self.client.get("/edxval/videos/")
         response = self.client.post(url, constants.COMPLETE_SET_FISH, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(10):
             self.client.get("/edxval/videos/")
         response = self.client.post(url, constants.COMPLETE_SET_STAR, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        with self.assertNumQueries(10):
+        with self.assertNumQueries(11):
             self.client.get("/edxval/videos/")
 
+    def test_conditional_get(self):
+        """
+        Tests that conditional GETs of a video are answered with a 304 until the video changes.
+        """
+        response = self.client.post(reverse('video-list'), constants.COMPLETE_SET_FISH, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse('video-detail', kwargs={'edx_video_id': constants.COMPLETE_SET_FISH['edx_video_id']})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        # Only the validators are queried, with a single query, the video is not serialized.
+        with self.assertNumQueries(5):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        EncodedVideo.objects.filter(video__edx_video_id=constants.COMPLETE_SET_FISH['edx_video_id']).first().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_get_fields(self):
+        """
+        Tests that GETting videos with the fields query parameter only returns and queries these fields.
+        """
+        url = reverse('video-list')
+        response = self.client.post(url, constants.COMPLETE_SET_FISH, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, constants.COMPLETE_SET_STAR, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Neither the encoded videos nor the courses are queried.
+        with self.assertNumQueries(6):
+            response = self.client.get(url, {'fields': 'edx_video_id,status'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(response.data, key=lambda video: video['edx_video_id']),
+            [
+                {'edx_video_id': video['edx_video_id'], 'status': video['status']}
+                for video in sorted([constants.COMPLETE_SET_FISH, constants.COMPLETE_SET_STAR],
+                                    key=lambda video: video['edx_video_id'])
+            ]
+        )
+
+    def test_get_expand(self):
+        """
+        Tests that GETting a video with the expand query parameter returns the requested nested resources.
+        """
+        response = self.client.post(reverse('video-list'), constants.COMPLETE_SET_FISH, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse('video-detail', kwargs={'edx_video_id': constants.COMPLETE_SET_FISH['edx_video_id']})
+        full_data = self.client.get(url).data
+
+        response = self.client.get(url, {'expand': 'encoded_videos'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {key: value for key, value in full_data.items() if key != 'courses'})
+
+        response = self.client.get(url, {'fields': 'url', 'expand': 'courses'})
+        self.assertEqual(response.data, {'url': full_data['url'], 'courses': full_data['courses']})
+
+        # Representations with different fields have different ETags.
+        response = self.client.get(url, {'fields': 'edx_video_id'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_unknown_fields(self):
+        """
+        Tests that GETting videos with unknown fields is rejected.
+        """
+        response = self.client.get(reverse('video-list'), {'fields': 'edx_video_id,secret', 'expand': 'profiles'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'fields': 'Unknown fields: profiles, secret'})
+
+    def test_conditional_get_list(self):
+        """
+        Tests that conditional GETs of the video list are answered with a 304 until a listed video changes.
+        """
+        url = reverse('video-list')
+        response = self.client.post(url, constants.COMPLETE_SET_FISH, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Video.objects.filter(edx_video_id=constants.COMPLETE_SET_FISH['edx_video_id']).update(
+            status='updated', modified=timezone.now() + timedelta(seconds=1)
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['status'], 'updated')
+
 
 @ddt
 class VideoImagesViewTest(APIAuthTestCase):
@@ -801,6 +959,58 @@ class VideoImagesViewTest(APIAuthTestCase):
             response.data['message']
         )
 
+    def test_bulk_update_auto_generated_images(self):
+        """
+        Tests POSTing generated images for many course videos at once.
+        """
+        VideoImage.create_or_update(self.course_video2, 'existing.png')
+        generated_images = ['video-images/a.png', 'video-images/b.png']
+        url = reverse('bulk-update-video-images')
+        response = self.client.post(
+            url,
+            [
+                {
+                    'course_id': self.course_id,
+                    'edx_video_id': self.video1.edx_video_id,
+                    'generated_images': generated_images,
+                },
+                {
+                    'course_id': self.course_id,
+                    'edx_video_id': self.video2.edx_video_id,
+                    'generated_images': generated_images,
+                },
+                {'course_id': 'does_not_exit_course', 'edx_video_id': 'super-soaker', 'generated_images': []},
+                {'course_id': self.course_id, 'edx_video_id': 'super-soaker', 'generated_images': [1, 2, 3]},
+                {'course_id': self.course_id},
+            ],
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['updated'] for result in response.data], [True, True, False, False, False])
+        self.assertEqual(response.data[2]['message'], 'CourseVideo not found for course_id: does_not_exit_course')
+        self.assertIn('list must only contain strings.', response.data[3]['message'])
+        self.assertEqual(
+            response.data[4]['message'], 'edx_video_id and generated_images must be specified to update a video image.'
+        )
+        video_images = {
+            video_image.course_video_id: video_image
+            for video_image in VideoImage.objects.all()
+        }
+        self.assertEqual(video_images[self.course_video1.id].image.name, generated_images[0])
+        self.assertEqual(video_images[self.course_video1.id].generated_images, generated_images)
+        self.assertEqual(video_images[self.course_video2.id].image.name, 'existing.png')
+        self.assertEqual(video_images[self.course_video2.id].generated_images, generated_images)
+
+    def test_bulk_update_not_a_list(self):
+        """
+        Tests that a list of video images is required.
+        """
+        response = self.client.post(reverse('bulk-update-video-images'), {'course_id': self.course_id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'A list of video images must be specified.')
+
 
 @ddt
 class VideoTranscriptViewTest(APIAuthTestCase):
@@ -1067,6 +1277,52 @@ class VideoStatusViewTest(APIAuthTestCase):
         self.assertIsNone(self.video.error_description)
 
 
+class VideoStatusBulkViewTest(APIAuthTestCase):
+    """
+    VideoStatusBulkView Tests.
+    """
+    def setUp(self):
+        """
+        Tests setup.
+        """
+        self.url = reverse('video-status-bulk-update')
+        Video.objects.create(**constants.VIDEO_DICT_FISH)
+        Video.objects.create(**constants.VIDEO_DICT_STAR)
+        super().setUp()
+
+    def test_video_status_bulk(self):
+        """
+        Tests PATCHing the status of many videos.
+        """
+        patch_data = [
+            {'edx_video_id': 'super-soaker', 'status': 'transcript_ready'},
+            {'edx_video_id': 'fake', 'status': 'transcript_ready'},
+            {'edx_video_id': 'super-soaker', 'status': 'fake'},
+            {'edx_video_id': 'little-star', 'status': 'pipeline_error', 'error_description': 'test-error-desc'},
+        ]
+        response = self.client.patch(self.url, patch_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['updated'] for result in response.data], [True, False, False, True])
+        self.assertEqual(response.data[1]['message'], 'Video is not found for specified edx_video_id: fake')
+        self.assertEqual(response.data[2]['message'], '"fake" is not a valid Video status.')
+        self.assertEqual(
+            sorted(Video.objects.values_list('edx_video_id', 'status', 'error_description')),
+            [('little-star', 'pipeline_error', 'test-error-desc'), ('super-soaker', 'transcript_ready', None)]
+        )
+
+    def test_video_status_bulk_not_a_list(self):
+        """
+        Tests that a list of video statuses is required.
+        """
+        response = self.client.patch(
+            self.url, {'edx_video_id': 'super-soaker', 'status': 'transcript_ready'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'A list of video statuses must be specified.')
+
+
 @ddt
 class HLSMissingVideoViewTest(APIAuthTestCase):
     """
@@ -1180,6 +1436,40 @@ class HLSMissingVideoViewTest(APIAuthTestCase):
         self.assertEqual(actual_encoded_video.file_size, expected_data['encode_data']['file_size'])
         self.assertEqual(actual_encoded_video.bitrate, expected_data['encode_data']['bitrate'])
 
+    def test_update_hls_encodes_for_videos(self):
+        """
+        Test that the encode profiles of many videos get updated in bulk.
+        """
+        encode_data = {'file_size': 12, 'bitrate': 12, 'url': 'foo.com/abcd.m3u8'}
+        put_data = [
+            {'edx_video_id': 'video-w-hls1', 'profile': 'hls', 'encode_data': encode_data},
+            {'edx_video_id': 'video-wo-hls1', 'profile': 'hls', 'encode_data': encode_data},
+            {'edx_video_id': 'video-wo-hls2', 'profile': 'fake', 'encode_data': encode_data},
+            {'edx_video_id': 'fake', 'profile': 'hls', 'encode_data': encode_data},
+            {'edx_video_id': 'video-wo-hls2', 'profile': 'hls', 'encode_data': dict(encode_data, file_size=-1)},
+            {'edx_video_id': 'video-wo-hls2', 'profile': 'hls'},
+            {'edx_video_id': ['video-wo-hls2'], 'profile': {'name': 'hls'}, 'encode_data': encode_data},
+        ]
+        response = self.client.put(self.url, put_data, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['updated'] for result in response.data], [True, True] + [False] * 5)
+        self.assertEqual(response.data[6]['message'], '"edx_video_id and profile" must be strings.')
+        self.assertEqual(response.data[2]['message'], 'Profile is not found for specified profile: fake')
+        self.assertEqual(response.data[3]['message'], 'Video is not found for specified edx_video_id: fake')
+        self.assertIn('file_size', response.data[4]['message'])
+        self.assertEqual(response.data[5]['message'], '"encode_data" params must be specified.')
+        self.assertEqual(
+            sorted(
+                EncodedVideo.objects.filter(profile__profile_name='hls').values_list('video__edx_video_id', 'url')
+            ),
+            [
+                ('video-w-hls1', 'foo.com/abcd.m3u8'),
+                ('video-w-hls2', constants.ENCODED_VIDEO_DICT_HLS['url']),
+                ('video-wo-hls1', 'foo.com/abcd.m3u8'),
+            ]
+        )
+
 
 class CourseTranscriptsDetailViewTest(APIAuthTestCase):
     """
@@ -1230,6 +1520,37 @@ class CourseVideoIDsViewTest(APIAuthTestCase):
 
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_conditional_get(self):
+        """
+        Test that conditional GETs are answered with a 304 until a video is added to the course.
+        """
+        course_id = 'course-v1:edx+1+2023_05'
+        url = reverse('course-video-ids', args=[course_id])
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        with patch('edxval.views.get_video_ids_for_course') as mock_video_ids:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            mock_video_ids.assert_not_called()
+
+        video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        CourseVideo.objects.create(video=video, course_id=course_id)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [video.edx_video_id])
+
+        # Deleting a course video changes the ETag, and no Last-Modified date that a deletion would not
+        # move forward is sent.
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+        CourseVideo.objects.filter(video=video, course_id=course_id).delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 @ddt
 class VideoTranscriptDeleteTest(APIAuthTestCase):
@@ -1339,3 +1660,360 @@ class VideoTranscriptDeleteTest(APIAuthTestCase):
         )
         # Then I should get a 404 not found response
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@ddt
+class VideoFileUploadViewTest(APIAuthTestCase):
+    """
+    Tests uploading video files through the local stand-in for presigned uploads.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        self.content = constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8')
+        self.content_hash = generate_file_content_hash(ContentFile(self.content))
+        self._logout()
+
+    def test_upload_transcript(self):
+        """
+        Tests that a transcript uploaded without credentials to the issued target is attached by the completion call.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'overwatch.srt')
+        self.assertEqual(upload['url'], reverse('video-file-upload', kwargs={'upload_id': upload['upload_id']}))
+
+        response = self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        api.complete_video_transcript_upload(
+            upload['upload_id'],
+            self.video.edx_video_id,
+            'en',
+            {'provider': TranscriptProviderType.CUSTOM, 'file_format': TranscriptFormat.SRT},
+            self.content_hash,
+            len(self.content),
+        )
+
+        video_transcript = VideoTranscript.objects.get(video=self.video, language_code='en')
+        self.assertTrue(video_transcript.transcript.name.endswith('.srt'))
+        self.assertEqual(video_transcript.content_hash, self.content_hash)
+        self.assertEqual(api.get_video_transcript_data(self.video.edx_video_id, 'en')['content'], self.content)
+
+    @override_settings(VIDEO_TRANSCRIPTS_SETTINGS=dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, COMPRESSION='gzip'))
+    def test_upload_transcript_stored_again(self):
+        """
+        Tests that uploaded transcripts are compressed like transcript data when COMPRESSION is set.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'overwatch.srt')
+        self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+        __, name = api.get_video_file_upload(upload['upload_id'])
+
+        api.complete_video_transcript_upload(
+            upload['upload_id'],
+            self.video.edx_video_id,
+            'en',
+            {'provider': TranscriptProviderType.CUSTOM, 'file_format': TranscriptFormat.SRT},
+            self.content_hash,
+            len(self.content),
+        )
+
+        video_transcript = VideoTranscript.objects.get(video=self.video, language_code='en')
+        self.addCleanup(get_video_transcript_storage().delete, video_transcript.transcript.name)
+        self.assertEqual(video_transcript.content_encoding, 'gzip')
+        self.assertEqual(video_transcript.content_hash, self.content_hash)
+        self.assertEqual(video_transcript.read_content(), self.content)
+        self.assertFalse(get_video_transcript_storage().exists(name))
+
+    def test_upload_image_replaces_image(self):
+        """
+        Tests that the image replaced by an uploaded image is deleted.
+        """
+        course_video = CourseVideo.objects.create(video=self.video, course_id='test-course')
+        storage = VideoImage._meta.get_field('image').storage
+        previous_name = storage.save('video-images/previous.png', ContentFile(b'image'))
+        VideoImage.objects.create(course_video=course_video, image=previous_name)
+        upload = api.create_video_file_upload(VideoStorage.IMAGES, 'new.png')
+        self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+        __, upload_name = api.get_video_file_upload(upload['upload_id'])
+
+        api.complete_video_image_upload(
+            upload['upload_id'], self.video.edx_video_id, 'test-course', self.content_hash, len(self.content)
+        )
+
+        name = VideoImage.objects.get(course_video=course_video).image.name
+        self.addCleanup(storage.delete, name)
+        self.assertNotEqual(name, upload_name)
+        self.assertTrue(storage.exists(name))
+        self.assertFalse(storage.exists(upload_name))
+        self.assertFalse(storage.exists(previous_name))
+
+    def test_upload_after_completion(self):
+        """
+        Tests that uploading again to the target of a completed upload does not change the attached transcript.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'overwatch.srt')
+        self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+        __, upload_name = api.get_video_file_upload(upload['upload_id'])
+        api.complete_video_transcript_upload(
+            upload['upload_id'],
+            self.video.edx_video_id,
+            'en',
+            {'provider': TranscriptProviderType.CUSTOM, 'file_format': TranscriptFormat.SRT},
+            self.content_hash,
+            len(self.content),
+        )
+        self.assertFalse(get_video_transcript_storage().exists(upload_name))
+
+        response = self.client.put(upload['url'], data=b'<script>evil</script>', content_type='text/html')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.addCleanup(get_video_transcript_storage().delete, upload_name)
+
+        video_transcript = VideoTranscript.objects.get(video=self.video, language_code='en')
+        self.assertNotEqual(video_transcript.transcript.name, upload_name)
+        self.assertEqual(video_transcript.read_content(), self.content)
+        self.assertEqual(video_transcript.content_hash, self.content_hash)
+
+    def test_upload_large_transcript(self):
+        """
+        Tests that uploads larger than DATA_UPLOAD_MAX_MEMORY_SIZE are accepted up to the size limit of the storage.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'large.srt')
+        __, name = api.get_video_file_upload(upload['upload_id'])
+        content = b'0' * (settings.DATA_UPLOAD_MAX_MEMORY_SIZE + 1)
+
+        response = self.client.put(upload['url'], data=content, content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.addCleanup(get_video_transcript_storage().delete, name)
+        self.assertEqual(get_video_transcript_storage().size(name), len(content))
+
+        content = b'0' * (settings.VIDEO_TRANSCRIPTS_SETTINGS['VIDEO_TRANSCRIPTS_MAX_BYTES'] + 1)
+        response = self.client.put(upload['url'], data=content, content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_complete_expired_upload(self):
+        """
+        Tests that uploads cannot be completed once their upload id expired.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'overwatch.srt')
+        self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+        __, name = api.get_video_file_upload(upload['upload_id'])
+        self.addCleanup(get_video_transcript_storage().delete, name)
+
+        with patch('edxval.api.UPLOAD_EXPIRES_IN', -1):
+            with self.assertRaises(ValCannotCreateError):
+                api.complete_video_transcript_upload(
+                    upload['upload_id'],
+                    self.video.edx_video_id,
+                    'en',
+                    {'file_format': TranscriptFormat.SRT},
+                    self.content_hash,
+                    len(self.content),
+                )
+
+    @data(
+        {'content_hash': 'not-the-hash'},
+        {'size': 1},
+    )
+    def test_upload_mismatch(self, completion_kwargs):
+        """
+        Tests that uploaded files which do not match the completion call are rejected and deleted.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'overwatch.srt')
+        self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+        __, name = api.get_video_file_upload(upload['upload_id'])
+
+        with self.assertRaises(ValCannotCreateError):
+            api.complete_video_transcript_upload(
+                upload['upload_id'],
+                self.video.edx_video_id,
+                'en',
+                {'file_format': TranscriptFormat.SRT},
+                **dict({'content_hash': self.content_hash, 'size': len(self.content)}, **completion_kwargs)
+            )
+
+        self.assertFalse(get_video_transcript_storage().exists(name))
+        self.assertFalse(VideoTranscript.objects.filter(video=self.video).exists())
+
+    def test_upload_image_for_transcript(self):
+        """
+        Tests that an upload issued for a storage cannot be completed as a file of another storage.
+        """
+        upload = api.create_video_file_upload(VideoStorage.TRANSCRIPTS, 'overwatch.srt')
+        self.client.put(upload['url'], data=self.content, content_type='application/octet-stream')
+
+        with self.assertRaises(ValCannotCreateError):
+            api.complete_video_image_upload(
+                upload['upload_id'], self.video.edx_video_id, 'test-course', self.content_hash, len(self.content)
+            )
+
+    def test_invalid_upload_id(self):
+        """
+        Tests that uploads with an invalid upload id are forbidden.
+        """
+        url = reverse('video-file-upload', kwargs={'upload_id': 'invalid'})
+        response = self.client.put(url, data=self.content, content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@ddt
+class VideoTranscriptContentViewTest(APIAuthTestCase):
+    """
+    Tests downloading the content of video transcripts.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.video = Video.objects.create(**constants.VIDEO_DICT_FISH)
+        self.content = constants.TRANSCRIPT_DATA['overwatch'].encode('utf-8')
+        self.video_transcript = VideoTranscript.create(
+            self.video, 'en', TranscriptFormat.SRT, ContentFile(self.content), TranscriptProviderType.CUSTOM
+        )
+        self.url = reverse(
+            'video-transcript-content', kwargs={'edx_video_id': self.video.edx_video_id, 'language_code': 'en'}
+        )
+
+    def test_get_content(self):
+        """
+        Tests that the content is streamed with validators, and that conditional requests get 304 responses.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['ETag'], f'"{self.video_transcript.content_hash}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @data(
+        ('bytes=0-4', 0, 4),
+        ('bytes=10-', 10, None),
+        ('bytes=-6', -6, None),
+    )
+    @unpack
+    def test_get_range(self, range_header, start, end):
+        """
+        Tests that single byte ranges are served as partial content.
+        """
+        response = self.client.get(self.url, HTTP_RANGE=range_header)
+        expected_content = self.content[start:end + 1 if end is not None else None]
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), expected_content)
+        self.assertEqual(response['Content-Length'], str(len(expected_content)))
+        self.assertTrue(response['Content-Range'].endswith(f'/{len(self.content)}'))
+
+    def test_get_range_not_satisfiable(self):
+        """
+        Tests that ranges starting after the end of the content are rejected, and that
+        ranges are ignored if the content changed since the `If-Range` validator.
+        """
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-4', HTTP_IF_RANGE='"outdated"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_get_compressed_content(self):
+        """
+        Tests that compressed transcripts are sent as they are stored only to clients accepting gzip.
+        """
+        compression_settings = dict(settings.VIDEO_TRANSCRIPTS_SETTINGS, COMPRESSION='gzip')
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=compression_settings):
+            self.video_transcript.save_transcript(ContentFile(self.content), TranscriptFormat.SRT)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], f'"{self.video_transcript.content_hash}-gzip"')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.content)
+
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_get_other_format(self):
+        """
+        Tests that transcripts can be downloaded in another format, and that unknown formats are rejected.
+        """
+        response = self.client.get(self.url, {'output_format': TranscriptFormat.SJSON})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['start'], [14370, 16500])
+        self.assertEqual(response['ETag'], f'"{self.video_transcript.content_hash}-sjson"')
+
+        response = self.client.get(self.url, {'output_format': 'vtt'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @data(TranscriptFormat.SRT, TranscriptFormat.SJSON)
+    def test_get_missing_file(self, output_format):
+        """
+        Tests that transcripts whose file is missing from the storage are not found.
+        """
+        get_video_transcript_storage().delete(self.video_transcript.transcript.name)
+
+        response = self.client.get(self.url, {'output_format': output_format})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_deleted_transcript(self):
+        """
+        Tests that transcripts deleted while their content is converted are not found.
+        """
+        with patch('edxval.views.get_video_transcript_data', return_value=None):
+            response = self.client.get(self.url, {'output_format': TranscriptFormat.SJSON})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_anonymous_denied(self):
+        """
+        Tests that transcript content is not served to anonymous users.
+        """
+        self._logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_missing_transcript(self):
+        """
+        Tests that missing transcripts are not found.
+        """
+        response = self.client.get(self.url.replace('/en/', '/fr/'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_local_file(self):
+        """
+        Tests that whole local files are streamed from their file descriptor.
+        """
+        with patch('edxval.views.FileResponse', wraps=FileResponse) as mock_file_response:
+            response = self.client.get(self.url)
+
+        self.assertIsInstance(mock_file_response.call_args.args[0], io.BufferedReader)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+
+    @data(
+        ('X-Accel-Redirect', '/protected/{name}'),
+        ('X-Sendfile', '{path}'),
+    )
+    @unpack
+    def test_get_sendfile(self, sendfile_header, expected_value):
+        """
+        Tests that sending local files is delegated to the web server if SENDFILE_HEADER is set.
+        """
+        sendfile_settings = dict(
+            settings.VIDEO_TRANSCRIPTS_SETTINGS, SENDFILE_HEADER=sendfile_header, SENDFILE_URL_PREFIX='/protected/'
+        )
+        with override_settings(VIDEO_TRANSCRIPTS_SETTINGS=sendfile_settings):
+            response = self.client.get(self.url)
+
+        name = self.video_transcript.transcript.name
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(
+            response[sendfile_header],
+            expected_value.format(name=name, path=self.video_transcript.transcript.storage.path(name))
+        )
+        self.assertEqual(response['ETag'], f'"{self.video_transcript.content_hash}"')
@@ -1,8 +1,6 @@
 """
 A module containing transcripts utils.
 """
-# pylint: disable=inconsistent-return-statements
-
 import json
 
 from pysrt import SubRipFile, SubRipItem, SubRipTime
@@ -72,6 +70,70 @@ class Transcript:
             output += '\n'
         return output
 
+    @staticmethod
+    def decode(content):
+        """
+        Decode transcript `content` byte-stream to text.
+        """
+        # Decode the content with utf-8-sig which will also
+        # skip byte order mark(BOM) character if found.
+        try:
+            return str(content, 'utf-8-sig')
+        except UnicodeDecodeError:
+            # Most of our stuff is UTF-8, but don't break if Latin-1 encoded
+            # transcripts are still floating around in older courses.
+            return str(content, 'latin-1')
+
+    @classmethod
+    def parse(cls, content, input_format):
+        """
+        Parse transcript `content` once, so that it can be converted to several formats with `convert_parsed`.
+
+        Arguments:
+            content: Transcript content byte-stream.
+            input_format: Input transcript format.
+
+        Returns:
+            "SRT" subs object for srt content, `sjson` subs dict for sjson content.
+
+        Raises:
+            TranscriptsGenerationException: On parsing the invalid srt content.
+        """
+        assert input_format in ('srt', 'sjson')
+
+        content = cls.decode(content)
+        if input_format == 'srt':
+            try:
+                # With error handling (set to 'ERROR_RAISE'), we will be getting
+                # the exception if something went wrong in parsing the transcript.
+                return SubRipFile.from_string(content, error_handling=SubRipFile.ERROR_RAISE)
+            except Error as ex:  # Base exception from pysrt
+                raise TranscriptsGenerationException(str(ex)) from ex
+
+        return json.loads(content)
+
+    @classmethod
+    def convert_parsed(cls, cues, input_format, output_format):
+        """
+        Convert already parsed transcript `cues` from `input_format` to `output_format`.
+
+        Arguments:
+            cues: "SRT" subs object for srt input, `sjson` subs dict for sjson input.
+            input_format: Input transcript format.
+            output_format: Output transcript format, different from `input_format`.
+
+        Accepted input formats: sjson, srt.
+        Accepted output format: srt, sjson.
+        """
+        assert input_format in ('srt', 'sjson')
+        assert output_format in ('srt', 'sjson')
+        assert input_format != output_format
+
+        if input_format == 'srt':
+            return json.dumps(cls.generate_sjson_from_srt(cues))
+
+        return cls.generate_srt_from_sjson(cues)
+
     @classmethod
     def convert(cls, content, input_format, output_format):
         """
@@ -92,31 +154,7 @@ class Transcript:
         assert input_format in ('srt', 'sjson')
         assert output_format in ('srt', 'sjson')
 
-        # Decode the content with utf-8-sig which will also
-        # skip byte order mark(BOM) character if found.
-        try:
-            content = content.decode('utf-8-sig')
-        except UnicodeDecodeError:
-            # Most of our stuff is UTF-8, but don't break if Latin-1 encoded
-            # transcripts are still floating around in older courses.
-            content = content.decode('latin-1')
-
         if input_format == output_format:
-            return content
-
-        if input_format == 'srt':
-
-            if output_format == 'sjson':
-                try:
-                    # With error handling (set to 'ERROR_RAISE'), we will be getting
-                    # the exception if something went wrong in parsing the transcript.
-                    srt_subs = SubRipFile.from_string(content, error_handling=SubRipFile.ERROR_RAISE)
-                except Error as ex:  # Base exception from pysrt
-                    raise TranscriptsGenerationException(str(ex)) from ex
-
-                return json.dumps(cls.generate_sjson_from_srt(srt_subs))
-
-        if input_format == 'sjson':
+            return cls.decode(content)
 
-            if output_format == 'srt':
-                return cls.generate_srt_from_sjson(json.loads(content))
+        return cls.convert_parsed(cls.parse(content, input_format), input_format, output_format)
@@ -12,9 +12,15 @@ urlpatterns = [
         views.VideoDetail.as_view(),
         name='video-detail'
     ),
+    path('videos/bulk/', views.VideoBulkCreateView.as_view(),
+         name='video-bulk-create'
+         ),
     path('videos/status/', views.VideoStatusView.as_view(),
          name='video-status-update'
          ),
+    path('videos/status/bulk/', views.VideoStatusBulkView.as_view(),
+         name='video-status-bulk-update'
+         ),
     path('videos/missing-hls/', views.HLSMissingVideoView.as_view(),
          name='hls-missing-video'
          ),
@@ -27,9 +33,19 @@ urlpatterns = [
     path('videos/video-transcripts/', views.VideoTranscriptView.as_view(),
          name='video-transcripts'
          ),
+    path('videos/video-transcripts/<str:edx_video_id>/<str:language_code>/content/',
+         views.VideoTranscriptContentView.as_view(),
+         name='video-transcript-content'
+         ),
     path('videos/video-images/update/', views.VideoImagesView.as_view(),
          name='update-video-images'
          ),
+    path('videos/video-images/bulk-update/', views.VideoImagesBulkView.as_view(),
+         name='bulk-update-video-images'
+         ),
+    path('videos/uploads/<str:upload_id>/', views.VideoFileUploadView.as_view(),
+         name='video-file-upload'
+         ),
     path('videos/courses/<str:course_id>/video-ids', views.CourseVideoIDsView.as_view(),
          name='course-video-ids'
          ),
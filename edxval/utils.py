@@ -1,16 +1,27 @@
 """
 Util methods to be used in api and models.
 """
+import gzip
 import hashlib
+import io
 import json
-from contextlib import closing
+import mmap
+import os
+import posixpath
+import re
+from collections import namedtuple
+from contextlib import closing, contextmanager, nullcontext
+from tempfile import SpooledTemporaryFile
 
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files import File
 from django.utils.module_loading import import_string
 from fs.path import combine
 from pysrt import SubRipFile
 
+from storages.utils import clean_name
+
 
 class TranscriptFormat:
     """Tuple representing transcriptformat choices."""
@@ -23,6 +34,47 @@ class TranscriptFormat:
     )
 
 
+class TranscriptContentEncoding:
+    """Tuple representing the encodings transcript files can be stored with."""
+    IDENTITY = ''
+    GZIP = 'gzip'
+
+    CHOICES = (
+        (IDENTITY, 'Uncompressed'),
+        (GZIP, 'gzip'),
+    )
+
+
+class VideoStorage:
+    """Tuple representing the storages of video files."""
+    IMAGES = 'video_images'
+    TRANSCRIPTS = 'video_transcripts'
+
+    CHOICES = (
+        (IMAGES, 'Video images'),
+        (TRANSCRIPTS, 'Video transcripts'),
+    )
+
+    SETTINGS_KEYS = {
+        IMAGES: 'VIDEO_IMAGE_SETTINGS',
+        TRANSCRIPTS: 'VIDEO_TRANSCRIPTS_SETTINGS',
+    }
+
+
+# Maximum number of keys S3 accepts in a single DeleteObjects request.
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
+
+# Number of characters looked at to sniff the format of a transcript.
+TRANSCRIPT_FORMAT_SNIFF_LENGTH = 512
+
+# Number of characters read at once when spooling transcript files, and size
+# above which spooled transcripts are written to disk instead of memory.
+TRANSCRIPT_SPOOL_CHUNK_SIZE = 64 * 1024
+TRANSCRIPT_SPOOL_MAX_SIZE = 1024 * 1024
+
+# Names of content addressed transcript files: their sha256 content hash, format and `.gz` if compressed.
+CONTENT_ADDRESSED_FILE_NAME_RE = re.compile(r'^[0-9a-f]{64}\.\w+(\.gz)?$')
+
 # 3rd Party Transcription Plans
 THIRD_PARTY_TRANSCRIPTION_PLANS = {
 
@@ -147,7 +199,40 @@ def video_image_path(video_image_instance, filename):  # pylint:disable=unused-a
         video_image_instance (VideoImage): This is passed automatically by models.CustomizableImageField
         filename (str): name of image file
     """
-    return '{}{}'.format(settings.VIDEO_IMAGE_SETTINGS.get('DIRECTORY_PREFIX', ''), filename)
+    return get_video_file_path(VideoStorage.IMAGES, filename)
+
+
+def get_sharded_name(filename):
+    """
+    Returns the name of a file spread over two levels of subdirectories named after the hash of its name.
+
+    Arguments:
+        filename (str): name of the file, e.g. `<uuid>.srt`
+
+    Returns:
+        sharded name, e.g. `ab/cd/<uuid>.srt`
+    """
+    digest = hashlib.sha256(filename.encode('utf-8')).hexdigest()
+    return f'{digest[:2]}/{digest[2:4]}/{filename}'
+
+
+def get_video_file_path(video_storage, filename):
+    """
+    Returns the path of a new file of a video storage.
+
+    Files are put under the DIRECTORY_PREFIX of the storage, in sharded subdirectories if SHARDED_PATHS
+    is enabled in its settings. Names of already stored files are kept as they are, so files stored
+    before sharding was enabled are still found.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+        filename (str): name of the file
+    """
+    storage_settings = get_video_storage_settings(video_storage)
+    if storage_settings.get('SHARDED_PATHS'):
+        filename = get_sharded_name(filename)
+
+    return '{}{}'.format(storage_settings.get('DIRECTORY_PREFIX', ''), filename)
 
 
 def get_configured_storage(settings_key):
@@ -199,7 +284,7 @@ def video_transcript_path(video_transcript_instance, filename):  # pylint:disabl
         video_transcript_instance (VideoTranscript): This is passed automatically by models.CustomizableFileField
         filename (str): name of image file
     """
-    return '{}{}'.format(settings.VIDEO_TRANSCRIPTS_SETTINGS.get('DIRECTORY_PREFIX', ''), filename)
+    return get_video_file_path(VideoStorage.TRANSCRIPTS, filename)
 
 
 def get_video_transcript_storage():
@@ -209,6 +294,217 @@ def get_video_transcript_storage():
     return get_configured_storage('VIDEO_TRANSCRIPTS_SETTINGS')
 
 
+def get_video_storage_settings(video_storage):
+    """
+    Return the settings dict of a video storage.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+    """
+    return getattr(settings, VideoStorage.SETTINGS_KEYS[video_storage], {})
+
+
+def delete_files_from_storage(storage, names):
+    """
+    Delete files from a storage, using a single request for each batch of files on S3 storages.
+
+    Arguments:
+        storage (Storage): Django storage backend
+        names (list): names of the files to delete
+
+    Returns:
+        dict mapping the names of the files which could not be deleted to an error message.
+    """
+    errors = {}
+    delete_objects = getattr(getattr(storage, 'bucket', None), 'delete_objects', None)
+    if delete_objects is None:
+        for name in names:
+            try:
+                storage.delete(name)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                errors[name] = str(error)
+        return errors
+
+    for index in range(0, len(names), S3_DELETE_OBJECTS_MAX_KEYS):
+        batch = names[index:index + S3_DELETE_OBJECTS_MAX_KEYS]
+        names_by_key = {
+            storage._normalize_name(clean_name(name)): name  # pylint: disable=protected-access
+            for name in batch
+        }
+        try:
+            response = delete_objects(
+                Delete={'Objects': [{'Key': key} for key in names_by_key], 'Quiet': True}
+            )
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            errors.update((name, str(error)) for name in batch)
+            continue
+
+        for error in response.get('Errors', []):
+            errors[names_by_key.get(error['Key'], error['Key'])] = error.get('Message') or error.get('Code', '')
+
+    return errors
+
+
+def get_presigned_upload_url(storage, name, expires_in):
+    """
+    Returns a presigned url a file can be uploaded to with a PUT request, directly to the storage.
+
+    Arguments:
+        storage (Storage): Django storage backend
+        name (str): name of the file to upload, relative to the storage root
+        expires_in (int): number of seconds the url is valid for
+
+    Returns:
+        The url on S3 storages, None on storages which do not support presigned uploads.
+    """
+    if not (hasattr(storage, 'bucket_name') and hasattr(storage, 'connection')):
+        return None
+
+    return storage.connection.meta.client.generate_presigned_url(
+        'put_object',
+        Params={
+            'Bucket': storage.bucket_name,
+            'Key': storage._normalize_name(clean_name(name)),  # pylint: disable=protected-access
+        },
+        ExpiresIn=expires_in,
+        HttpMethod='PUT',
+    )
+
+
+def get_video_file_max_bytes(video_storage):
+    """
+    Returns the maximum size of the files of a video storage, None if it is not limited.
+
+    Arguments:
+        video_storage (str): one of the VideoStorage choices
+    """
+    max_bytes_key = {
+        VideoStorage.IMAGES: 'VIDEO_IMAGE_MAX_BYTES',
+        VideoStorage.TRANSCRIPTS: 'VIDEO_TRANSCRIPTS_MAX_BYTES',
+    }[video_storage]
+    return get_video_storage_settings(video_storage).get(max_bytes_key)
+
+
+def iter_storage_files(storage, directory):
+    """
+    Yield the files under a directory of a storage, including its subdirectories.
+
+    S3 storages are listed page by page with a single recursive listing, other storages
+    are walked with `listdir`, so the listing is never held in memory as a whole.
+
+    Arguments:
+        storage (Storage): Django storage backend
+        directory (str): directory to list, relative to the storage root
+
+    Yields:
+        (name, modified_time) tuples, `name` being relative to the storage root like the names stored in file fields
+    """
+    if hasattr(storage, 'bucket_name') and hasattr(storage, 'connection'):
+        prefix = storage._normalize_name(clean_name(directory))  # pylint: disable=protected-access
+        location = f'{storage.location}/' if storage.location else ''
+        paginator = storage.connection.meta.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=prefix):
+            for entry in page.get('Contents', ()):
+                yield entry['Key'][len(location):], entry['LastModified']
+        return
+
+    try:
+        directories, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+
+    for file_name in files:
+        name = posixpath.join(directory, file_name)
+        yield name, storage.get_modified_time(name)
+
+    for sub_directory in directories:
+        yield from iter_storage_files(storage, posixpath.join(directory, sub_directory))
+
+
+class FileRange:
+    """
+    File-like object reading `length` bytes of a file from the `start` offset, to stream byte ranges.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        """
+        Reads up to `size` bytes, without going past the end of the range.
+        """
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        """
+        Closes the underlying file.
+        """
+        self.file.close()
+
+
+class DecompressedFile(gzip.GzipFile):
+    """
+    File-like object decompressing a gzip compressed file, closing the compressed file when closed.
+    """
+
+    def __init__(self, file):
+        super().__init__(fileobj=file, mode='rb')
+        self.compressed_file = file
+
+    def close(self):
+        """
+        Closes the decompressed stream and the underlying compressed file.
+        """
+        try:
+            super().close()
+        finally:
+            self.compressed_file.close()
+
+
+def parse_byte_range(range_header, size):
+    """
+    Parses the HTTP Range header of a request for content of `size` bytes.
+
+    Only single byte ranges are supported, the whole content is served for other ranges.
+
+    Arguments:
+        range_header (str): value of the Range header
+        size (int): size of the content in bytes
+
+    Returns:
+        (start, end) inclusive offsets of the range, None if the header is not a single byte range.
+
+    Raises:
+        ValueError: if the range cannot be satisfied.
+    """
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        # Suffix range, the last `end` bytes.
+        if int(end) == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - int(end), 0), size - 1
+
+    start = int(start)
+    if start >= size:
+        raise ValueError('Range starts after the end of the content')
+
+    end = min(int(end), size - 1) if end else size - 1
+    if end < start:
+        return None
+
+    return start, end
+
+
 def create_file_in_fs(file_data, file_name, file_system, static_dir):
     """
     Writes file in specific file system.
@@ -223,23 +519,157 @@ def create_file_in_fs(file_data, file_name, file_system, static_dir):
         f.write(file_data.encode('utf-8'))
 
 
+def sniff_transcript_format(transcript_content):
+    """
+    Returns the likely transcript format judging only from the beginning of the content.
+
+    SJSON transcripts are JSON objects while SRT transcripts start with a cue number, so a
+    bounded prefix is enough to pick the format without parsing the whole content.
+
+    Arguments:
+        transcript_content (str|bytes): Transcript file content.
+    """
+    prefix = transcript_content[:TRANSCRIPT_FORMAT_SNIFF_LENGTH]
+    if isinstance(prefix, bytes):
+        # The prefix may end in the middle of a multi-byte character.
+        prefix = prefix.decode('utf-8', errors='ignore')
+
+    if prefix.lstrip('\ufeff \t\r\n').startswith(('{', '[')):
+        return TranscriptFormat.SJSON
+    return TranscriptFormat.SRT
+
+
+class ParsedTranscript(namedtuple('ParsedTranscript', ['file_format', 'cues', 'cue_count'])):
+    """
+    Transcript content parsed once, so that it is validated and converted to other formats with a single parse.
+
+    `cues` is a `SubRipFile` for SRT content and the decoded dict for SJSON content, they are converted
+    with `Transcript.convert_parsed`.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_cues(cls, file_format, cues):
+        """
+        Returns the parsed transcript of `cues` in `file_format`, counting them.
+        """
+        if file_format == TranscriptFormat.SJSON:
+            cue_count = len(cues.get('text', [])) if isinstance(cues, dict) else 0
+        else:
+            cue_count = len(cues)
+        return cls(file_format, cues, cue_count)
+
+
+def parse_transcript(transcript_content):
+    """
+    Parses transcript content once, with the parser of the format sniffed from the beginning of the content.
+
+    SRT content is not parsed as JSON first.
+
+    Arguments:
+        transcript_content (str): Transcript file content.
+
+    Returns:
+        ParsedTranscript
+
+    Raises:
+        pysrt.srtexc.Error: if the content is neither valid SJSON nor valid SRT.
+    """
+    if sniff_transcript_format(transcript_content) == TranscriptFormat.SJSON:
+        try:
+            return ParsedTranscript.from_cues(TranscriptFormat.SJSON, json.loads(transcript_content))
+        except ValueError:
+            pass
+
+    # With error handling (set to 'ERROR_RAISE'), we will be getting
+    # the exception if something went wrong in parsing the transcript.
+    srt_subs = SubRipFile.from_string(transcript_content, error_handling=SubRipFile.ERROR_RAISE)
+    if srt_subs:
+        return ParsedTranscript.from_cues(TranscriptFormat.SRT, srt_subs)
+
+    # Content without any SRT cue has always been treated as SJSON.
+    return ParsedTranscript.from_cues(TranscriptFormat.SJSON, {})
+
+
 def get_transcript_format(transcript_content):
     """
     Returns transcript format.
 
     Arguments:
         transcript_content (str): Transcript file content.
+
+    Raises:
+        pysrt.srtexc.Error: if the content is neither valid SJSON nor valid SRT.
     """
-    try:
-        json.loads(transcript_content)
-    except ValueError:
-        # With error handling (set to 'ERROR_RAISE'), we will be getting
-        # the exception if something went wrong in parsing the transcript.
+    return parse_transcript(transcript_content).file_format
+
+
+def spool_transcript_file(transcript_file):
+    """
+    Copies a transcript file to a spooled temporary file in chunks, so that large transcripts are never held
+    in memory as a whole.
+
+    The content is utf-8 encoded in the spooled file, its content hash is computed and its format sniffed
+    while it is copied.
+
+    Arguments:
+        transcript_file (file): Transcript file opened in text mode, e.g. with the `utf-8-sig` encoding.
+
+    Returns:
+        (spooled_file, content_hash, sniffed_format) tuple, the spooled file being rewound.
+
+    Raises:
+        UnicodeDecodeError: if the content cannot be decoded.
+    """
+    spooled_file = SpooledTemporaryFile(max_size=TRANSCRIPT_SPOOL_MAX_SIZE)
+    content_hash = hashlib.sha256()
+    prefix = ''
+    for chunk in iter(lambda: transcript_file.read(TRANSCRIPT_SPOOL_CHUNK_SIZE), ''):
+        if len(prefix) < TRANSCRIPT_FORMAT_SNIFF_LENGTH:
+            prefix += chunk[:TRANSCRIPT_FORMAT_SNIFF_LENGTH]
+        chunk = chunk.encode('utf-8')
+        content_hash.update(chunk)
+        spooled_file.write(chunk)
+
+    spooled_file.seek(0)
+    return spooled_file, content_hash.hexdigest(), sniff_transcript_format(prefix)
+
+
+def parse_spooled_transcript(spooled_file, sniffed_format):
+    """
+    Parses a transcript spooled by `spool_transcript_file` once, like `parse_transcript`.
 
-        srt_subs = SubRipFile.from_string(transcript_content, error_handling=SubRipFile.ERROR_RAISE)
+    SRT cues are read from the file one at a time instead of from the whole content. The spooled
+    file is rewound afterwards.
+
+    Arguments:
+        spooled_file (file): utf-8 encoded transcript file opened in binary mode.
+        sniffed_format (str): format sniffed from the beginning of the transcript.
+
+    Returns:
+        ParsedTranscript
+
+    Raises:
+        pysrt.srtexc.Error: if the content is neither valid SJSON nor valid SRT.
+    """
+    text_file = io.TextIOWrapper(spooled_file, encoding='utf-8')
+    try:
+        if sniffed_format == TranscriptFormat.SJSON:
+            try:
+                return ParsedTranscript.from_cues(TranscriptFormat.SJSON, json.load(text_file))
+            except ValueError:
+                text_file.seek(0)
+
+        # Every cue is parsed, so that malformed cues are reported wherever they are.
+        srt_subs = SubRipFile(SubRipFile.stream(text_file, error_handling=SubRipFile.ERROR_RAISE))
         if srt_subs:
-            return TranscriptFormat.SRT
-    return TranscriptFormat.SJSON
+            return ParsedTranscript.from_cues(TranscriptFormat.SRT, srt_subs)
+
+        # Content without any SRT cue has always been treated as SJSON.
+        return ParsedTranscript.from_cues(TranscriptFormat.SJSON, {})
+    finally:
+        text_file.detach()
+        spooled_file.seek(0)
 
 
 def validate_generated_images(value, max_items):
@@ -267,6 +697,190 @@ def validate_generated_images(value, max_items):
     return value
 
 
+def compute_content_hash(file_data):
+    """
+    Generates SHA256 Content Hash for a File by reading it in chunks
+
+    The file is not closed, so it can still be saved to a storage afterwards.
+
+    Arguments:
+        file_data (File): File which will be used for hash generation
+
+    Returns:
+        str sha256 hash
+    """
+    content_hash = hashlib.sha256()
+    for chunk in iter_file_chunks(file_data):
+        content_hash.update(chunk)
+
+    return content_hash.hexdigest()
+
+
+def get_local_file_path(storage, name):
+    """
+    Returns the path of a stored file on the local file system, None if the storage is not local.
+
+    Arguments:
+        storage (Storage): Django storage backend
+        name (str): name of the file in the storage
+    """
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+@contextmanager
+def map_local_file(path):
+    """
+    Memory maps a local file for reading, so that its content is used without being copied.
+
+    Arguments:
+        path (str): path of the file
+
+    Yields:
+        A read only buffer of the file content.
+    """
+    with open(path, 'rb') as local_file:
+        # Empty files cannot be mapped.
+        if not os.fstat(local_file.fileno()).st_size:
+            yield b''
+            return
+
+        with mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def map_stored_file(storage, name):
+    """
+    Returns a context manager giving the content of a stored file as a read only buffer.
+
+    Files of local storages are memory mapped, other files are read.
+
+    Arguments:
+        storage (Storage): Django storage backend
+        name (str): name of the file in the storage
+    """
+    path = get_local_file_path(storage, name)
+    if path is None:
+        with storage.open(name, 'rb') as stored_file:
+            return nullcontext(stored_file.read())
+
+    return map_local_file(path)
+
+
+def compute_stored_file_hash(storage, name):
+    """
+    Generates SHA256 Content Hash for a stored file.
+
+    Files of local storages are memory mapped, other files are read in chunks.
+
+    Arguments:
+        storage (Storage): Django storage backend
+        name (str): name of the file in the storage
+
+    Returns:
+        str sha256 hash
+    """
+    path = get_local_file_path(storage, name)
+    if path is None:
+        with storage.open(name, 'rb') as stored_file:
+            return compute_content_hash(stored_file)
+
+    with map_local_file(path) as buffer:
+        return hashlib.sha256(buffer).hexdigest()
+
+
+def iter_file_chunks(file_data):
+    """
+    Yields the content of a file as utf-8 encoded bytes, in chunks.
+
+    Arguments:
+        file_data (File): File to read, text files are encoded
+    """
+    if not hasattr(file_data, 'chunks'):
+        file_data = File(file_data)
+
+    for chunk in file_data.chunks():
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def get_transcript_content_encoding():
+    """
+    Returns the encoding new transcript files are stored with, set by the COMPRESSION transcripts setting.
+
+    Raises:
+        ImproperlyConfigured if the compression is not supported.
+    """
+    compression = get_video_storage_settings(VideoStorage.TRANSCRIPTS).get('COMPRESSION') or ''
+    if compression not in dict(TranscriptContentEncoding.CHOICES):
+        raise ImproperlyConfigured(f'Unsupported transcripts COMPRESSION: {compression}')
+
+    return compression
+
+
+def get_transcript_file_format(name):
+    """
+    Returns the format of a transcript file from the extension of its name, ignoring the `.gz` extension.
+    """
+    if name.endswith('.gz'):
+        name = name[:-len('.gz')]
+    return posixpath.splitext(name)[1][1:]
+
+
+def is_content_addressed_file_name(name):
+    """
+    Returns whether a transcript file name is named after its content hash, see `get_transcript_file_name`.
+    """
+    return bool(CONTENT_ADDRESSED_FILE_NAME_RE.match(posixpath.basename(name)))
+
+
+def get_transcript_file_name(name, file_format, content_encoding=TranscriptContentEncoding.IDENTITY):
+    """
+    Returns the name a new transcript file is stored with, before its directory prefix.
+
+    Arguments:
+        name (str): base name, a uuid or the content hash of content addressed files
+        file_format (str): transcript format, used as the extension
+        content_encoding (str): one of the TranscriptContentEncoding choices, gzip files get a `.gz` extension
+    """
+    file_name = '{name}.{ext}'.format(name=name, ext=file_format)
+    if content_encoding == TranscriptContentEncoding.GZIP:
+        file_name += '.gz'
+
+    return file_name
+
+
+def compress_transcript_content(file_data):
+    """
+    Returns the gzip compressed content of a transcript file.
+
+    Arguments:
+        file_data (File): Transcript file, read in chunks
+    """
+    buffer = io.BytesIO()
+    # A fixed mtime keeps the compressed bytes of the same content identical.
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as gzip_file:
+        for chunk in iter_file_chunks(file_data):
+            gzip_file.write(chunk)
+
+    return buffer.getvalue()
+
+
+def decompress_transcript_content(content, content_encoding):
+    """
+    Returns the content of a transcript file stored with the given encoding.
+
+    Arguments:
+        content (bytes): content as stored
+        content_encoding (str): one of the TranscriptContentEncoding choices
+    """
+    if content_encoding == TranscriptContentEncoding.GZIP:
+        return gzip.decompress(content)
+
+    return content
+
+
 def generate_file_content_hash(uploaded_file):
     """
     Generates SHA256 Content Hash for a File
@@ -278,13 +892,7 @@ def generate_file_content_hash(uploaded_file):
         str sha256 hash
     """
     with closing(uploaded_file.open()) as file_data:
-        file_content = file_data.read()
-        if isinstance(file_content, str):
-            file_content = file_content.encode('utf-8')
-
-    content_hash = hashlib.sha256(file_content)
-
-    return content_hash.hexdigest()
+        return compute_content_hash(file_data)
 
 
 def is_duplicate_file(uploaded_file_1, uploaded_file_2):
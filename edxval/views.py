@@ -3,28 +3,48 @@ Views file for django app edxval.
 """
 
 
+import hashlib
+import io
 import logging
+import os
+import re
+from functools import cached_property, wraps
+from tempfile import TemporaryFile
+from urllib.parse import quote
 
 from django.core.exceptions import ValidationError
+from django.core.files.base import File
+from django.db.models import Count, Max, Value
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
 from edx_rest_framework_extensions.permissions import IsStaff
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import DjangoModelPermissions, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from edxval.api import (
+    UPLOAD_EXPIRES_IN,
     create_or_update_video_transcript,
+    create_videos_bulk,
     delete_video_transcript,
     get_transcript_details_for_course,
+    get_video_file_upload,
     get_video_ids_for_course,
+    get_video_transcript_data,
+    update_encoded_videos,
+    update_generated_video_images,
     update_transcript_provider,
+    update_videos_status,
 )
-from edxval.exceptions import InvalidTranscriptProvider, TranscriptNotFoundError
+from edxval.exceptions import InvalidTranscriptProvider, TranscriptNotFoundError, ValCannotCreateError
 from edxval.models import (
     LIST_MAX_ITEMS,
+    VALID_VIDEO_STATUSES,
     CourseVideo,
     EncodedVideo,
     Profile,
@@ -32,21 +52,90 @@ from edxval.models import (
     Video,
     VideoImage,
     VideoTranscript,
+    get_video_file_storage,
 )
 from edxval.serializers import VideoSerializer
-from edxval.utils import TranscriptFormat, validate_generated_images
+from edxval.utils import (
+    DecompressedFile,
+    FileRange,
+    TranscriptContentEncoding,
+    TranscriptFormat,
+    VideoStorage,
+    get_local_file_path,
+    get_video_file_max_bytes,
+    get_video_storage_settings,
+    get_video_transcript_storage,
+    parse_byte_range,
+    validate_generated_images,
+)
 
 LOGGER = logging.getLogger(__name__)
 
-VALID_VIDEO_STATUSES = [
-    'file_complete',
-    'partial_failure',
-    'pipeline_error',
-    'transcription_in_progress',
-    'transcript_failed',
-    'transcript_ready',
-    'transcode_active',
-]
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+# Number of bytes of uploaded files read from the request at once.
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def get_etag(querysets, key=''):
+    """
+    Returns the ETag of a response made of the rows of `querysets`.
+
+    The ETag is derived from the number of rows of each queryset and their latest `modified` stamp,
+    so that adding, updating or deleting rows changes it, without serializing the rows. The stamps
+    of all the querysets are read with a single query, using the indexes of the `modified` columns.
+    The ETag also varies with `key`, identifying the representation of the rows.
+    """
+    stamps = [
+        queryset.order_by().annotate(
+            position=Value(position)
+        ).values('position').annotate(
+            count=Count('pk'), modified=Max('modified')
+        ).values_list('position', 'count', 'modified')
+        for position, queryset in enumerate(querysets)
+    ]
+    stamps = sorted(stamps[0].union(*stamps[1:], all=True))
+    stamps = [key] + ['{}:{}'.format(count, modified.isoformat() if modified else '') for __, count, modified in stamps]
+    return quote_etag(hashlib.md5('|'.join(stamps).encode('utf-8')).hexdigest())
+
+
+def conditional_get(view_method):
+    """
+    Decorator answering conditional GET requests of a view with a 304 response before its data is computed.
+
+    The view gives the querysets its response is made of with a `get_validator_querysets` method taking
+    the arguments of the request. Responses to different query strings get different ETags. No
+    Last-Modified date is sent, since deleting rows does not move the latest `modified` stamp forward.
+    """
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        etag = get_etag(view.get_validator_querysets(*args, **kwargs), key=request.META.get('QUERY_STRING', ''))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = view_method(view, request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+        return response
+
+    return wrapper
+
+
+def get_video_validator_querysets(videos, fields=None):
+    """
+    Returns the querysets of the rows the serialized data of `videos` is made of.
+
+    Arguments:
+        videos (QuerySet): videos
+        fields (list): serialized video fields, all of them if None
+    """
+    querysets = [videos]
+    if fields is None or 'encoded_videos' in fields:
+        querysets.append(EncodedVideo.objects.filter(video__in=videos))
+    if fields is None or 'courses' in fields:
+        querysets.append(CourseVideo.objects.filter(video__in=videos))
+        querysets.append(VideoImage.objects.filter(course_video__video__in=videos))
+    return querysets
 
 
 class ReadRestrictedDjangoModelPermissions(DjangoModelPermissions):
@@ -85,18 +174,83 @@ class MultipleFieldLookupMixin:
         return get_object_or_404(queryset, **filter)  # Lookup the object
 
 
-class VideoList(generics.ListCreateAPIView):
+class VideoFieldsMixin:
+    """
+    Limits the video data returned by GET requests to the fields given by the `fields` and `expand` query parameters.
+
+    `fields` is a comma separated list of the video fields to return, all the non nested ones by default, and
+    `expand` of the nested resources to return with them, among `encoded_videos` and `courses`. All the fields
+    are returned when neither is given. The video rows are only loaded and prefetched for the requested fields.
+
+    Example:
+        /edxval/videos/?course=course-v1:edX+DemoX+Demo_Course&fields=edx_video_id,status
+        /edxval/videos/super-soaker?fields=edx_video_id,duration&expand=encoded_videos
+    """
+    expandable_fields = ('encoded_videos', 'courses')
+
+    @cached_property
+    def requested_fields(self):
+        """
+        Returns the list of the requested video fields, or None if all of them are.
+        """
+        fields, expand = (
+            [name.strip() for name in self.request.query_params.get(param, '').split(',') if name.strip()]
+            for param in ('fields', 'expand')
+        )
+        if self.request.method != 'GET' or not (fields or expand):
+            return None
+
+        serializer_fields = list(self.get_serializer_class()().fields)
+        unknown_fields = set(fields + expand) - set(serializer_fields)
+        if unknown_fields:
+            error_message = 'Unknown fields: {}'.format(', '.join(sorted(unknown_fields)))
+            raise serializers.ValidationError({'fields': error_message})
+
+        fields = fields or [name for name in serializer_fields if name not in self.expandable_fields]
+        return fields + [name for name in expand if name not in fields]
+
+    def narrow_queryset(self, queryset):
+        """
+        Defers the loading of the video columns and the prefetching of the nested resources which are not requested.
+        """
+        fields = self.requested_fields
+        if fields is None:
+            return queryset.prefetch_related(*self.expandable_fields)
+
+        # edx_video_id is always loaded as the url of a video is built from it.
+        model_fields = {field.name for field in Video._meta.concrete_fields}
+        return queryset.only('edx_video_id', *[name for name in fields if name in model_fields]).prefetch_related(
+            *[name for name in self.expandable_fields if name in fields]
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if self.requested_fields is not None:
+            kwargs['fields'] = self.requested_fields
+        return super().get_serializer(*args, **kwargs)
+
+
+class VideoList(VideoFieldsMixin, generics.ListCreateAPIView):
     """
     GETs or POST video objects
     """
     authentication_classes = (JwtAuthentication, SessionAuthentication)
     permission_classes = (ReadRestrictedDjangoModelPermissions,)
-    queryset = Video.objects.all().prefetch_related("encoded_videos", "courses")
+    queryset = Video.objects.all()
     lookup_field = "edx_video_id"
     serializer_class = VideoSerializer
 
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_validator_querysets(self):
+        """
+        Returns the querysets the listed videos are made of.
+        """
+        return get_video_validator_querysets(self.get_queryset(), self.requested_fields)
+
     def get_queryset(self):
-        qset = Video.objects.all().prefetch_related("encoded_videos", "courses")
+        qset = Video.objects.all()
 
         args = self.request.GET
         course_id = args.get('course')
@@ -107,10 +261,54 @@ class VideoList(generics.ListCreateAPIView):
         if youtube_id:
             # view videos by youtube id
             qset = qset & Video.by_youtube_id(youtube_id)
-        return qset
+        return self.narrow_queryset(qset)
+
+
+class VideoBulkCreateView(APIView):
+    """
+    POST many video objects at once, used by the video pipeline to ingest videos in batches.
+    """
+    authentication_classes = (JwtAuthentication, SessionAuthentication)
+    permission_classes = (ReadRestrictedDjangoModelPermissions,)
+    queryset = Video.objects.none()
+
+    def post(self, request):
+        """
+        Creates the given videos and returns a result for each of them.
 
+        Example request data:
+            ```
+            [
+                {
+                    'edx_video_id': '1234',
+                    'client_video_id': 'video.mp4',
+                    'duration': 111.0,
+                    'status': 'file_complete',
+                    'encoded_videos': [...],
+                    'courses': [...]
+                },
+                ...
+            ]
+            ```
 
-class VideoDetail(generics.RetrieveUpdateDestroyAPIView):
+        Example response data:
+            ```
+            [
+                {'edx_video_id': '1234', 'created': True},
+                {'edx_video_id': '5678', 'created': False, 'errors': {...}},
+            ]
+            ```
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={'message': 'A list of videos must be specified.'}
+            )
+
+        return Response(status=status.HTTP_200_OK, data=create_videos_bulk(request.data))
+
+
+class VideoDetail(VideoFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Gets a video instance given its edx_video_id
     """
@@ -120,6 +318,19 @@ class VideoDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = Video.objects.all()
     serializer_class = VideoSerializer
 
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_validator_querysets(self, edx_video_id):
+        """
+        Returns the querysets the video is made of.
+        """
+        return get_video_validator_querysets(Video.objects.filter(edx_video_id=edx_video_id), self.requested_fields)
+
+    def get_queryset(self):
+        return self.narrow_queryset(super().get_queryset())
+
 
 class VideoTranscriptView(APIView):
     """
@@ -263,12 +474,162 @@ class VideoTranscriptView(APIView):
         return Response(status=status.HTTP_404_NOT_FOUND)
 
 
+class VideoTranscriptContentView(APIView):
+    """
+    A View to download the content of a video transcript.
+
+    The content is streamed from storage with an `ETag` made from its content hash and a `Last-Modified`
+    date, so that conditional requests are answered with 304 responses, and single byte ranges are
+    served as 206 partial responses. Transcripts stored compressed are sent as they are to clients
+    accepting gzip encoded responses.
+    """
+    authentication_classes = (JwtAuthentication, SessionAuthentication)
+
+    CONTENT_TYPES = {
+        TranscriptFormat.SRT: 'application/x-subrip; charset=utf-8',
+        TranscriptFormat.SJSON: 'application/json; charset=utf-8',
+    }
+
+    def get_permissions(self):
+        return [IsAuthenticated(), *super().get_permissions()]
+
+    def get(self, request, edx_video_id, language_code):
+        """
+        Return the content of a video transcript, in the format given by the optional `output_format` parameter.
+        """
+        video_transcript = VideoTranscript.get_or_none(edx_video_id, language_code)
+        if not video_transcript:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        output_format = request.query_params.get('output_format') or video_transcript.file_format
+        if output_format not in self.CONTENT_TYPES:
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={'message': f'{output_format} transcript format is not supported'}
+            )
+
+        is_stored = output_format == video_transcript.file_format or output_format in video_transcript.renditions
+        is_compressed = is_stored and video_transcript.content_encoding == TranscriptContentEncoding.GZIP
+        send_compressed = is_compressed and ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        etag = video_transcript.get_content_hash()
+        if output_format != video_transcript.file_format:
+            etag += f'-{output_format}'
+        if send_compressed:
+            etag += '-gzip'
+        headers = {
+            'ETag': quote_etag(etag),
+            'Last-Modified': http_date(video_transcript.modified.timestamp()),
+            'Vary': 'Accept-Encoding',
+        }
+
+        response = get_conditional_response(
+            request, etag=headers['ETag'], last_modified=int(video_transcript.modified.timestamp())
+        )
+        if response is None:
+            try:
+                response = self.get_content_response(
+                    request, video_transcript, output_format, is_stored, is_compressed and not send_compressed, headers
+                )
+            except (FileNotFoundError, TranscriptNotFoundError):
+                return Response(status=status.HTTP_404_NOT_FOUND)
+        if send_compressed:
+            headers['Content-Encoding'] = TranscriptContentEncoding.GZIP
+
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def get_content_response(
+            self, request, video_transcript, output_format, is_stored, decompress, headers
+    ):  # pylint: disable=too-many-positional-arguments
+        """
+        Returns a response streaming the transcript content, or the requested byte range of it.
+
+        Raises:
+            FileNotFoundError or TranscriptNotFoundError if the transcript file is missing.
+        """
+        if not is_stored:
+            transcript_data = get_video_transcript_data(
+                video_transcript.video.edx_video_id, video_transcript.language_code, output_format=output_format
+            )
+            if not transcript_data:
+                raise TranscriptNotFoundError(f'Transcript {video_transcript} not found')
+            content = transcript_data['content']
+            content_file, size = io.BytesIO(content), len(content)
+        else:
+            storage = get_video_transcript_storage()
+            file_name = video_transcript.get_file_name(output_format)
+            local_path = get_local_file_path(storage, file_name)
+            if local_path and not decompress:
+                sendfile_response = self.get_sendfile_response(file_name, local_path, output_format)
+                if sendfile_response:
+                    return sendfile_response
+
+            if local_path:
+                # Local files are opened directly, so that WSGI servers can send them with os.sendfile.
+                content_file, size = open(local_path, 'rb'), os.path.getsize(local_path)  # pylint: disable=consider-using-with
+            else:
+                content_file, size = storage.open(file_name, 'rb'), storage.size(file_name)
+            if decompress:
+                # The decompressed size is not known without reading the whole file, so byte
+                # ranges are not supported and the content is streamed without a length.
+                return FileResponse(DecompressedFile(content_file), content_type=self.CONTENT_TYPES[output_format])
+
+        headers['Accept-Ranges'] = 'bytes'
+        byte_range = None
+        range_header = request.META.get('HTTP_RANGE')
+        if range_header and request.META.get('HTTP_IF_RANGE', headers['ETag']) == headers['ETag']:
+            try:
+                byte_range = parse_byte_range(range_header, size)
+            except ValueError:
+                content_file.close()
+                headers['Content-Range'] = f'bytes */{size}'
+                return HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+        start, end = byte_range or (0, size - 1)
+        if not byte_range and isinstance(content_file, io.BufferedReader):
+            # Whole local files are streamed as they are, WSGI servers use their file descriptor.
+            return FileResponse(content_file, content_type=self.CONTENT_TYPES[output_format])
+
+        response = FileResponse(
+            FileRange(content_file, start, end - start + 1),
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            content_type=self.CONTENT_TYPES[output_format],
+        )
+        response['Content-Length'] = end - start + 1
+        if byte_range:
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+    def get_sendfile_response(self, file_name, local_path, output_format):
+        """
+        Returns a response delegating sending a local transcript file to the web server, None if
+        SENDFILE_HEADER is not set in the transcripts settings.
+
+        With `X-Accel-Redirect`, the file is served from the nginx internal location SENDFILE_URL_PREFIX,
+        other headers like `X-Sendfile` are given the path of the file. The web server handles ranges.
+        """
+        storage_settings = get_video_storage_settings(VideoStorage.TRANSCRIPTS)
+        sendfile_header = storage_settings.get('SENDFILE_HEADER')
+        if not sendfile_header:
+            return None
+
+        response = HttpResponse(content_type=self.CONTENT_TYPES[output_format])
+        if sendfile_header == 'X-Accel-Redirect':
+            response[sendfile_header] = storage_settings.get('SENDFILE_URL_PREFIX', '/') + quote(file_name)
+        else:
+            response[sendfile_header] = local_path
+        return response
+
+
 class CourseTranscriptsDetailView(APIView):
     """
     A view to get the details for all the course transcripts related to a course_id.
     """
     authentication_classes = (JwtAuthentication, SessionAuthentication)
 
+    @conditional_get
     def get(self, _request, course_id):
         """
         Returns all transcript data for a course when given a course_id.
@@ -279,6 +640,15 @@ class CourseTranscriptsDetailView(APIView):
         course_data = get_transcript_details_for_course(course_id)
         return Response(status=status.HTTP_200_OK, data=course_data)
 
+    def get_validator_querysets(self, course_id):
+        """
+        Returns the querysets the course transcripts data is made of.
+        """
+        return [
+            CourseVideo.objects.filter(course_id=course_id),
+            VideoTranscript.objects.filter(video__courses__course_id=course_id),
+        ]
+
 
 class CourseVideoIDsView(APIView):
     """
@@ -286,6 +656,7 @@ class CourseVideoIDsView(APIView):
     """
     authentication_classes = (JwtAuthentication, SessionAuthentication)
 
+    @conditional_get
     def get(self, _, course_id):
         """
         Returns all video_ids for a course when given a course_id.
@@ -293,6 +664,12 @@ class CourseVideoIDsView(APIView):
         video_ids = get_video_ids_for_course(course_id)
         return Response(status=status.HTTP_200_OK, data=video_ids)
 
+    def get_validator_querysets(self, course_id):
+        """
+        Returns the querysets the course video ids are made of.
+        """
+        return [CourseVideo.objects.filter(course_id=course_id)]
+
 
 class VideoStatusView(APIView):
     """
@@ -343,6 +720,41 @@ class VideoStatusView(APIView):
         return Response(status=response_status, data=response_payload)
 
 
+class VideoStatusBulkView(APIView):
+    """
+    A Video View to update the status of many videos at once.
+    """
+    authentication_classes = (JwtAuthentication, SessionAuthentication)
+
+    def patch(self, request):
+        """
+        Update the status of the given videos and return a result for each of them.
+
+        Example request data:
+            ```
+            [
+                {'edx_video_id': '1234', 'status': 'transcript_ready'},
+                {'edx_video_id': '5678', 'status': 'pipeline_error', 'error_description': 'Encode failed'},
+            ]
+            ```
+
+        Example response data:
+            ```
+            [
+                {'edx_video_id': '1234', 'updated': True},
+                {'edx_video_id': '5678', 'updated': False, 'message': '...'},
+            ]
+            ```
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={'message': 'A list of video statuses must be specified.'}
+            )
+
+        return Response(status=status.HTTP_200_OK, data=update_videos_status(request.data))
+
+
 class VideoImagesView(APIView):
     """
     View to update course video images.
@@ -398,6 +810,80 @@ class VideoImagesView(APIView):
         return Response()
 
 
+class VideoImagesBulkView(APIView):
+    """
+    View to update the auto generated images of many course videos at once.
+    """
+    authentication_classes = (JwtAuthentication, SessionAuthentication)
+
+    def post(self, request):
+        """
+        Update course video image instances with auto generated image names and return a result for each of them.
+
+        Example request data:
+            ```
+            [
+                {'course_id': 'course-v1:a+b+c', 'edx_video_id': '1234', 'generated_images': ['a.png', 'b.png']},
+                ...
+            ]
+            ```
+
+        Example response data:
+            ```
+            [
+                {'course_id': 'course-v1:a+b+c', 'edx_video_id': '1234', 'updated': True},
+                {'course_id': 'course-v1:a+b+c', 'edx_video_id': '5678', 'updated': False, 'message': '...'},
+            ]
+            ```
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={'message': 'A list of video images must be specified.'}
+            )
+
+        return Response(status=status.HTTP_200_OK, data=update_generated_video_images(request.data))
+
+
+class VideoFileUploadView(APIView):
+    """
+    Local stand-in for presigned uploads, used as upload target on storages which do not support them.
+
+    The signed upload id in the url authorizes the upload, like the signature of a presigned url.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    def put(self, request, upload_id):
+        """
+        Store the request body as the file of an upload issued by `create_video_file_upload`.
+
+        The body is streamed to a temporary file in chunks, so uploads are not limited by
+        DATA_UPLOAD_MAX_MEMORY_SIZE, and are rejected as soon as they exceed the size limit of the storage.
+        """
+        try:
+            video_storage, name = get_video_file_upload(upload_id, max_age=UPLOAD_EXPIRES_IN)
+        except ValCannotCreateError:
+            return Response(status=status.HTTP_403_FORBIDDEN, data={'message': 'Invalid or expired upload id.'})
+
+        max_bytes = get_video_file_max_bytes(video_storage)
+        with TemporaryFile() as content:
+            for chunk in iter(lambda: request.read(UPLOAD_CHUNK_SIZE), b''):
+                content.write(chunk)
+                if max_bytes and content.tell() > max_bytes:
+                    return Response(
+                        status=status.HTTP_400_BAD_REQUEST,
+                        data={'message': f'File size must be less than {max_bytes} bytes.'}
+                    )
+
+            # Uploads can be retried, the file is overwritten like with a presigned url.
+            storage = get_video_file_storage(video_storage)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, File(content))
+        return Response(status=status.HTTP_200_OK)
+
+
 class HLSMissingVideoView(APIView):
     """
     A View to list video ids which are missing HLS encodes and update an encode profile for a video.
@@ -470,7 +956,7 @@ class HLSMissingVideoView(APIView):
 
     def put(self, request):
         """
-        Update a single profile for a given video.
+        Update a single profile for a given video, or for many videos if a list is given.
 
         Example request data:
             ```
@@ -484,7 +970,18 @@ class HLSMissingVideoView(APIView):
                 }
             }
             ```
+
+        For a list of such dicts, the response data contains a result for each of them:
+            ```
+            [
+                {'edx_video_id': '1234', 'profile': 'hls', 'updated': True},
+                {'edx_video_id': '5678', 'profile': 'hls', 'updated': False, 'message': '...'},
+            ]
+            ```
         """
+        if isinstance(request.data, list):
+            return Response(status=status.HTTP_200_OK, data=update_encoded_videos(request.data))
+
         edx_video_id = request.data['edx_video_id']
         profile = request.data['profile']
         encode_data = request.data['encode_data']